@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Streaming Ingest Benchmark
+Writes synthetic Apify scraper dumps of growing size (every post carries the
+scraper's full field set, comments and child posts), cleans each one with
+utils/clean_apify_json.py in a fresh process and records that process's
+peak RSS. Peak memory must stay flat as the dump grows; the old json.load
+path is measured on the smaller dumps for comparison.
+
+Usage: python benchmarks/bench_apify_stream.py [largest size in MB, default 2048] [scratch dir]
+"""
+
+import json
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+LEGACY_MAX_MB = 256  # json.load needs several times the dump size in RAM
+FLAT_TOLERANCE_MB = 16  # Allowed peak RSS growth from the smallest to the largest dump
+
+WORDS = ("hi im going to uoft for eng comp sci life sci living at chestnut new college "
+         "woodsworth trinity vic innis looking for roommates dm me kpop volleyball matcha "
+         "anime gym so excited class of 2029 frosh week <3").split()
+
+
+def fake_post(n, rng):
+    """One post shaped like the Apify Instagram scraper's output"""
+    shortcode = f"SYN{n:09d}"
+    caption = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(20, 120)))
+    comments = [{
+        "id": str(rng.getrandbits(60)),
+        "text": ' '.join(rng.choice(WORDS) for _ in range(rng.randint(3, 30))),
+        "ownerUsername": f"user{rng.getrandbits(20)}",
+        "ownerProfilePicUrl": f"https://scontent.cdninstagram.com/v/t51/{rng.getrandbits(64):x}.jpg?stp=dst-jpg_s150x150",
+        "timestamp": "2025-08-30T12:00:00.000Z",
+        "repliesCount": rng.randint(0, 3),
+        "replies": [],
+        "likesCount": rng.randint(0, 40),
+        "owner": {"id": str(rng.getrandbits(40)), "is_verified": False,
+                  "profile_pic_url": f"https://scontent.cdninstagram.com/{rng.getrandbits(64):x}.jpg",
+                  "username": f"user{rng.getrandbits(20)}"},
+    } for _ in range(rng.randint(0, 12))]
+    images = [f"https://scontent.cdninstagram.com/v/t51.29350-15/{rng.getrandbits(64):x}_n.jpg?stp=dst-jpg_e35"
+              for _ in range(rng.randint(1, 6))]
+    return {
+        "inputUrl": "https://www.instagram.com/uoft_frosh.29/",
+        "id": str(3_000_000_000_000_000_000 + n),
+        "type": rng.choice(["Image", "Sidecar"]),
+        "shortCode": shortcode,
+        "caption": caption,
+        "hashtags": ["uoft", "frosh"],
+        "mentions": [],
+        "url": f"https://www.instagram.com/p/{shortcode}/",
+        "commentsCount": len(comments),
+        "firstComment": comments[0]["text"] if comments else "",
+        "latestComments": comments,
+        "dimensionsHeight": 1350,
+        "dimensionsWidth": 1080,
+        "displayUrl": images[0],
+        "images": images,
+        "alt": None,
+        "likesCount": rng.randint(0, 500),
+        "timestamp": f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:00:00.000Z",
+        "childPosts": [{"id": str(rng.getrandbits(60)), "type": "Image", "displayUrl": image,
+                        "dimensionsHeight": 1350, "dimensionsWidth": 1080} for image in images[1:]],
+        "ownerFullName": "UofT Frosh 2029",
+        "ownerUsername": "uoft_frosh.29",
+        "ownerId": "71234567890",
+        "isSponsored": False,
+    }
+
+
+def write_dump(path, size_mb, seed=0):
+    """Write a JSON array of fake posts of at least size_mb; returns the post count"""
+    rng = random.Random(seed)
+    target = size_mb << 20
+    written = 0
+    count = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('[\n')
+        while written < target:
+            text = ('' if count == 0 else ',\n') + json.dumps(fake_post(count, rng), indent=2, ensure_ascii=False)
+            f.write(text)
+            written += len(text)
+            count += 1
+        f.write('\n]\n')
+    return count
+
+
+# The json.load version of utils/clean_apify_json.py this replaced
+LEGACY = '''
+import json, sys
+from datetime import datetime
+sys.path.insert(0, sys.argv[3])
+from caption_cleaner import clean_many
+with open(sys.argv[1], 'r', encoding='utf-8') as f:
+    raw_data = json.load(f)
+cleaned = [{"caption": c, "post_url": p.get("url", ""), "added_at": p.get("timestamp", datetime.now().isoformat())}
+           for p, c in zip(raw_data, clean_many(p.get("caption", "") for p in raw_data))]
+cleaned = [p for p in cleaned if p["caption"] and p["post_url"]]
+with open(sys.argv[2], 'w', encoding='utf-8') as f:
+    json.dump({"total_posts": len(cleaned), "posts": cleaned}, f, indent=2, ensure_ascii=False)
+'''
+
+# Runs a script (or -c code) and reports the process's own peak RSS. VmHWM
+# belongs to the new process image; ru_maxrss would include the parent's
+# RSS at fork time.
+MEASURE = '''
+import resource, runpy, sys
+sys.argv = sys.argv[1:]
+if sys.argv[0] == '-c':
+    exec(compile(sys.argv.pop(1), '<legacy>', 'exec'), {'__name__': '__main__'})
+else:
+    runpy.run_path(sys.argv[0], run_name='__main__')
+try:
+    with open('/proc/self/status') as f:
+        peak_kb = next(int(line.split()[1]) for line in f if line.startswith('VmHWM:'))
+except (OSError, StopIteration):
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(f"PEAK_KB {peak_kb}", file=sys.stderr)
+'''
+
+
+def peak_rss_mb(args):
+    """Run a script with args to completion; (its peak RSS in MB, wall seconds)"""
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", MEASURE, *args],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    if result.returncode:
+        raise SystemExit(f"{args[:2]} failed:\n{result.stderr}")
+    peak_kb = int(result.stderr.rsplit("PEAK_KB", 1)[1])
+    return peak_kb / 1024, time.perf_counter() - start
+
+
+def count_posts(output_file):
+    """Posts in a cleaned output file, counted without loading it"""
+    with open(output_file, 'r', encoding='utf-8') as f:
+        return sum(1 for line in f if line.startswith('      "post_url": '))
+
+
+def main():
+    largest_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 2048
+    scratch = Path(sys.argv[2] if len(sys.argv) > 2 else tempfile.gettempdir())
+    sizes = [largest_mb >> shift for shift in (3, 2, 1, 0) if largest_mb >> shift >= 16]
+
+    print(f"{'dump MB':>8} {'posts':>8} {'stream MB':>10} {'stream s':>9} {'json.load MB':>13}")
+    peaks = []
+    for size_mb in sizes:
+        dump = scratch / f"bench_apify_dump_{size_mb}.json"
+        output = scratch / f"bench_apify_clean_{size_mb}.json"
+        try:
+            count = write_dump(dump, size_mb)
+            stream_mb, stream_s = peak_rss_mb([str(ROOT / "utils" / "clean_apify_json.py"), str(dump), str(output)])
+            assert count_posts(output) == count, "posts were lost"
+
+            legacy = "skipped"
+            if size_mb <= LEGACY_MAX_MB:
+                legacy_mb, _ = peak_rss_mb(["-c", LEGACY, str(dump), str(output), str(ROOT / "scripts")])
+                legacy = f"{legacy_mb:.0f}"
+        finally:
+            dump.unlink(missing_ok=True)
+            output.unlink(missing_ok=True)
+
+        peaks.append(stream_mb)
+        print(f"{size_mb:>8} {count:>8} {stream_mb:>10.1f} {stream_s:>9.1f} {legacy:>13}")
+
+    growth = peaks[-1] - peaks[0]
+    ok = growth <= FLAT_TOLERANCE_MB
+    print(f"\n{'✅' if ok else '❌'} Peak RSS grew {growth:.1f} MB from a {sizes[0]} MB to a {sizes[-1]} MB dump "
+          f"(allowed {FLAT_TOLERANCE_MB} MB)")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Caption Cleaner Benchmark
+Times the single-pass cleaner in scripts/caption_cleaner.py against the
+original multi-regex clean_html_content on the corpus captions wrapped in
+RSS-style HTML, and checks both give identical output.
+
+Usage: python benchmarks/bench_caption_cleaner.py [all-posts.json]
+"""
+
+import json
+import re
+import sys
+import time
+from html import unescape
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from caption_cleaner import clean_caption, clean_many
+
+REPEATS = 5
+
+
+def legacy_clean_html_content(html_content):
+    """RSSMonitor.clean_html_content before the single-pass cleaner replaced it"""
+    if not html_content:
+        return ""
+    html_content = html_content.replace('<33', '&lt;33')
+    html_content = html_content.replace('<3', '&lt;3')
+    html_content = re.sub(r'<img[^>]*>', '', html_content)
+    html_content = re.sub(r'<[^>]+>', '\n', html_content)
+    html_content = unescape(html_content)
+    html_content = re.sub(r'[ \t]+', ' ', html_content)
+    html_content = re.sub(r'\n+', '\n', html_content)
+    html_content = html_content.strip()
+    html_content = html_content.replace('\n', ' ')
+    html_content = re.sub(r'\s+', ' ', html_content).strip()
+    return html_content
+
+
+def as_rss_html(caption, n):
+    """Wrap a caption the way rss.app delivers Instagram captions"""
+    body = caption.replace('&', '&amp;').replace('. ', '.<br> ')
+    return f'<div><img src="https://scontent.cdninstagram.com/{n}.jpg" style="width: 100%;" /><div>{body}</div></div>'
+
+
+def best_time(fn):
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    corpus_file = sys.argv[1] if len(sys.argv) > 1 else "all-posts.json"
+    with open(corpus_file, 'r', encoding='utf-8') as f:
+        captions = [post['caption'] for post in json.load(f)['posts']]
+    inputs = captions + [as_rss_html(caption, n) for n, caption in enumerate(captions)]
+
+    mismatches = sum(1 for html in inputs if clean_caption(html) != legacy_clean_html_content(html))
+    print(f"🔍 {len(inputs)} captions, {mismatches} differ from the legacy cleaner")
+
+    for label, batch_inputs in (("RSS HTML captions", inputs[len(captions):]), ("plain-text captions", captions)):
+        legacy = best_time(lambda: [legacy_clean_html_content(html) for html in batch_inputs])
+        single = best_time(lambda: [clean_caption(html) for html in batch_inputs])
+        batch = best_time(lambda: list(clean_many(batch_inputs)))
+
+        per_caption = 1_000_000 / len(batch_inputs)
+        print(f"\n{label}:")
+        print(f"  legacy multi-pass: {legacy * per_caption:7.1f} µs/caption")
+        print(f"  single pass:       {single * per_caption:7.1f} µs/caption ({legacy / single:.2f}x)")
+        print(f"  clean_many batch:  {batch * per_caption:7.1f} µs/caption ({legacy / batch:.2f}x)")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Near-Duplicate Benchmark
+Grows the corpus, plants edited reposts (an emoji swapped, a hashtag added,
+a word dropped) and measures how the MinHash/LSH index from
+scripts/near_duplicates.py scales: time per post, candidates compared per
+lookup (versus the n comparisons of an all-pairs check) and how many planted
+reposts it catches.
+
+Usage: python benchmarks/bench_near_duplicates.py [all-posts.json] [threshold]
+"""
+
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from near_duplicates import DEFAULT_THRESHOLD, NearDuplicateIndex, normalize_caption, shingles
+
+CORPUS_SIZES = [2_000, 10_000, 50_000, 100_000, 200_000]
+REPOST_RATE = 0.01
+EDITS = ["✨", "🎉", "💙", "#uoft", "#uoft2029", "#frosh", "lol", "!!"]
+
+
+def scale_corpus(posts, size, seed=0):
+    """Grow the real corpus to size posts by reshuffling words of real captions"""
+    rng = random.Random(seed)
+    scaled = [post['caption'] for post in posts[:size]]
+    while len(scaled) < size:
+        words = rng.choice(posts)['caption'].split()
+        rng.shuffle(words)
+        scaled.append(' '.join(words))
+    return scaled
+
+
+def edit_caption(caption, rng):
+    """A repost: the caption with one or two small edits"""
+    words = caption.split()
+    for _ in range(rng.randint(1, 2)):
+        if len(words) > 10 and rng.random() < 0.3:
+            del words[rng.randrange(len(words))]
+        else:
+            words.insert(rng.randrange(len(words) + 1), rng.choice(EDITS))
+    return ' '.join(words)
+
+
+def jaccard(a, b):
+    a, b = shingles(normalize_caption(a)), shingles(normalize_caption(b))
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+def main():
+    """Run the benchmark and print a scaling table"""
+    corpus_file = sys.argv[1] if len(sys.argv) > 1 else "all-posts.json"
+    threshold = float(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_THRESHOLD
+    with open(corpus_file, 'r', encoding='utf-8') as f:
+        posts = json.load(f)['posts']
+
+    print(f"threshold {threshold}")
+    print(f"{'posts':>8} {'µs/post':>8} {'cands/post':>10} {'all-pairs':>10} {'reposts':>8} {'caught':>7} {'clusters':>9}")
+    for size in CORPUS_SIZES:
+        rng = random.Random(size)
+        captions = scale_corpus(posts, size)
+        # Reposts of captions seen earlier, placed later in the stream
+        planted = {}
+        for _ in range(int(size * REPOST_RATE)):
+            original = rng.randrange(len(captions))
+            # Only count reposts that really are above the threshold
+            edited = edit_caption(captions[original], rng)
+            if len(captions[original]) > 40 and jaccard(captions[original], edited) >= threshold:
+                planted[len(captions)] = original
+            captions.append(edited)
+
+        index = NearDuplicateIndex(threshold)
+        caught = 0
+        start = time.perf_counter()
+        for key, caption in enumerate(captions):
+            duplicates = index.add(key, caption)
+            if key in planted and planted[key] in duplicates:
+                caught += 1
+        per_post_us = (time.perf_counter() - start) * 1_000_000 / len(captions)
+
+        # An all-pairs check compares each post with every earlier one
+        all_pairs = (len(captions) - 1) / 2
+        print(f"{len(captions):>8} {per_post_us:>8.0f} {index.comparisons / len(captions):>10.2f} {all_pairs:>10.0f} "
+              f"{len(planted):>8} {caught / max(len(planted), 1):>6.1%} {len(index.clusters()):>9}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Search Benchmark
+Compares query latency of the page's linear caption scan against the inverted
+index from scripts/search_index.py as the corpus grows.
+
+Usage: python benchmarks/bench_search_index.py [all-posts.json]
+"""
+
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from search_index import build_inverted_index, query_index
+
+CORPUS_SIZES = [2_000, 10_000, 50_000, 100_000]
+QUERIES = ["chestnut", "comp sci", "engineering", "new college rez", "looking for roommate", "kpop"]
+REPEATS = 5
+
+
+def scale_corpus(posts, size, seed=0):
+    """Grow the real corpus to size posts by reshuffling words of real captions"""
+    rng = random.Random(seed)
+    scaled = list(posts[:size])
+    while len(scaled) < size:
+        words = rng.choice(posts)['caption'].split()
+        rng.shuffle(words)
+        scaled.append({'caption': ' '.join(words)})
+    return scaled
+
+
+def linear_scan(posts, query):
+    """The AND-of-words substring match performSearch() runs over every caption"""
+    words = query.lower().split()
+    return [i for i, post in enumerate(posts)
+            if all(word in post['caption'].lower() for word in words)]
+
+
+def time_queries(search):
+    """Median time in milliseconds to answer every benchmark query once"""
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        for query in QUERIES:
+            search(query)
+        timings.append((time.perf_counter() - start) * 1000 / len(QUERIES))
+    timings.sort()
+    return timings[len(timings) // 2]
+
+
+def main():
+    """Run the benchmark and print a latency table"""
+    corpus_file = sys.argv[1] if len(sys.argv) > 1 else "all-posts.json"
+    with open(corpus_file, 'r', encoding='utf-8') as f:
+        posts = json.load(f)['posts']
+
+    print(f"{'posts':>8} {'tokens':>8} {'build ms':>9} {'scan ms':>9} {'index ms':>9} {'speedup':>8}")
+    for size in CORPUS_SIZES:
+        corpus = scale_corpus(posts, size)
+
+        start = time.perf_counter()
+        tokens = build_inverted_index(corpus)
+        build_ms = (time.perf_counter() - start) * 1000
+        vocabulary = list(tokens)
+
+        for query in QUERIES:
+            assert query_index(tokens, query, vocabulary) == linear_scan(corpus, query), query
+
+        scan_ms = time_queries(lambda q: linear_scan(corpus, q))
+        index_ms = time_queries(lambda q: query_index(tokens, q, vocabulary))
+        print(f"{size:>8} {len(tokens):>8} {build_ms:>9.1f} {scan_ms:>9.2f} {index_ms:>9.2f} {scan_ms / index_ms:>7.1f}x")
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+serve.py Load Test
+Starts serve.py on a free local port (or targets --url) and drives it from
+--concurrency client threads for --duration seconds with a mix of the
+requests a visitor's browser makes:
+
+  index              / (gzip)
+  all_posts          all-posts.json, downloaded in full (gzip)
+  all_posts_304      all-posts.json revalidated with its ETag, answered 304
+  manifest / shard   posts/manifest.json and the newest month shard
+  versions           deltas/versions.json, which a returning visitor's page checks first
+  page               the newest pre-rendered result page
+  date_index, vocabulary, facets   the small site data files
+  search / suggest   /api/search and /api/suggest with a set of queries
+
+Requests for files the site doesn't have are left out of the mix. The
+report (throughput, p50 / p95 / p99 latency, bytes and error rate, overall
+and per request kind) is printed and written as JSON, so two server
+versions can be compared; --p95-budget makes the run fail when p95 latency
+goes over a budget.
+
+Usage:
+  python benchmarks/load_test.py [--concurrency 16] [--duration 10] [--url http://host:port]
+                                 [--output results.json] [--p95-budget 50]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import quote, urlsplit
+
+ROOT = Path(__file__).resolve().parent.parent
+
+RESULTS_VERSION = 1
+STARTUP_TIMEOUT = 120  # Seconds for serve.py to load the corpus and answer
+GZIP = {'Accept-Encoding': 'gzip'}
+SEARCHES = ["chestnut", "comp sci", "engineering", "new college rez", "looking for roommates", "kpop",
+            "engeneering", "vic one"]
+PREFIXES = ["chest", "new c", "eng", "comp", "woods", "rotman c"]
+
+# Relative weight of each kind of request
+MIX = {
+    'index': 10,
+    'all_posts': 4,
+    'all_posts_304': 12,
+    'manifest': 10,
+    'shard': 10,
+    'versions': 10,
+    'page': 12,
+    'date_index': 5,
+    'vocabulary': 5,
+    'facets': 5,
+    'search': 17,
+    'suggest': 10,
+}
+# Statuses that count as success; anything else (0 for a connection error) is an error
+EXPECTED = {'all_posts_304': {304}}
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(int(fraction * len(sorted_values)), len(sorted_values) - 1)]
+
+
+class Client:
+    """One keep-alive connection to the server"""
+
+    def __init__(self, base_url, timeout=30):
+        parts = urlsplit(base_url)
+        self.connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=timeout)
+
+    def get(self, path, headers=None):
+        """(status, headers, body) of GET path; reconnects once if the server dropped the connection"""
+        for attempt in (0, 1):
+            try:
+                self.connection.request('GET', path, headers=headers or {})
+                response = self.connection.getresponse()
+                return response.status, response.headers, response.read()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                self.connection.close()
+                if attempt:
+                    raise
+
+    def close(self):
+        self.connection.close()
+
+
+def request_mix(base_url):
+    """{kind: (path, headers)} for the requests this site can answer"""
+    client = Client(base_url)
+    requests = {}
+
+    def add(kind, path, headers=GZIP):
+        status, response_headers, body = client.get(path, headers)
+        if status == 200:
+            requests[kind] = (path, headers)
+        return status, response_headers, body
+
+    try:
+        add('index', '/')
+        status, headers, _ = add('all_posts', '/all-posts.json')
+        if status == 200 and headers.get('ETag'):
+            requests['all_posts_304'] = ('/all-posts.json', dict(GZIP, **{'If-None-Match': headers['ETag']}))
+
+        status, _, body = add('manifest', '/posts/manifest.json', {})
+        if status == 200:
+            shards = json.loads(body).get('shards', [])
+            if shards:
+                newest = max(shards, key=lambda shard: shard['month'])
+                add('shard', f"/posts/{newest['file']}")
+        add('versions', '/deltas/versions.json', {})
+        status, _, body = client.get('/pages/index.json')
+        if status == 200:
+            pages = json.loads(body).get('pages', [])
+            if pages:
+                add('page', f"/pages/{pages[0]['file']}")
+
+        add('date_index', '/date-index.json')
+        add('vocabulary', '/vocabulary.json')
+        add('facets', '/facets.json')
+        add('search', '/api/search?q=chestnut', {})
+        add('suggest', '/api/suggest?q=chest', {})
+    finally:
+        client.close()
+    return requests
+
+
+def pick_path(kind, path, rng):
+    """The path to request; search and suggest vary their query"""
+    if kind == 'search':
+        return f"/api/search?q={quote(rng.choice(SEARCHES))}&limit=20"
+    if kind == 'suggest':
+        return f"/api/suggest?q={quote(rng.choice(PREFIXES))}"
+    return path
+
+
+def run_load(base_url, requests, concurrency, duration, seed=0):
+    """Drive the server for duration seconds; returns {kind: [(seconds, status, bytes, ok), ...]}"""
+    kinds = [kind for kind in MIX if kind in requests]
+    weights = [MIX[kind] for kind in kinds]
+    samples = {kind: [] for kind in kinds}
+    lock = threading.Lock()
+    start = threading.Event()
+    deadline = [0.0]
+
+    def worker(number):
+        rng = random.Random(seed * 1000 + number)
+        client = Client(base_url)
+        mine = []
+        start.wait()
+        try:
+            while time.perf_counter() < deadline[0]:
+                kind = rng.choices(kinds, weights)[0]
+                path, headers = requests[kind]
+                began = time.perf_counter()
+                try:
+                    status, _, body = client.get(pick_path(kind, path, rng), headers)
+                    size = len(body)
+                except (OSError, http.client.HTTPException):
+                    status, size = 0, 0  # Connection errors and timeouts count as errors
+                    client.close()
+                    client = Client(base_url)
+                ok = status in EXPECTED.get(kind, {200})
+                mine.append((kind, time.perf_counter() - began, status, size, ok))
+        finally:
+            client.close()
+        with lock:
+            for kind, *sample in mine:
+                samples[kind].append(tuple(sample))
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    deadline[0] = time.perf_counter() + duration
+    start.set()
+    for thread in threads:
+        thread.join()
+    return samples
+
+
+def summarize(samples, elapsed):
+    """Throughput, latency percentiles (ms), bytes and errors for a list of samples"""
+    latencies = sorted(seconds * 1000 for seconds, _, _, _ in samples)
+    statuses = Counter(status for _, status, _, _ in samples)
+    errors = sum(not ok for _, _, _, ok in samples)
+    return {
+        "requests": len(samples),
+        "throughput_rps": len(samples) / elapsed if elapsed else 0.0,
+        "latency_ms": {
+            "p50": percentile(latencies, 0.50),
+            "p95": percentile(latencies, 0.95),
+            "p99": percentile(latencies, 0.99),
+            "max": latencies[-1] if latencies else 0.0,
+            "mean": sum(latencies) / len(latencies) if latencies else 0.0,
+        },
+        "bytes": sum(size for _, _, size, _ in samples),
+        "errors": errors,
+        "error_rate": errors / len(samples) if samples else 0.0,
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+    }
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(port):
+    """Start serve.py on port and wait until it answers"""
+    env = dict(os.environ, PORT=str(port), OPEN_BROWSER='false')
+    server = subprocess.Popen([sys.executable, str(ROOT / "serve.py")], env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    give_up = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < give_up:
+        if server.poll() is not None:
+            raise RuntimeError(f"serve.py exited with status {server.returncode}")
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return server
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError(f"serve.py did not answer within {STARTUP_TIMEOUT}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test serve.py with a realistic request mix")
+    parser.add_argument("--url", help="test a server that is already running instead of starting serve.py")
+    parser.add_argument("--concurrency", type=int, default=16, help="client threads, each with one connection")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of load")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="where to write the report (default: benchmarks/results/load-<time>.json)")
+    parser.add_argument("--p95-budget", type=float, help="fail when overall p95 latency exceeds this many ms")
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.url
+    if not base_url:
+        port = free_port()
+        print(f"🚀 Starting serve.py on port {port}...")
+        server = start_server(port)
+        base_url = f"http://127.0.0.1:{port}"
+
+    try:
+        requests = request_mix(base_url)
+        print(f"🎯 {base_url}: {', '.join(requests)} ({args.concurrency} clients for {args.duration:g}s)")
+        began = time.perf_counter()
+        samples = run_load(base_url, requests, args.concurrency, args.duration, args.seed)
+        elapsed = time.perf_counter() - began
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    overall = summarize([sample for kind_samples in samples.values() for sample in kind_samples], elapsed)
+    report = {
+        "version": RESULTS_VERSION,
+        "created": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()}, {os.cpu_count()} CPUs",
+        "url": base_url,
+        "concurrency": args.concurrency,
+        "duration_s": elapsed,
+        "overall": overall,
+        "by_kind": {kind: summarize(kind_samples, elapsed) for kind, kind_samples in samples.items()},
+    }
+
+    print(f"\n{'request':<16} {'count':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'KB':>10} {'errors':>7}")
+    for kind, result in list(report["by_kind"].items()) + [("overall", overall)]:
+        latency = result["latency_ms"]
+        print(f"{kind:<16} {result['requests']:>7} {latency['p50']:>8.2f} {latency['p95']:>8.2f} "
+              f"{latency['p99']:>8.2f} {result['bytes'] / 1024:>10.0f} {result['errors']:>7}")
+    print(f"\n📊 {overall['throughput_rps']:.0f} requests/s, {overall['bytes'] / elapsed / 1024 / 1024:.1f} MB/s, "
+          f"{overall['error_rate']:.2%} errors")
+
+    output = Path(args.output) if args.output else \
+        ROOT / "benchmarks" / "results" / f"load-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"📄 Results saved to {output}")
+
+    if args.p95_budget is not None and overall["latency_ms"]["p95"] > args.p95_budget:
+        print(f"❌ p95 latency {overall['latency_ms']['p95']:.1f} ms is over the {args.p95_budget:g} ms budget")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
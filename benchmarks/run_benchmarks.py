@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Benchmark Suite
+Times the pipeline's hot paths on seeded synthetic corpora (see synthetic.py)
+and stores the results as JSON, so a later run can be compared against a
+baseline and regressions flagged.
+
+  clean_html_content         one RSS caption's HTML to text
+  feedparser                 parsing a feed document with many entries
+  feed_stream                the same document read entry by entry with feed_stream.FeedStream
+  feed_stream_new            FeedStream up to the first known entry, MERGE_BATCH entries in
+  parse_rss_entry            one parsed feed entry to a post
+  merge_new_posts            RSSMonitor.merge_new_posts_with_existing() with a batch of new posts
+  save_all_posts             all-posts.json plus shards, search index and gzip variants
+  similar_build              every post's similar posts from scratch (similar_posts.py)
+  similar_add                a batch of new posts added to the similar-posts index
+  similar_load_add           the same with the index loaded from similar/ first, as a monitor run does
+  load_all_posts             reading all-posts.json back
+  dedup_index                building the backfill URL / near-duplicate caption indexes
+  dedup_diff                 classifying a scraper batch against them (utils/backfill.py)
+  caption_match              the page's AND-of-words substring match over every caption
+  search_index_query         the same queries answered from the inverted index
+
+Usage:
+  python benchmarks/run_benchmarks.py [--sizes 10000,100000] [--output results.json]
+                                      [--baseline benchmarks/baseline.json] [--tolerance 0.25]
+Sizes of 1000000 are supported but take a while.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "scripts"))
+sys.path.insert(0, str(ROOT / "utils"))
+
+import feedparser
+
+from backfill import Corpus, diff
+from dates import to_utc_iso
+from entities import tag_posts
+from feed_stream import CHUNK_SIZE, FeedStream
+from publish import ensure_post_log
+from rss_monitor import RSSMonitor
+from search_index import build_inverted_index, query_index
+from similar_posts import SimilarPosts, write_similar_posts
+from synthetic import make_feed, make_posts
+
+RESULTS_VERSION = 1
+DEFAULT_SIZES = [10_000, 100_000]
+FEED_ENTRIES = 1_000
+MERGE_BATCH = 50
+DEDUP_BATCH = 1_000
+QUERIES = ["chestnut", "comp sci", "engineering", "new college rez", "looking for roommates", "kpop"]
+
+
+def best_time(function, repeats):
+    """Fastest of repeats calls, in seconds (min is the least noisy estimate)"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+@contextlib.contextmanager
+def quiet():
+    """Swallow the monitor's progress prints while timing"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def page_caption_match(posts, query):
+    """performSearch()'s filter: every query word is a substring of the lowercased caption"""
+    words = query.lower().split()
+    return [post for post in posts if all(word in post['caption'].lower() for word in words)]
+
+
+def run_size(size, repeats, scratch):
+    """Every benchmark at one corpus size; {name: {seconds, items, per_item_us}}"""
+    results = {}
+
+    def record(name, seconds, items):
+        results[name] = {"seconds": seconds, "items": items, "per_item_us": seconds * 1_000_000 / max(items, 1)}
+        print(f"  {name:<20} {seconds * 1000:>10.1f} ms  {results[name]['per_item_us']:>10.2f} µs/item  ({items} items)")
+
+    posts = make_posts(size, seed=size)
+    site = Path(scratch) / f"site_{size}"
+    monitor = RSSMonitor("http://127.0.0.1:9/feed.xml", data_dir=site / "data", site_dir=site,
+                         compact_after=10 ** 9)
+
+    # The feed side does not depend on the corpus size
+    feed_xml = make_feed(FEED_ENTRIES, seed=size)
+    feed = feedparser.parse(feed_xml)
+    captions = [entry.get('description', '') for entry in feed.entries]
+    record("clean_html_content", best_time(lambda: [monitor.clean_html_content(c) for c in captions], repeats),
+           len(captions))
+    record("feedparser", best_time(lambda: feedparser.parse(feed_xml), repeats), len(feed.entries))
+    chunks = [feed_xml[i:i + CHUNK_SIZE] for i in range(0, len(feed_xml), CHUNK_SIZE)]
+    record("feed_stream", best_time(lambda: list(FeedStream(chunks)), repeats), len(feed.entries))
+    record("feed_stream_new", best_time(lambda: list(zip(range(MERGE_BATCH), FeedStream(chunks))), repeats),
+           MERGE_BATCH)
+    with quiet():
+        seconds = best_time(lambda: [monitor.parse_rss_entry(e) for e in feed.entries], repeats)
+    record("parse_rss_entry", seconds, len(feed.entries))
+
+    # Writing and reading the published corpus
+    data = {"total_posts": len(posts), "last_updated": to_utc_iso(datetime.now(timezone.utc)), "posts": posts}
+    with quiet():
+        seconds = best_time(lambda: monitor.save_all_posts(data), 1)
+    record("save_all_posts", seconds, len(posts))
+    with quiet():
+        seconds = best_time(monitor.load_all_posts, repeats)
+    record("load_all_posts", seconds, len(posts))
+
+    # Similar posts, on the ids and entity tags publishing gave the posts
+    start = time.perf_counter()
+    similar = SimilarPosts.from_posts(posts)
+    record("similar_build", time.perf_counter() - start, len(posts))
+    batch = make_posts(MERGE_BATCH, seed=size * 17)
+    for offset, post in enumerate(batch):
+        post['id'] = len(posts) + offset
+    tag_posts(batch)
+    write_similar_posts(similar, site / "similar")
+    start = time.perf_counter()
+    similar.add(batch)
+    record("similar_add", time.perf_counter() - start, MERGE_BATCH)
+    start = time.perf_counter()
+    SimilarPosts.load(site / "similar").add(batch)
+    record("similar_load_add", time.perf_counter() - start, MERGE_BATCH)
+
+    # Merging a batch of new feed posts into the logged corpus
+    with quiet():
+        ensure_post_log(monitor.post_log, monitor.all_posts_file)
+        monitor.post_log.keys()
+    batches = iter(range(repeats))
+
+    def merge_batch():
+        batch = next(batches)
+        with quiet():
+            rss_posts = [monitor.parse_rss_entry(entry)
+                         for entry in feedparser.parse(make_feed(MERGE_BATCH, seed=size * 7 + batch)).entries]
+            start = time.perf_counter()
+            monitor.merge_new_posts_with_existing(rss_posts)
+            return time.perf_counter() - start
+
+    record("merge_new_posts", min(merge_batch() for _ in range(repeats)), MERGE_BATCH)
+
+    # The backfill's caption dedup: build the indexes once, classify a scraper batch
+    snapshot = monitor.all_posts_file
+    with quiet():
+        start = time.perf_counter()
+        corpus = Corpus(snapshot, site / "data" / "missing.jsonl")
+        corpus.captions  # Built lazily
+        seconds = time.perf_counter() - start
+    record("dedup_index", seconds, len(corpus.urls))
+    dump_posts = make_posts(DEDUP_BATCH, seed=size * 13) + posts[:DEDUP_BATCH // 10]
+    start = time.perf_counter()
+    diff(corpus, dump_posts)
+    record("dedup_diff", time.perf_counter() - start, len(dump_posts))
+
+    # Search: the page's linear scan against the inverted index
+    record("caption_match", best_time(lambda: [page_caption_match(posts, q) for q in QUERIES], repeats) / len(QUERIES),
+           len(posts))
+    tokens = build_inverted_index(posts)
+    vocabulary = list(tokens)
+    record("search_index_query",
+           best_time(lambda: [query_index(tokens, q, vocabulary) for q in QUERIES], repeats) / len(QUERIES),
+           len(posts))
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Print current vs baseline; returns the names that got slower than tolerance allows"""
+    regressions = []
+    print(f"\n{'benchmark':<32} {'baseline ms':>12} {'current ms':>12} {'change':>8}")
+    for key, current in sorted(results.items()):
+        before = baseline.get(key)
+        if not before:
+            print(f"{key:<32} {'-':>12} {current['seconds'] * 1000:>12.1f} {'new':>8}")
+            continue
+        ratio = current['per_item_us'] / before['per_item_us'] if before['per_item_us'] else 1.0
+        flag = ''
+        if ratio > 1 + tolerance:
+            regressions.append(key)
+            flag = '  ❌ regression'
+        print(f"{key:<32} {before['seconds'] * 1000:>12.1f} {current['seconds'] * 1000:>12.1f} "
+              f"{(ratio - 1) * 100:>+7.0f}%{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the benchmark suite on synthetic corpora")
+    parser.add_argument("--sizes", default=','.join(map(str, DEFAULT_SIZES)), help="comma-separated corpus sizes")
+    parser.add_argument("--repeats", type=int, default=3, help="runs per benchmark; the fastest counts")
+    parser.add_argument("--output", help="where to write the results JSON (default: benchmarks/results/<time>.json)")
+    parser.add_argument("--baseline", help="results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown per item before flagging")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    results = {}
+    with tempfile.TemporaryDirectory() as scratch:
+        for size in sizes:
+            print(f"\n📏 {size} posts")
+            for name, result in run_size(size, args.repeats, scratch).items():
+                results[f"{name}@{size}"] = result
+
+    report = {
+        "version": RESULTS_VERSION,
+        "created": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()}, {os.cpu_count()} CPUs",
+        "sizes": sizes,
+        "results": results,
+    }
+    output = Path(args.output) if args.output else \
+        ROOT / "benchmarks" / "results" / f"{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📄 Results saved to {output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get("version") != RESULTS_VERSION:
+            print(f"⚠️  Baseline is results version {baseline.get('version')}, expected {RESULTS_VERSION}")
+        regressions = compare(results, baseline.get("results", {}), args.tolerance)
+        if regressions:
+            print(f"\n❌ {len(regressions)} benchmark(s) slower than the baseline by more than "
+                  f"{args.tolerance:.0%}: {', '.join(regressions)}")
+            return 1
+        print(f"\n✅ No benchmark slower than the baseline by more than {args.tolerance:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
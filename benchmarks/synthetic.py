@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Synthetic Corpus Generator
+Seeded frosh-intro captions, posts and RSS feeds for the benchmarks, shaped
+like the real ones: names, programs, campuses and residences, emoji,
+@mentions, hashtags and "<3". RSS captions come wrapped in the HTML rss.app
+produces (an <img>, nested <div>s, <br>s, links and character references).
+The same seed always gives the same data.
+
+Usage: python benchmarks/synthetic.py [posts] [seed]   # print a few samples
+"""
+
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "utils"))
+
+from stub_feed_server import make_feed_xml
+
+NAMES = ["maya", "arjun", "chloe", "daniel", "fatima", "kevin", "priya", "lucas", "sofia", "omar", "aalim",
+         "basim", "ruby", "karma", "sue", "pranitha", "an-nur", "emily", "jason", "zara", "noah", "leila",
+         "ethan", "mei", "isaac", "hana", "tariq", "olivia", "ryan", "aisha", "marco", "jin", "sara", "dev"]
+PROGRAMS = ["engineering", "engsci", "comp sci", "life sci", "rotman commerce", "kinesiology", "architecture",
+            "math", "psych", "econ", "health sci", "neuroscience", "political science", "music", "cog sci",
+            "mechanical engineering", "chem eng", "industrial engineering", "management", "journalism"]
+CAMPUSES = ["UTSG", "UTM", "UTSC", "st george", "mississauga", "scarborough"]
+RESIDENCES = ["chestnut", "new college", "woodsworth", "trinity", "vic", "innis", "campus one", "uc",
+              "st mikes", "whitney hall", "morrison", "sir dan", "oak house", "wilson hall", "loretto",
+              "graduate house", "erindale hall", "roy ivor", "a-house", "harmony commons"]
+HOBBIES = ["kpop", "volleyball", "matcha", "anime", "thrifting", "the gym", "chess", "baking", "f1", "hiking",
+           "photography", "skincare", "valorant", "basketball", "crocheting", "jazz", "taylor swift",
+           "bouldering", "film", "cooking", "badminton", "reading", "poetry", "league", "running"]
+HOMETOWNS = ["toronto", "markham", "brampton", "oakville", "vancouver", "calgary", "dubai", "karachi",
+             "hong kong", "seoul", "lagos", "london", "new york", "mumbai", "ottawa", "burlington"]
+EMOJI = ["✨", "🎉", "💙", "🤍", "😭", "🥹", "🔥", "💀", "🙏", "📚", "🏀", "🍵", "🌸", "😅", "🫶", "🎧", "🏐", "☕"]
+OPENERS = ["hi!!", "hey everyone!", "hii", "hello!!", "heyyyy!", "hi guys", "what's up!", "hey y'all"]
+SENTENCES = [
+    "my name is {name} and i'm from {hometown}",
+    "i'll be studying {program} at {campus} this fall",
+    "accepted my offer for {program} {emoji}",
+    "living at {residence} so hmu if you're there too",
+    "looking for roommates at {residence}!!",
+    "i'm really into {hobby} and {hobby2}",
+    "big fan of {hobby}, always down to talk about it",
+    "can't wait for frosh week {emoji}{emoji2}",
+    "dm me or follow @{handle} <3",
+    "follow me on ig @{handle}",
+    "shoutout to @{friend} for convincing me to post",
+    "kinda nervous about first year lol {emoji}",
+    "if anyone's taking {program} first year courses lets study together",
+    "i'm an introvert but i promise i'm fun once you get to know me",
+    "currently obsessed with {hobby} {emoji}",
+    "would love to find people to go to {hobby} events with",
+    "i commute from {hometown} so i'll be around campus a lot",
+    "class of 2029 let's gooo",
+    "will probably be at every club fair {emoji}",
+    "my ig is @{handle}, snap is {handle}{number}",
+    "love <3 meeting new people",
+    "also i make really good {food}",
+    "ask me about {hobby} recs!",
+    "rooming with my friend at {residence} but we want more friends",
+]
+FOODS = ["banana bread", "dumplings", "biryani", "pasta", "matcha lattes", "cookies", "ramen", "tacos"]
+HASHTAGS = ["uoft", "uoft2029", "frosh", "firstyear", "utsg", "utm", "utsc", "classof2029", "roommates"]
+
+EPOCH = datetime(2023, 5, 1, tzinfo=timezone.utc)
+
+
+def make_caption(rng):
+    """One frosh intro caption as plain text (how it is stored after cleaning)"""
+    fields = {
+        'name': rng.choice(NAMES), 'hometown': rng.choice(HOMETOWNS), 'program': rng.choice(PROGRAMS),
+        'campus': rng.choice(CAMPUSES), 'residence': rng.choice(RESIDENCES), 'hobby': rng.choice(HOBBIES),
+        'hobby2': rng.choice(HOBBIES), 'emoji': rng.choice(EMOJI), 'emoji2': rng.choice(EMOJI),
+        'handle': f"{rng.choice(NAMES)}.{rng.choice(NAMES)}{rng.randint(1, 99)}", 'friend': rng.choice(NAMES),
+        'number': rng.randint(100, 9999), 'food': rng.choice(FOODS),
+    }
+    sentences = [sentence.format(**fields) for sentence in rng.sample(SENTENCES, rng.randint(3, 8))]
+    caption = rng.choice(OPENERS) + " " + ". ".join(sentences)
+    tags = ' '.join('#' + tag for tag in rng.sample(HASHTAGS, rng.randint(0, 4)))
+    return f"{caption} {tags}".strip()
+
+
+def make_html_caption(rng, n=0):
+    """A caption the way rss.app delivers it: HTML around the text, entities escaped"""
+    text = make_caption(rng)
+    text = text.replace('&', '&amp;').replace("'", '&#39;').replace('"', '&quot;')
+    # <3 stays literal, as in real feeds; sentence breaks become <br>s
+    text = text.replace('. ', '.<br>', rng.randint(0, 3))
+    words = text.split(' ')
+    words = [f'<a href="https://www.instagram.com/explore/tags/{word[1:]}/">{word}</a>' if word.startswith('#') else word
+             for word in words]
+    return (f'<div><img src="https://scontent.cdninstagram.com/v/t51.2885-15/{n}_{rng.getrandbits(40):x}_n.jpg" '
+            f'style="width: 100%;"/><div>{" ".join(words)}</div></div>')
+
+
+def shortcode(n, seed=0):
+    """An Instagram-like 11 character shortcode, unique per (n, seed)"""
+    alphabet = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_"
+    value = (seed << 40) | n
+    chars = []
+    for _ in range(11):
+        value, digit = divmod(value, 64)
+        chars.append(alphabet[digit])
+    return ''.join(reversed(chars))
+
+
+def format_added_at(dt, rng):
+    """added_at in one of the formats found in the real corpus"""
+    style = rng.random()
+    if style < 0.6:
+        return dt.replace(tzinfo=None).isoformat()  # The RSS monitor's naive datetime.now()
+    if style < 0.9:
+        return dt.strftime('%Y-%m-%dT%H:%M:%S.000Z')  # Apify scraper timestamps
+    return dt.strftime('%B %d, %Y')  # The original import
+
+
+def make_posts(count, seed=0):
+    """count posts like all-posts.json's, oldest first"""
+    rng = random.Random(seed)
+    posts = []
+    span = (datetime(2026, 9, 1, tzinfo=timezone.utc) - EPOCH).total_seconds()
+    offsets = sorted(rng.random() * span for _ in range(count))
+    for n, offset in enumerate(offsets):
+        posts.append({
+            'caption': make_caption(rng),
+            'post_url': f"https://www.instagram.com/p/{shortcode(n, seed)}/",
+            'added_at': format_added_at(EPOCH + timedelta(seconds=offset), rng),
+        })
+    return posts
+
+
+def make_feed_entries(count, seed=0):
+    """count RSS entries (newest first) for stub_feed_server.make_feed_xml"""
+    rng = random.Random(seed)
+    newest = datetime(2026, 9, 1, tzinfo=timezone.utc)
+    entries = []
+    for n in range(count):
+        published = newest - timedelta(minutes=37 * n)
+        entries.append({
+            'title': make_caption(rng)[:60],
+            'link': f"https://www.instagram.com/p/{shortcode(n, seed + 1_000)}/",
+            'description': make_html_caption(rng, n),
+            'published': published.strftime('%a, %d %b %Y %H:%M:%S GMT'),
+        })
+    return entries
+
+
+def make_feed(count, seed=0):
+    """An RSS 2.0 document with count entries"""
+    return make_feed_xml(make_feed_entries(count, seed))
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    for post in make_posts(count, seed):
+        print(post)
+    print(make_feed_entries(1, seed)[0]['description'])
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Caption Cleaner
+Turns RSS caption HTML into the plain, single-spaced text stored in
+all-posts.json. One regex scan splits the caption into text runs, <3
+hearts, tags and character references, and each piece goes straight into
+the output with whitespace collapsed on the fly.
+
+Output matches the original multi-pass cleaner (replace <3, strip <img>,
+strip tags, unescape, collapse whitespace) on every caption in the corpus:
+- "<3" (and "<33", "<333" ...) is text, never the start of a tag
+- <img ...> disappears without leaving a gap; every other tag acts as a space,
+  including tags the old img pass would have stitched together
+- character references are decoded like html.unescape
+- runs of whitespace become one space, with none at either end
+The one known difference: a character reference split in two by an <img>
+("&am<img>p;") is no longer joined back together.
+"""
+
+import re
+from html import unescape
+
+_TOKEN_RE = re.compile(r'''
+    (?P<text>[^<&]+)
+  | (?P<heart><3)
+  | (?P<img><img[^>]*>)
+  | (?P<tag><(?:<img[^>]*>)*(?!<img)[^>](?:<img[^>]*>|(?!<img)[^>])*>)
+  | (?P<ref>&(?:\#[0-9]+;?|\#[xX][0-9a-fA-F]+;?|[^\t\n\f <&#;]{1,32};?))
+  | (?P<char>[<&])
+''', re.VERBOSE)
+
+
+def collapse_whitespace(text):
+    """Runs of whitespace as one space, none at either end. Unlike clean_caption(),
+    safe to apply to text it already produced"""
+    return ' '.join(text.split())
+
+
+def clean_caption(html_content):
+    """Clean one caption's HTML into searchable text"""
+    if not html_content:
+        return ""
+    if '<' not in html_content and '&' not in html_content:
+        # Plain text only needs its whitespace collapsed
+        return collapse_whitespace(html_content)
+
+    out = []
+    pending_space = False
+    for match in _TOKEN_RE.finditer(html_content):
+        kind = match.lastgroup
+        if kind == 'tag':
+            pending_space = True
+            continue
+        if kind == 'img':
+            continue
+
+        if kind == 'heart':
+            text = '<3'
+        elif kind == 'ref':
+            text = unescape(match.group())
+        else:
+            text = match.group()
+
+        # Text runs (and decoded references like &nbsp;) may hold whitespace:
+        # collapse it inside the run and carry it across run boundaries
+        words = text.split()
+        if not words:
+            if text:
+                pending_space = True
+            continue
+        if (pending_space or text[0].isspace()) and out:
+            out.append(' ')
+        out.append(words[0] if len(words) == 1 else ' '.join(words))
+        pending_space = text[-1].isspace()
+
+    return ''.join(out)
+
+
+def clean_many(captions):
+    """Clean an iterable of captions, yielding cleaned text in the same order"""
+    for caption in captions:
+        yield clean_caption(caption)
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Columnar Corpus Snapshot
+all-posts.bin holds the same posts as all-posts.json, one column per field,
+so tools can memory-map it and read only the columns they need: counting
+posts or scanning dates never touches a caption byte, and nothing is parsed
+up front.
+
+Layout (little-endian):
+  magic b'FFCOLS1\\n', u32 version, u32 column count, u64 post count
+  one (16-byte name, u64 offset, u64 length) entry per column
+  the columns, each starting on an 8-byte boundary:
+    id             int64[n]
+    added_at       int64[n]    UTC epoch seconds, NO_DATE when unparseable
+    url_key.off    uint64[n+1] offsets into url_key
+    url_key        UTF-8       shortcodes (see post_keys.url_key)
+    url.off        uint64[n+1]
+    url            UTF-8       the post URL, empty when it is the canonical /p/<shortcode>/ one
+    caption.off    uint64[n+1]
+    caption        UTF-8       captions back to back
+
+Posts keep all-posts.json's order (newest first). added_at is kept as a
+moment in time, not in its original text format.
+
+Usage: python scripts/columnar.py [all-posts.json]   # (re)build all-posts.bin and summarize it
+"""
+
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from datetime import datetime, timezone
+from pathlib import Path
+
+from dates import parse_added_at, to_utc_iso
+from post_keys import url_key
+
+MAGIC = b'FFCOLS1\n'
+VERSION = 1
+NO_DATE = -(1 << 63)
+_HEADER = struct.Struct('<8sIIQ')
+_COLUMN = struct.Struct('<16sQQ')
+_LITTLE = sys.byteorder == 'little'
+
+
+def canonical_url(key):
+    return f"https://www.instagram.com/p/{key}/"
+
+
+def columnar_file(snapshot_file="all-posts.json"):
+    """Where the columnar copy of a snapshot lives"""
+    return Path(snapshot_file).with_suffix('.bin')
+
+
+def _int_column(values, typecode):
+    column = array(typecode, values)
+    if not _LITTLE:
+        column.byteswap()
+    return column.tobytes()
+
+
+def _string_columns(strings):
+    """(offsets column, blob) for a list of str"""
+    encoded = [s.encode('utf-8') for s in strings]
+    offsets = [0]
+    for item in encoded:
+        offsets.append(offsets[-1] + len(item))
+    return _int_column(offsets, 'Q'), b''.join(encoded)
+
+
+def write_columnar(posts, output_file):
+    """Write posts (in order) as a columnar snapshot; returns the bytes written"""
+    keys = [url_key(post.get('post_url', '')) for post in posts]
+    urls = [post.get('post_url', '') for post in posts]
+    epochs = []
+    for post in posts:
+        dt = parse_added_at(post.get('added_at'))
+        epochs.append(int(dt.timestamp()) if dt else NO_DATE)
+
+    columns = [
+        (b'id', _int_column((post.get('id', -1) for post in posts), 'q')),
+        (b'added_at', _int_column(epochs, 'q')),
+    ]
+    for name, strings in ((b'url_key', keys),
+                          (b'url', ['' if url == canonical_url(key) else url for url, key in zip(urls, keys)]),
+                          (b'caption', [post.get('caption', '') for post in posts])):
+        offsets, blob = _string_columns(strings)
+        columns += [(name + b'.off', offsets), (name, blob)]
+
+    # Column data starts after the header and the column table, 8-byte aligned
+    position = _HEADER.size + _COLUMN.size * len(columns)
+    table = []
+    for name, data in columns:
+        position += -position % 8
+        table.append(_COLUMN.pack(name, position, len(data)))
+        position += len(data)
+
+    output_file = Path(output_file)
+    tmp_file = output_file.with_suffix(output_file.suffix + '.tmp')
+    with open(tmp_file, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, len(columns), len(posts)))
+        f.write(b''.join(table))
+        for name, data in columns:
+            f.write(b'\0' * (-f.tell() % 8))
+            f.write(data)
+        size = f.tell()
+    os.replace(tmp_file, output_file)
+    return size
+
+
+def _int_view(buffer, typecode):
+    """buffer as integers, without a copy on little-endian machines"""
+    if _LITTLE:
+        return buffer.cast(typecode)
+    column = array(typecode, bytes(buffer))
+    column.byteswap()
+    return memoryview(column)
+
+
+class StringColumn:
+    """Lazy sequence of the strings in a blob; slicing gives another view, not a copy"""
+
+    def __init__(self, offsets, blob, start=0, stop=None):
+        self._offsets = offsets
+        self._blob = blob
+        self._start = start
+        self._stop = len(offsets) - 1 if stop is None else stop
+
+    def __len__(self):
+        return self._stop - self._start
+
+    def raw(self, i):
+        """The UTF-8 bytes of item i, as a memoryview into the snapshot"""
+        i = self._index(i)
+        return self._blob[self._offsets[i]:self._offsets[i + 1]]
+
+    def _index(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("column index out of range")
+        return self._start + i
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, step = i.indices(len(self))
+            if step != 1:
+                return [self[j] for j in range(start, stop, step)]
+            return StringColumn(self._offsets, self._blob, self._start + start, self._start + max(start, stop))
+        return str(self.raw(i), 'utf-8')
+
+    def __iter__(self):
+        offsets, blob = self._offsets, self._blob
+        for i in range(self._start, self._stop):
+            yield str(blob[offsets[i]:offsets[i + 1]], 'utf-8')
+
+
+class ColumnarSnapshot:
+    """Memory-mapped reader for all-posts.bin; columns are mapped on first use"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buffer = memoryview(self._mmap)
+
+        magic, version, column_count, self.count = _HEADER.unpack_from(self._buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{self.path} is not a version {VERSION} columnar snapshot")
+        self._spans = {}
+        for n in range(column_count):
+            name, offset, length = _COLUMN.unpack_from(self._buffer, _HEADER.size + n * _COLUMN.size)
+            self._spans[name.rstrip(b'\0').decode('ascii')] = (offset, length)
+        self._columns = {}
+
+    def __len__(self):
+        return self.count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Release the mapping, or leave it to the garbage collector while handed-out views still use it"""
+        self._columns.clear()
+        try:
+            self._buffer.release()
+            self._mmap.close()
+        except BufferError:
+            pass
+
+    def _raw(self, name):
+        offset, length = self._spans[name]
+        return self._buffer[offset:offset + length]
+
+    def _column(self, name, build):
+        if name not in self._columns:
+            self._columns[name] = build()
+        return self._columns[name]
+
+    def _strings(self, name):
+        return self._column(name, lambda: StringColumn(_int_view(self._raw(name + '.off'), 'Q'), self._raw(name)))
+
+    @property
+    def ids(self):
+        """int64 post ids (-1 where a post had none)"""
+        return self._column('id', lambda: _int_view(self._raw('id'), 'q'))
+
+    @property
+    def added_at(self):
+        """int64 UTC epoch seconds, NO_DATE where added_at wasn't a date"""
+        return self._column('added_at', lambda: _int_view(self._raw('added_at'), 'q'))
+
+    @property
+    def url_keys(self):
+        """Shortcodes (or bare URLs for non-Instagram links)"""
+        return self._strings('url_key')
+
+    @property
+    def captions(self):
+        return self._strings('caption')
+
+    def url(self, i):
+        return self._strings('url')[i] or canonical_url(self.url_keys[i])
+
+    def post(self, i):
+        """Post i as an all-posts.json style dict (added_at as an ISO UTC time)"""
+        epoch = self.added_at[i]
+        post = {
+            'caption': self.captions[i],
+            'post_url': self.url(i),
+            'added_at': to_utc_iso(datetime.fromtimestamp(epoch, timezone.utc)) if epoch != NO_DATE else None,
+        }
+        if self.ids[i] >= 0:
+            post['id'] = self.ids[i]
+        return post
+
+    def posts(self, start=0, stop=None):
+        """Iterate posts start..stop as dicts"""
+        for i in range(*slice(start, stop).indices(self.count)):
+            yield self.post(i)
+
+
+def open_columnar(snapshot_file="all-posts.json"):
+    """Open the columnar copy of a snapshot, (re)building it first if it is missing or stale"""
+    snapshot_file = Path(snapshot_file)
+    bin_file = columnar_file(snapshot_file)
+    try:
+        stale = bin_file.stat().st_mtime_ns < snapshot_file.stat().st_mtime_ns
+    except FileNotFoundError:
+        stale = snapshot_file.exists() or not bin_file.exists()
+    if stale:
+        from publish import load_snapshot  # publish imports this module
+        posts = load_snapshot(snapshot_file).get('posts', [])
+        write_columnar(posts, bin_file)
+        print(f"🧱 Built {bin_file.name} ({len(posts)} posts)")
+    return ColumnarSnapshot(bin_file)
+
+
+def main():
+    snapshot_file = Path(sys.argv[1] if len(sys.argv) > 1 else "all-posts.json")
+    start = time.perf_counter()
+    with open_columnar(snapshot_file) as snapshot:
+        epochs = [epoch for epoch in snapshot.added_at if epoch != NO_DATE]
+        elapsed = time.perf_counter() - start
+        print(f"📊 {len(snapshot)} posts in {snapshot.path} ({snapshot.path.stat().st_size} bytes)")
+        if epochs:
+            earliest = datetime.fromtimestamp(min(epochs), timezone.utc)
+            latest = datetime.fromtimestamp(max(epochs), timezone.utc)
+            print(f"📅 {earliest.strftime('%B %d, %Y')} to {latest.strftime('%B %d, %Y')} "
+                  f"({len(snapshot) - len(epochs)} undated)")
+        print(f"⏱️  Opened and scanned the dates in {elapsed * 1000:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Date Index
+Every post's added_at is parsed once, into UTC epoch seconds, and kept in a
+sorted array next to the post ids. Time windows ("the last 52 weeks", "new
+posts per day") then become binary searches over that array instead of
+parsing every post's date again.
+
+date-index.json, written next to search-index.json when the site is
+published, holds the sorted index and precomputed facets:
+
+  {"version": 1, "generated": ..., "max_id": ...,
+   "epochs": [gaps between sorted epochs], "ids": [post id per epoch],
+   "undated": [ids of posts without a usable date],
+   "facets": {"day": {"2025-08-31": n}, "week": {"2025-08-25": n}, "term": {"Fall 2025": n}},
+   "cutoff": {"weeks": 52, "epoch": ..., "position": ..., "count": ...}}
+
+Weeks are keyed by their Monday; terms follow the U of T calendar (Fall:
+September-December, Winter: January-April, Summer: May-August).
+
+Usage: python scripts/date_index.py [all-posts.json]   # posts per term and in the 52-week window
+"""
+
+import json
+import sys
+import time
+from bisect import bisect_left
+from datetime import datetime, timezone
+from pathlib import Path
+
+from columnar import NO_DATE, open_columnar
+from dates import parse_added_at, to_utc_iso
+from search_index import delta_decode, delta_encode
+
+INDEX_VERSION = 1
+DAY = 86_400
+WEEK = 7 * DAY
+CUTOFF_WEEKS = 52  # The page's "this year" window
+
+
+def post_epoch(post):
+    """UTC epoch seconds of a post's added_at, or None if it isn't a date"""
+    added = parse_added_at(post.get('added_at'))
+    return int(added.timestamp()) if added else None
+
+
+def _utc(epoch):
+    return datetime.fromtimestamp(epoch, timezone.utc)
+
+
+def day_bucket(epoch):
+    """(YYYY-MM-DD, epoch the day ends at)"""
+    start = epoch - epoch % DAY
+    return _utc(start).strftime('%Y-%m-%d'), start + DAY
+
+
+def week_bucket(epoch):
+    """(YYYY-MM-DD of the week's Monday, epoch the week ends at)"""
+    day = epoch // DAY
+    start = (day - (day + 3) % 7) * DAY  # 1970-01-01 was a Thursday
+    return _utc(start).strftime('%Y-%m-%d'), start + WEEK
+
+
+def term_bucket(epoch):
+    """("Fall 2025" style term name, epoch the term ends at)"""
+    dt = _utc(epoch)
+    if dt.month >= 9:
+        name, end = f"Fall {dt.year}", datetime(dt.year + 1, 1, 1, tzinfo=timezone.utc)
+    elif dt.month >= 5:
+        name, end = f"Summer {dt.year}", datetime(dt.year, 9, 1, tzinfo=timezone.utc)
+    else:
+        name, end = f"Winter {dt.year}", datetime(dt.year, 5, 1, tzinfo=timezone.utc)
+    return name, int(end.timestamp())
+
+
+BUCKETS = {'day': day_bucket, 'week': week_bucket, 'term': term_bucket}
+
+
+class DateIndex:
+    """Posts' epochs in ascending order, with the id of each and the ids of undated posts"""
+
+    def __init__(self, pairs, undated=()):
+        pairs = sorted(pairs)
+        self.epochs = [epoch for epoch, _ in pairs]
+        self.ids = [post_id for _, post_id in pairs]
+        self.undated = list(undated)
+
+    @classmethod
+    def from_posts(cls, posts):
+        """Parse every post's added_at once; posts without an id are numbered by position"""
+        pairs, undated = [], []
+        for position, post in enumerate(posts):
+            epoch = post_epoch(post)
+            post_id = post.get('id', position)
+            if epoch is None:
+                undated.append(post_id)
+            else:
+                pairs.append((epoch, post_id))
+        return cls(pairs, undated)
+
+    @classmethod
+    def from_columnar(cls, snapshot):
+        """From a ColumnarSnapshot's already-normalized id and added_at columns"""
+        pairs, undated = [], []
+        for epoch, post_id in zip(snapshot.added_at, snapshot.ids):
+            if epoch == NO_DATE:
+                undated.append(post_id)
+            else:
+                pairs.append((epoch, post_id))
+        return cls(pairs, undated)
+
+    @classmethod
+    def load(cls, index_file="date-index.json"):
+        with open(index_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        index = cls([])
+        index.epochs = delta_decode(data['epochs'])
+        index.ids = data['ids']
+        index.undated = data['undated']
+        return index
+
+    def __len__(self):
+        return len(self.epochs) + len(self.undated)
+
+    def position(self, epoch):
+        """Index of the first post at or after epoch"""
+        return bisect_left(self.epochs, epoch)
+
+    def between(self, start=None, end=None):
+        """(lo, hi) such that epochs[lo:hi] are the posts in [start, end)"""
+        lo = 0 if start is None else self.position(start)
+        hi = len(self.epochs) if end is None else bisect_left(self.epochs, end, lo)
+        return lo, hi
+
+    def count_between(self, start=None, end=None):
+        lo, hi = self.between(start, end)
+        return hi - lo
+
+    def ids_between(self, start=None, end=None):
+        lo, hi = self.between(start, end)
+        return self.ids[lo:hi]
+
+    def earliest(self):
+        return _utc(self.epochs[0]) if self.epochs else None
+
+    def latest(self):
+        return _utc(self.epochs[-1]) if self.epochs else None
+
+    def histogram(self, unit='day'):
+        """[(bucket key, count)] oldest first; one binary search per non-empty bucket"""
+        bucket = BUCKETS[unit]
+        counts = []
+        i = 0
+        while i < len(self.epochs):
+            key, end = bucket(self.epochs[i])
+            j = bisect_left(self.epochs, end, i)
+            counts.append((key, j - i))
+            i = j
+        return counts
+
+    def cutoff(self, now=None, weeks=CUTOFF_WEEKS):
+        """Where the last `weeks` weeks start: {weeks, epoch, position, count}"""
+        epoch = int(now if now is not None else time.time()) - weeks * WEEK
+        position = self.position(epoch)
+        return {"weeks": weeks, "epoch": epoch, "position": position, "count": len(self.epochs) - position}
+
+    def to_dict(self, now=None):
+        return {
+            "version": INDEX_VERSION,
+            "generated": to_utc_iso(_utc(int(now if now is not None else time.time()))),
+            "max_id": max(self.ids + self.undated, default=-1),
+            "epochs": delta_encode(self.epochs),
+            "ids": self.ids,
+            "undated": self.undated,
+            "facets": {unit: dict(self.histogram(unit)) for unit in BUCKETS},
+            "cutoff": self.cutoff(now),
+        }
+
+
+def build_date_index(posts, output_file="date-index.json"):
+    """Write date-index.json for posts and return the DateIndex"""
+    index = DateIndex.from_posts(posts)
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(index.to_dict(), f, separators=(',', ':'))
+    print(f"✅ Wrote {Path(output_file).name} ({len(index.epochs)} dated, {len(index.undated)} undated posts)")
+    return index
+
+
+def main():
+    start = time.perf_counter()
+    with open_columnar(sys.argv[1] if len(sys.argv) > 1 else "all-posts.json") as snapshot:
+        index = DateIndex.from_columnar(snapshot)
+    cutoff = index.cutoff()
+    print(f"📅 {len(index)} posts, {index.earliest():%B %d, %Y} to {index.latest():%B %d, %Y} "
+          f"({len(index.undated)} undated)" if index.epochs else f"📅 {len(index)} posts, none dated")
+    print(f"🗓️  {cutoff['count']} posts in the last {cutoff['weeks']} weeks")
+    print("\nPosts per term:")
+    for term, count in index.histogram('term'):
+        print(f"  {term}: {count}")
+    print(f"\n⏱️  {(time.perf_counter() - start) * 1000:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
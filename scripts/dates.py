@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Post Date Helpers
+added_at values in all-posts.json come in several formats: naive ISO times
+from the RSS monitor, ISO times with a Z suffix from the Apify scraper and
+"July 09, 2025" style dates from the original import.
+"""
+
+from datetime import datetime, timezone
+
+_TEXT_FORMATS = ('%B %d, %Y',)
+
+
+def parse_added_at(value):
+    """Parse an added_at value into an aware UTC datetime, or None if it isn't a date.
+
+    Naive ISO times are treated as UTC (the monitor runs on GitHub Actions,
+    where local time is UTC).
+    """
+    if not value:
+        return None
+
+    try:
+        dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        for fmt in _TEXT_FORMATS:
+            try:
+                dt = datetime.strptime(value, fmt)
+                break
+            except ValueError:
+                continue
+        else:
+            return None
+
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def to_utc_iso(dt):
+    """Format an aware datetime as an ISO string with a Z suffix"""
+    return dt.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Corpus Deltas
+Gives the published corpus a version that goes up by one each time its
+posts change, and writes the posts each version added or changed as a small
+delta file. The page keeps the corpus it loaded in IndexedDB, so a returning
+visitor fetches versions.json plus the deltas since the cached version
+instead of the month shards:
+
+  deltas/versions.json  {"version": 1, "corpus_version": n, "total_posts", "max_id", "last_updated",
+                         "deltas": [{"version", "file", "count"}] oldest first}
+  deltas/NNNNNN.json    {"version": n, "base": n - 1, "posts": [posts as in the shards, with t],
+                         "removed": [ids]}
+
+- The monitor adds a delta for the posts each run appends (add_delta()).
+- Publishing compares the corpus with the shards it is about to replace
+  (diff_delta()). A compaction that changed nothing leaves the version as
+  it is; a reprocess or a re-tag becomes a delta of the changed posts.
+- Only the newest MAX_DELTAS deltas are kept, and a change to more than
+  MAX_DELTA_POSTS posts gets a version without a delta. A visitor who can't
+  reach the current version through the deltas (or would fetch more than
+  MAX_DELTA_POSTS posts doing it) loads the shards again, as on a first
+  visit.
+
+Usage: python scripts/deltas.py [site dir]   # list the versions and deltas
+"""
+
+import json
+import sys
+from pathlib import Path
+
+from date_index import post_epoch
+from shards import write_if_changed
+
+DELTAS_VERSION = 1
+MAX_DELTAS = 100
+MAX_DELTA_POSTS = 2000  # Past this the shards are about as cheap (index.html has the same limit)
+
+
+def delta_post(post):
+    """The post as the shards hold it: t (UTC epoch seconds) added when it has a date"""
+    post = {k: v for k, v in post.items() if k != 't'}
+    epoch = post_epoch(post)
+    if epoch is not None:
+        post['t'] = epoch
+    return post
+
+
+def load_versions(deltas_dir="deltas"):
+    """versions.json, or None if there is none (or it is unreadable or outdated)"""
+    try:
+        with open(Path(deltas_dir) / "versions.json", 'r', encoding='utf-8') as f:
+            versions = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return versions if versions.get('version') == DELTAS_VERSION else None
+
+
+def _write_versions(deltas_dir, versions):
+    deltas_dir.mkdir(parents=True, exist_ok=True)
+    write_if_changed(deltas_dir / "versions.json", json.dumps(versions, ensure_ascii=False, separators=(',', ':')))
+
+
+def _prune(deltas_dir, deltas):
+    """Drop delta files no longer listed"""
+    current = {delta['file'] for delta in deltas}
+    for path in deltas_dir.glob("[0-9]*.json"):
+        if path.name not in current:
+            path.unlink()
+            path.with_name(path.name + '.gz').unlink(missing_ok=True)
+
+
+def start_versions(posts, deltas_dir="deltas", last_updated=None, after=0):
+    """A version after `after` with no delta to reach it: every visitor loads the shards once"""
+    deltas_dir = Path(deltas_dir)
+    versions = {
+        "version": DELTAS_VERSION,
+        "corpus_version": after + 1,
+        "total_posts": len(posts),
+        "max_id": max((post['id'] for post in posts if 'id' in post), default=-1),
+        "last_updated": last_updated,
+        "deltas": [],
+    }
+    _write_versions(deltas_dir, versions)
+    _prune(deltas_dir, [])
+    print(f"🔖 Corpus version {after + 1}: {len(posts)} posts, loaded in full")
+    return versions
+
+
+def write_delta(versions, changed_posts, removed_ids=(), deltas_dir="deltas", total_posts=None, last_updated=None):
+    """Record the next corpus version: changed_posts (added or replaced, by id) minus removed_ids.
+
+    Returns the new corpus version.
+    """
+    deltas_dir = Path(deltas_dir)
+    version = versions['corpus_version'] + 1
+    filename = f"{version:06d}.json"
+    posts = [delta_post(post) for post in changed_posts]
+    deltas_dir.mkdir(parents=True, exist_ok=True)
+    write_if_changed(deltas_dir / filename, json.dumps({
+        "version": version,
+        "base": version - 1,
+        "posts": posts,
+        "removed": sorted(removed_ids),
+    }, ensure_ascii=False, separators=(',', ':')))
+
+    delta = {"version": version, "file": filename, "count": len(posts) + len(removed_ids)}
+    deltas = (versions['deltas'] + [delta])[-MAX_DELTAS:]
+    # The delta is on disk before versions.json points at it
+    _write_versions(deltas_dir, dict(
+        versions,
+        corpus_version=version,
+        total_posts=versions['total_posts'] + len(posts) - len(removed_ids) if total_posts is None else total_posts,
+        max_id=max([versions['max_id']] + [post['id'] for post in posts]),
+        last_updated=last_updated,
+        deltas=deltas,
+    ))
+    _prune(deltas_dir, deltas)
+    print(f"🔖 Corpus version {version}: {len(posts)} posts added or changed, {len(removed_ids)} removed")
+    return version
+
+
+def add_delta(new_posts, deltas_dir="deltas", last_updated=None):
+    """Record a version adding new_posts (which have ids not published before); returns it, or None
+    when there are no versions yet (the next publish starts them)"""
+    versions = load_versions(deltas_dir)
+    if versions is None or not new_posts:
+        return None
+    return write_delta(versions, new_posts, (), deltas_dir, last_updated=last_updated)
+
+
+def published_posts(shards_dir="posts"):
+    """{id: post} of the posts in the shards as they are on disk"""
+    shards_dir = Path(shards_dir)
+    posts = {}
+    for path in shards_dir.glob("*.json"):
+        if path.name == "manifest.json":
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            for post in json.load(f).get('posts', []):
+                posts[post['id']] = post
+    return posts
+
+
+def diff_delta(posts, shards_dir="posts", deltas_dir="deltas", last_updated=None):
+    """Record a version for whatever posts changed since the shards were written; call before
+    rewriting them. Returns the corpus version (unchanged if no post changed)."""
+    versions = load_versions(deltas_dir)
+    if versions is None:
+        return start_versions(posts, deltas_dir, last_updated)['corpus_version']
+
+    try:
+        previous = published_posts(shards_dir)
+    except (OSError, ValueError, KeyError) as e:
+        # Without the old shards there is nothing to diff against
+        print(f"⚠️  Can't read the published shards: {e}")
+        return start_versions(posts, deltas_dir, last_updated, versions['corpus_version'])['corpus_version']
+
+    changed = []
+    for post in posts:
+        shard_post = previous.pop(post['id'], None)
+        # t follows from added_at, so the posts are compared without it (no date parsing)
+        if shard_post is not None:
+            shard_post.pop('t', None)
+        if shard_post != (post if 't' not in post else {k: v for k, v in post.items() if k != 't'}):
+            changed.append(post)
+    removed = list(previous)  # Published ids the corpus no longer has
+    if not changed and not removed:
+        print(f"ℹ️  Corpus version {versions['corpus_version']} is current")
+        return versions['corpus_version']
+    if len(changed) + len(removed) > MAX_DELTA_POSTS:
+        return start_versions(posts, deltas_dir, last_updated, versions['corpus_version'])['corpus_version']
+    return write_delta(versions, changed, removed, deltas_dir, len(posts), last_updated)
+
+
+def main():
+    deltas_dir = Path(sys.argv[1] if len(sys.argv) > 1 else ".") / "deltas"
+    versions = load_versions(deltas_dir)
+    if versions is None:
+        print(f"❌ No corpus versions in {deltas_dir}")
+        return 1
+    print(f"🔖 Corpus version {versions['corpus_version']}: {versions['total_posts']} posts, "
+          f"updated {versions['last_updated']}")
+    for delta in versions['deltas']:
+        size = (deltas_dir / delta['file']).stat().st_size
+        print(f"  {delta['version']:>6}  {delta['file']}  {delta['count']:>5} posts  {size:>8} bytes")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+Caption Entities and Facets
+Posts are tagged once, when they are ingested, with the U of T places and
+programs their caption names and the accounts it @mentions:
+
+  post["entities"] = {"campus": ["UTSG"], "college": ["Woodsworth College"],
+                      "residence": ["Chestnut Residence"], "program": ["Rotman Commerce"],
+                      "mention": ["uoft_frosh.29"]}
+
+(kinds with nothing found are left out). Names come from the curated
+dictionary below; a residence also tags its college and campus, a college
+its campus.
+
+facets.json, written next to search-index.json when the site is published,
+turns the tags into one set of post ids per value, so the page can filter
+by several values and count every chip with set intersections instead of
+scanning captions:
+
+  {"version": 1, "max_id": ..., "total_posts": ...,
+   "facets": {"residence": {"Chestnut Residence": {"count": 73, "bits": "<base64>"}},
+              "mention": {"uoft_frosh.29": {"count": 3, "ids": [gaps between ids]}}}}
+
+Each set is a bitmap (bit i % 8 of byte i // 8 is post id i, base64) or, when
+that is smaller, gap-encoded ids. Mentions are only listed once at least
+MIN_MENTION_POSTS posts share them.
+
+Usage: python scripts/entities.py [all-posts.json] [kind=value ...]   # facet counts, within a selection
+"""
+
+import base64
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+from search_index import delta_decode, delta_encode
+
+FACETS_VERSION = 1
+FACET_KINDS = ('campus', 'college', 'residence', 'program', 'mention')
+MIN_MENTION_POSTS = 2
+MENTION_RE = re.compile(r'@([a-zA-Z0-9._]+)')
+_WORD_RE = re.compile(r'[a-z0-9]+')
+# Punctuation that ends a clause; a period only at the end of a sentence, and not in "st."
+_BREAK_RE = re.compile(r"[!?,;:|()\n/•·]|(?<!\bst)\.(?=\s|$)")
+
+CAMPUSES = {
+    "UTSG": ("utsg", "st george", "st george campus", "uoft sg", "u of t sg"),
+    "UTM": ("utm", "uoft mississauga", "u of t mississauga", "mississauga campus"),
+    "UTSC": ("utsc", "uoft scarborough", "u of t scarborough", "scarborough campus"),
+}
+
+# The St. George colleges
+COLLEGES = {
+    "Innis College": ("innis", "innis college"),
+    "New College": ("new college",),
+    "St. Michael's College": ("st mikes", "st michaels", "st michaels college", "smc", "saint michaels"),
+    "Trinity College": ("trinity", "trinity college", "trin"),
+    "University College": ("university college", "uc"),
+    "Victoria College": ("victoria college", "vic", "victoria university", "vic one"),
+    "Woodsworth College": ("woodsworth", "woodsworth college"),
+}
+
+# name: (college or None, campus, aliases)
+RESIDENCES = {
+    "Chestnut Residence": (None, "UTSG", ("chestnut", "chestnut residence", "chestnut res")),
+    "Campus One": (None, "UTSG", ("campus one", "campusone")),
+    "Innis Residence": ("Innis College", "UTSG", ("innis residence", "innis res")),
+    "New College Residence": ("New College", "UTSG", ("new college residence", "new college res", "wilson hall",
+                                                      "45 willcocks", "wetmore hall", "wetmore")),
+    "Morrison Hall": ("University College", "UTSG", ("morrison", "morrison hall")),
+    "Whitney Hall": ("University College", "UTSG", ("whitney hall",)),
+    "Sir Daniel Wilson": ("University College", "UTSG", ("sir dan", "sir daniel wilson", "sir dans")),
+    "St. Hilda's College": ("Trinity College", "UTSG", ("st hildas", "st hildas college")),
+    "Burwash Hall": ("Victoria College", "UTSG", ("burwash", "burwash hall")),
+    "Annesley Hall": ("Victoria College", "UTSG", ("annesley", "annesley hall")),
+    "Margaret Addison Hall": ("Victoria College", "UTSG", ("margaret addison", "margaret addison hall")),
+    "Rowell Jackman Hall": ("Victoria College", "UTSG", ("rowell jackman", "rowell jackman hall")),
+    "Elmsley Hall": ("St. Michael's College", "UTSG", ("elmsley", "elmsley hall")),
+    "Loretto College": ("St. Michael's College", "UTSG", ("loretto", "loretto college")),
+    "Sorbara Hall": ("St. Michael's College", "UTSG", ("sorbara", "sorbara hall")),
+    "Woodsworth Residence": ("Woodsworth College", "UTSG", ("woodsworth residence", "woodsworth res")),
+    "Roy Ivor Hall": (None, "UTM", ("roy ivor", "roy ivor hall")),
+    "Oscar Peterson Hall": (None, "UTM", ("oscar peterson", "oscar peterson hall")),
+    "Erindale Hall": (None, "UTM", ("erindale hall",)),
+    "MaGrath Valley": (None, "UTM", ("magrath", "magrath valley")),
+    "McLuhan Court": (None, "UTM", ("mcluhan court",)),
+    "Putnam Place": (None, "UTM", ("putnam place",)),
+    "Schreiber Wood": (None, "UTM", ("schreiber wood",)),
+    "Joan Foley Hall": (None, "UTSC", ("joan foley", "joan foley hall")),
+    "UTSC Student Village": (None, "UTSC", ("student village",)),
+}
+
+# Program names, leaving out words that usually mean something else ("music", "english", "bio" as in "link in bio")
+PROGRAMS = {
+    "Engineering": ("engineering", "eng", "engineer"),
+    "Engineering Science": ("engineering science", "engsci", "eng sci"),
+    "Track One Engineering": ("track one", "trackone"),
+    "Mechanical Engineering": ("mechanical engineering", "mech eng", "mechanical"),
+    "Electrical & Computer Engineering": ("electrical engineering", "computer engineering", "ece",
+                                          "electrical and computer engineering"),
+    "Civil Engineering": ("civil engineering",),
+    "Chemical Engineering": ("chemical engineering", "chem eng"),
+    "Industrial Engineering": ("industrial engineering",),
+    "Mineral Engineering": ("mineral engineering",),
+    "Computer Science": ("computer science", "comp sci", "compsci", "cs"),
+    "Data Science": ("data science",),
+    "Mathematics": ("mathematics", "math", "maths"),
+    "Statistics": ("statistics", "stats"),
+    "Actuarial Science": ("actuarial science", "actuarial"),
+    # "&" is not a word character, so "physical & mathematical" reads "physical mathematical"
+    "Physical & Mathematical Sciences": ("physical sciences", "physical science", "physical and mathematical",
+                                         "physical and mathematical sciences", "physical mathematical sciences"),
+    "Physics": ("physics",),
+    "Astronomy": ("astronomy", "astrophysics"),
+    "Chemistry": ("chemistry", "chem"),
+    "Life Sciences": ("life sciences", "life science", "life sci", "lifesci"),
+    "Biology": ("biology",),
+    "Biochemistry": ("biochemistry", "biochem"),
+    "Human Biology": ("human biology", "hmb"),
+    "Neuroscience": ("neuroscience", "neuro"),
+    "Immunology": ("immunology",),
+    "Pharmacology": ("pharmacology",),
+    "Health Sciences": ("health sciences", "health science", "health studies"),
+    "Forensic Science": ("forensic science", "forensics", "forensic"),
+    "Environmental Science": ("environmental science", "environmental studies"),
+    "Kinesiology": ("kinesiology", "kin", "kpe"),
+    "Nursing": ("nursing",),
+    "Psychology": ("psychology", "psych"),
+    "Cognitive Science": ("cognitive science", "cog sci", "cogsci"),
+    "Rotman Commerce": ("rotman", "rotman commerce", "commerce"),
+    "Management": ("management", "bba"),
+    "Economics": ("economics", "econ"),
+    "Social Sciences": ("social sciences", "social science", "social sci"),
+    "Humanities": ("humanities",),
+    "Political Science": ("political science", "poli sci", "polisci"),
+    "International Relations": ("international relations",),
+    "Criminology": ("criminology", "crim"),
+    "Sociology": ("sociology",),
+    "Anthropology": ("anthropology",),
+    "Philosophy": ("philosophy",),
+    "Linguistics": ("linguistics",),
+    "Cinema Studies": ("cinema studies", "cinema", "film studies"),
+    "Architecture": ("architecture", "daniels", "architectural studies"),
+    "Music": ("faculty of music", "music performance", "music education", "music program"),
+    "Drama": ("theatre and performance", "drama centre"),
+}
+
+
+def _alias_table():
+    """{normalized alias: [(kind, name), ...]} with the tags each alias implies"""
+    table = {}
+
+    def add(aliases, tags):
+        for alias in aliases:
+            table.setdefault(alias, [])
+            table[alias].extend(tag for tag in tags if tag not in table[alias])
+
+    for name, aliases in CAMPUSES.items():
+        add(aliases, [('campus', name)])
+    for name, aliases in COLLEGES.items():
+        add(aliases, [('college', name), ('campus', 'UTSG')])
+    for name, (college, campus, aliases) in RESIDENCES.items():
+        add(aliases, [('residence', name)] + ([('college', college)] if college else []) + [('campus', campus)])
+    for name, aliases in PROGRAMS.items():
+        add(aliases, [('program', name)])
+    return table
+
+
+ALIASES = _alias_table()
+# Longest alias (in words) starting with each word that starts a multi-word alias
+_LONGEST_FROM = {}
+for _alias in ALIASES:
+    _first, *_rest = _alias.split()
+    if _rest:
+        _LONGEST_FROM[_first] = max(_LONGEST_FROM.get(_first, 1), len(_rest) + 1)
+# Words an alias can start with; every other word is skipped without a lookup per length
+_STARTS = frozenset(ALIASES) | frozenset(_LONGEST_FROM)
+
+
+def _clauses(caption):
+    """Each clause of a caption as a list of lowercase words ("St. Mike's" -> ["st", "mikes"]), so that
+    no alias spans "...on campus. One of..." """
+    for clause in _BREAK_RE.split(caption.lower()):
+        yield _WORD_RE.findall(clause.replace("'", '').replace('’', '').replace('.', ''))
+
+
+def _aliases(words):
+    """Aliases in a clause, left to right, the longest one at each position ("engineering science",
+    not "engineering")"""
+    end = 0
+    for i in [i for i, word in enumerate(words) if word in _STARTS]:
+        if i < end:
+            continue  # Inside the alias just found
+        for n in range(min(_LONGEST_FROM.get(words[i], 1), len(words) - i), 0, -1):
+            alias = words[i] if n == 1 else ' '.join(words[i:i + n])
+            if alias in ALIASES:
+                yield alias
+                end = i + n
+                break
+
+
+def extract_entities(caption):
+    """{kind: [names in order of first mention]} for one caption"""
+    if not caption:
+        return {}
+    entities = {}
+    for words in _clauses(caption):
+        for alias in _aliases(words):
+            for kind, name in ALIASES[alias]:
+                names = entities.setdefault(kind, [])
+                if name not in names:
+                    names.append(name)
+
+    mentions = []
+    for handle in MENTION_RE.findall(caption):
+        handle = handle.rstrip('.').lower()
+        if handle and handle not in mentions:
+            mentions.append(handle)
+    if mentions:
+        entities['mention'] = mentions
+    return {kind: entities[kind] for kind in FACET_KINDS if kind in entities}
+
+
+def tag_posts(posts, retag=False):
+    """Add entities to the posts that don't have them yet (to all of them with retag); returns how many"""
+    tagged = 0
+    for post in posts:
+        if retag or 'entities' not in post:
+            post['entities'] = extract_entities(post.get('caption', ''))
+            tagged += 1
+    return tagged
+
+
+def _bitmap(ids):
+    """Python int with bit i set for each id i"""
+    if not ids:
+        return 0
+    bits = bytearray(max(ids) // 8 + 1)
+    for post_id in ids:
+        bits[post_id >> 3] |= 1 << (post_id & 7)
+    return int.from_bytes(bits, 'little')
+
+
+def bitmap_ids(bitmap):
+    """Sorted ids of the bits set in bitmap"""
+    ids = []
+    for byte_index, byte in enumerate(bitmap.to_bytes((bitmap.bit_length() + 7) // 8, 'little')):
+        while byte:
+            low = byte & -byte
+            ids.append(byte_index * 8 + low.bit_length() - 1)
+            byte ^= low
+    return ids
+
+
+def popcount(bitmap):
+    """Bits set in bitmap (int.bit_count() needs Python 3.10; the workflow runs 3.9)"""
+    return bin(bitmap).count('1')
+
+
+def _bitmap_bytes(bitmap):
+    return bitmap.to_bytes((bitmap.bit_length() + 7) // 8, 'little')
+
+
+class FacetIndex:
+    """One post-id bitmap (a Python int) per facet value"""
+
+    def __init__(self, bitmaps=None, max_id=-1, total_posts=0, ids=None):
+        self.bitmaps = bitmaps or {kind: {} for kind in FACET_KINDS}
+        self.max_id = max_id
+        self.total_posts = total_posts
+        # {kind: {name: sorted ids}} when built from posts, so writing needn't decode the bitmaps
+        self._ids = ids
+
+    @classmethod
+    def from_posts(cls, posts):
+        """Posts need ids (see shards.assign_post_ids); untagged ones are tagged on the fly"""
+        ids = {kind: {} for kind in FACET_KINDS}
+        max_id = -1
+        for post in posts:
+            entities = post['entities'] if 'entities' in post else extract_entities(post.get('caption', ''))
+            post_id = post['id']
+            max_id = max(max_id, post_id)
+            for kind, names in entities.items():
+                for name in names:
+                    ids[kind].setdefault(name, []).append(post_id)
+
+        # Mentions of a single post can't narrow anything down
+        ids['mention'] = {name: found for name, found in ids['mention'].items() if len(found) >= MIN_MENTION_POSTS}
+        ids = {kind: {name: sorted(found) for name, found in values.items()} for kind, values in ids.items()}
+        bitmaps = {kind: {name: _bitmap(found) for name, found in values.items()} for kind, values in ids.items()}
+        return cls(bitmaps, max_id, len(posts), ids)
+
+    @classmethod
+    def load(cls, facets_file="facets.json"):
+        with open(facets_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        bitmaps = {kind: {} for kind in FACET_KINDS}
+        for kind, values in data['facets'].items():
+            for name, entry in values.items():
+                if 'bits' in entry:
+                    bitmaps[kind][name] = int.from_bytes(base64.b64decode(entry['bits']), 'little')
+                else:
+                    bitmaps[kind][name] = _bitmap(delta_decode(entry['ids']))
+        return cls(bitmaps, data['max_id'], data['total_posts'])
+
+    def to_dict(self):
+        facets = {}
+        for kind, values in self.bitmaps.items():
+            facets[kind] = {}
+            for name, bitmap in sorted(values.items(), key=lambda item: (-popcount(item[1]), item[0])):
+                count = popcount(bitmap)
+                bits_length = (bitmap.bit_length() + 7) // 8 * 4 // 3
+                # Whichever is shorter: a bitmap for common values, ids for rare ones (every
+                # gap takes at least two characters, so only then are the ids worth listing)
+                if count * 2 < bits_length:
+                    ids = self._ids[kind][name] if self._ids else bitmap_ids(bitmap)
+                    gaps = delta_encode(ids)
+                    if len(json.dumps(gaps, separators=(',', ':'))) <= bits_length:
+                        facets[kind][name] = {"count": count, "ids": gaps}
+                        continue
+                facets[kind][name] = {"count": count, "bits": base64.b64encode(_bitmap_bytes(bitmap)).decode('ascii')}
+        return {"version": FACETS_VERSION, "max_id": self.max_id, "total_posts": self.total_posts, "facets": facets}
+
+    def bitmap(self, kind, name):
+        return self.bitmaps.get(kind, {}).get(name, 0)
+
+    def select(self, selections):
+        """Bitmap of the posts having every (kind, name) in selections; None selects everything"""
+        result = None
+        for kind, name in selections:
+            bitmap = self.bitmap(kind, name)
+            result = bitmap if result is None else result & bitmap
+        return result
+
+    def counts(self, kind, within=None):
+        """{name: posts with it (among the within bitmap, if given)}, most common first"""
+        counts = {}
+        for name, bitmap in self.bitmaps.get(kind, {}).items():
+            count = popcount(bitmap if within is None else bitmap & within)
+            if count:
+                counts[name] = count
+        return dict(sorted(counts.items(), key=lambda item: (-item[1], item[0])))
+
+
+def build_facet_index(posts, output_file="facets.json"):
+    """Write facets.json for posts and return the FacetIndex"""
+    index = FacetIndex.from_posts(posts)
+    output_file = Path(output_file)
+    try:
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(index.to_dict(), f, ensure_ascii=False, separators=(',', ':'))
+        values = sum(len(values) for values in index.bitmaps.values())
+        print(f"✅ Wrote {output_file} ({values} facet values, {output_file.stat().st_size} bytes)")
+    except IOError as e:
+        print(f"❌ Error saving {output_file}: {e}")
+    return index
+
+
+def main():
+    snapshot_file = Path(sys.argv[1] if len(sys.argv) > 1 else "all-posts.json")
+    facets_file = snapshot_file.with_name("facets.json")
+    if facets_file.exists():
+        index = FacetIndex.load(facets_file)
+    else:
+        from publish import load_snapshot
+        from shards import assign_post_ids
+        posts = load_snapshot(snapshot_file).get('posts', [])
+        assign_post_ids(posts)
+        index = build_facet_index(posts, facets_file)
+
+    selections = [tuple(arg.split('=', 1)) for arg in sys.argv[2:] if '=' in arg]
+    start = time.perf_counter()
+    within = index.select(selections)
+    counts = {kind: index.counts(kind, within) for kind in FACET_KINDS}
+    elapsed = time.perf_counter() - start
+
+    if selections:
+        print(f"🔎 {0 if within is None else popcount(within)} posts with "
+              + ", ".join(f"{kind} {name}" for kind, name in selections))
+    for kind in FACET_KINDS:
+        top = list(counts[kind].items())[:10]
+        print(f"\n{kind.capitalize()} ({len(counts[kind])} values):")
+        for name, count in top:
+            print(f"  {name}: {count}")
+    print(f"\n⏱️  Counted every facet in {elapsed * 1000:.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Streaming JSON Arrays
+Reads the items of a top-level JSON array one at a time, so an Apify
+scraper dump of any size is processed in roughly the memory of one post.
+The file is read in fixed-size chunks and each item is decoded with
+json.JSONDecoder.raw_decode as soon as it is complete in the buffer.
+"""
+
+import json
+
+CHUNK_SIZE = 1 << 20  # 1 MiB
+MAX_ITEM_SIZE = 256 << 20  # Give up on an item (likely malformed JSON) past this many characters
+
+
+def iter_json_array(source, chunk_size=CHUNK_SIZE):
+    """Yield the items of the JSON array in source (a path or a text file object)"""
+    if isinstance(source, (str, bytes)) or hasattr(source, '__fspath__'):
+        with open(source, 'r', encoding='utf-8') as f:
+            yield from iter_json_array(f, chunk_size)
+        return
+
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    eof = False
+
+    def fill():
+        """Drop what was consumed and read one more chunk; False at end of file"""
+        nonlocal buffer, position, eof
+        chunk = source.read(chunk_size)
+        buffer = buffer[position:] + chunk
+        position = 0
+        eof = not chunk
+        return not eof
+
+    def skip_whitespace():
+        nonlocal position
+        while True:
+            while position < len(buffer) and buffer[position] in ' \t\r\n':
+                position += 1
+            if position < len(buffer) or not fill():
+                return
+
+    skip_whitespace()
+    if buffer[position:position + 1] != '[':
+        raise ValueError("expected a JSON array")
+    position += 1
+
+    first = True
+    while True:
+        skip_whitespace()
+        if position >= len(buffer):
+            raise ValueError("unterminated JSON array")
+        if buffer[position] == ']':
+            return
+        if not first:
+            if buffer[position] != ',':
+                raise ValueError(f"expected ',' or ']' in JSON array, got {buffer[position]!r}")
+            position += 1
+            skip_whitespace()
+        first = False
+
+        while True:
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # The item runs past the buffer; read more unless there is no more
+                if len(buffer) - position > MAX_ITEM_SIZE or not fill():
+                    raise
+                continue
+            if (end == len(buffer) or buffer[end] not in ' \t\r\n,]') and not eof and fill():
+                # A number cut by the chunk boundary ("4." of "4.5") decodes
+                # early; decode it again with the rest of it
+                continue
+            break
+        position = end
+        yield item
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Run Metrics
+Per-phase wall-clock timers and counters for one monitor run, written out as
+a JSON file at the end so a run's cost can be read without digging through
+its log. Optional profiling dumps a cProfile and a tracemalloc snapshot.
+
+  metrics = RunMetrics()
+  with metrics.phase('fetch'):
+      ...
+  metrics.count('entries_seen', len(entries))
+  metrics.save('data/run-metrics.json')
+"""
+
+import cProfile
+import json
+import os
+import platform
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+from dates import to_utc_iso
+
+PHASES = ('fetch', 'parse', 'clean', 'dedup', 'merge', 'similar', 'save')
+LOG_LEVELS = {'debug': 10, 'info': 20, 'warning': 30, 'error': 40}
+TRACEMALLOC_TOP = 25  # Allocation sites listed in the tracemalloc report
+
+
+def log_level(name=None):
+    """Numeric level for a LOG_LEVEL name (default: the LOG_LEVEL env var, else info)"""
+    name = (name or os.getenv('LOG_LEVEL') or 'info').lower()
+    return LOG_LEVELS.get(name, LOG_LEVELS['info'])
+
+
+def _bytes_written():
+    """Bytes this thread has passed to write() so far (Linux only, else None)"""
+    try:
+        with open('/proc/thread-self/io', 'rb') as f:
+            for line in f:
+                if line.startswith(b'wchar:'):
+                    return int(line.split()[1])
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+class RunMetrics:
+    """Timers and counters for one run; not shared between threads"""
+
+    def __init__(self, name=None):
+        self.name = name
+        self.started = to_utc_iso(datetime.now(timezone.utc))
+        self.timers = {}  # phase -> total seconds
+        self.calls = {}  # phase -> times entered
+        self.counters = {}
+        self._start = time.perf_counter()
+        self._start_bytes = _bytes_written()
+
+    @contextmanager
+    def phase(self, name):
+        """Time a block; phases may repeat and their times add up"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timers[name] = self.timers.get(name, 0.0) + time.perf_counter() - start
+            self.calls[name] = self.calls.get(name, 0) + 1
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def to_dict(self):
+        written = _bytes_written()
+        counters = dict(self.counters)
+        if written is not None and self._start_bytes is not None:
+            # Everything written since the run started: files and log output alike
+            counters['bytes_written'] = written - self._start_bytes
+        return {
+            'name': self.name,
+            'started': self.started,
+            'finished': to_utc_iso(datetime.now(timezone.utc)),
+            'total_seconds': round(time.perf_counter() - self._start, 6),
+            'phases': {phase: {'seconds': round(seconds, 6), 'calls': self.calls[phase]}
+                       for phase, seconds in self.timers.items()},
+            'counters': counters,
+            'python': platform.python_version(),
+        }
+
+    def summary(self):
+        """One line per phase plus the counters, for the end of the run's log"""
+        data = self.to_dict()
+        lines = [f"⏱️  Run took {data['total_seconds']:.2f}s"]
+        ordered = [phase for phase in PHASES if phase in data['phases']]
+        ordered += [phase for phase in data['phases'] if phase not in PHASES]
+        for phase in ordered:
+            lines.append(f"   {phase:<8} {data['phases'][phase]['seconds']:>8.3f}s")
+        if data['counters']:
+            lines.append("   " + ", ".join(f"{name}={value}" for name, value in data['counters'].items()))
+        return "\n".join(lines)
+
+    def save(self, metrics_file):
+        """Write the metrics JSON (replaced on every run)"""
+        metrics_file = Path(metrics_file)
+        try:
+            metrics_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(metrics_file, 'w', encoding='utf-8') as f:
+                json.dump(self.to_dict(), f, indent=2)
+        except IOError as e:
+            print(f"⚠️  Error saving run metrics: {e}")
+
+
+@contextmanager
+def profiled(output_dir, enabled=True):
+    """Profile the block: output_dir/profile.prof (cProfile) and tracemalloc.txt"""
+    if not enabled:
+        yield
+        return
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    tracemalloc.start()
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        profiler.dump_stats(output_dir / "profile.prof")
+        with open(output_dir / "tracemalloc.txt", 'w', encoding='utf-8') as f:
+            f.write(f"current {current / 1e6:.1f} MB, peak {peak / 1e6:.1f} MB\n\n")
+            for stat in snapshot.statistics('lineno')[:TRACEMALLOC_TOP]:
+                f.write(f"{stat}\n")
+        print(f"🔬 Profile written to {output_dir / 'profile.prof'} and {output_dir / 'tracemalloc.txt'}")
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(15)
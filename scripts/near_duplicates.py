@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Near-Duplicate Captions
+MinHash signatures plus locality-sensitive hashing (LSH) over caption
+shingles, so a repost with an edited emoji or an extra hashtag is caught
+without comparing every pair of posts.
+
+- Captions are normalized (lowercase, single spaces) and cut into overlapping
+  character shingles.
+- Each caption gets a MinHash signature. One-permutation hashing sends every
+  shingle hash to one of num_perm bins and keeps the minimum per bin. Empty
+  bins borrow from the next filled bin. That is one hash per shingle instead
+  of num_perm, which keeps pure Python fast enough for 100k+ posts.
+- Each slot keeps only the top byte of its minimum (b-bit MinHash), so a
+  signature is NUM_PERM bytes. Unequal minima share a top byte 1 time in
+  256, which the similarity estimate corrects for.
+- Signatures are split into bands. Posts sharing any whole band land in the
+  same bucket and become candidates. Only candidates are compared, and the
+  estimated Jaccard similarity (from the share of equal signature slots) decides.
+- Identical normalized captions always match, even ones too short to shingle
+  (including the empty caption), so the index replaces the old exact-set check.
+- data/posts.minhash.bin (SignatureFile) keeps the signature of every logged
+  post, appended along with the log and rebuilt when it is compacted, so the
+  monitor loads the index instead of re-hashing the corpus.
+
+Usage:
+  python scripts/near_duplicates.py [posts.json|posts.jsonl] [threshold]   # report clusters
+"""
+
+import hashlib
+import os
+import struct
+import sys
+from collections import defaultdict
+from operator import eq
+from pathlib import Path
+from zlib import crc32
+
+DEFAULT_THRESHOLD = float(os.getenv('DUPLICATE_THRESHOLD', '0.8'))
+NUM_PERM = 128
+SHINGLE_SIZE = 5
+
+_MAX_HASH = (1 << 64) - 1
+_GOLDEN = 0x9E3779B97F4A7C15  # Odd 64-bit multiplier for hash mixing
+
+
+def normalize_caption(caption):
+    """Normalize caption for comparison"""
+    if not caption:
+        return ""
+    return ' '.join(caption.strip().lower().split())
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """Set of overlapping character shingles of a normalized caption"""
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def minhash_signature(shingle_set, num_perm=NUM_PERM):
+    """One-permutation MinHash signature (a tuple of num_perm ints), or None when empty"""
+    if not shingle_set:
+        return None
+
+    # crc32 runs in C and is the same in every process (unlike hash()); the
+    # multiply spreads it over 64 bits. Estimates match a cryptographic hash's.
+    values = sorted(((crc32(shingle.encode('utf-8')) * _GOLDEN) & _MAX_HASH for shingle in shingle_set),
+                    reverse=True)
+    # Later (smaller) values overwrite earlier ones, leaving each bin's minimum
+    lowest = {value % num_perm: value for value in values}
+
+    bins = [lowest.get(slot) for slot in range(num_perm)]
+    if len(lowest) < num_perm:
+        # Densify: an empty bin takes the value of the next filled bin (wrapping
+        # around), shifted by the distance so borrowed values stay distinct
+        next_filled = min(lowest) + num_perm
+        for slot in range(num_perm - 1, -1, -1):
+            if bins[slot] is not None:
+                next_filled = slot
+            else:
+                bins[slot] = lowest[next_filled % num_perm] + (next_filled - slot) * _GOLDEN
+    return tuple(bins)
+
+
+def lsh_bands(threshold, num_perm=NUM_PERM):
+    """(bands, rows) splitting num_perm, with the S-curve threshold (1/b)^(1/r)
+    as high as possible without going over threshold, so candidates are
+    found generously and the similarity check decides"""
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        if (1 / bands) ** (1 / rows) <= threshold:
+            best = (bands, rows)
+    return best
+
+
+def compact_signature(signature):
+    """The top byte of every slot of a minhash_signature(), as bytes (None stays None)"""
+    if signature is None:
+        return None
+    return bytes((value >> 56) & 0xFF for value in signature)
+
+
+def estimated_similarity(signature_a, signature_b):
+    """Estimated Jaccard similarity of two compact signatures"""
+    equal = sum(map(eq, signature_a, signature_b)) / len(signature_a)
+    # P(equal slot) = J + (1 - J) / 256, since unequal minima share a top byte 1 time in 256
+    return max(0.0, (equal - 1 / 256) / (1 - 1 / 256))
+
+
+class NearDuplicateIndex:
+    """Captions indexed by key (a post id or URL) for near-duplicate lookups"""
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, num_perm=NUM_PERM, shingle_size=SHINGLE_SIZE):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.bands, self.rows = lsh_bands(threshold, num_perm)
+
+        self.signatures = {}  # key -> compact signature
+        self.exact = {}  # normalized caption -> first key with it
+        self.buckets = [defaultdict(list) for _ in range(self.bands)]  # per band: band values -> keys
+
+        # Union-find over the duplicate pairs seen by add(), for clusters()
+        self._parent = {}
+        self.comparisons = 0  # Candidate signatures compared so far
+
+    def signature(self, caption):
+        """(normalized caption, compact signature or None)"""
+        normalized = normalize_caption(caption)
+        return normalized, compact_signature(minhash_signature(shingles(normalized, self.shingle_size), self.num_perm))
+
+    def candidates(self, signature):
+        """Keys sharing at least one whole band with signature"""
+        rows = self.rows
+        found = set()
+        for band, buckets in enumerate(self.buckets):
+            found.update(buckets.get(signature[band * rows:(band + 1) * rows], ()))
+        return found
+
+    def query(self, caption, _signed=None):
+        """[(key, similarity)] of indexed captions at or above the threshold, most similar first"""
+        normalized, signature = _signed or self.signature(caption)
+        matches = {}
+        exact_key = self.exact.get(normalized)
+        if exact_key is not None:
+            matches[exact_key] = 1.0
+
+        if signature is not None:
+            candidates = self.candidates(signature)
+            self.comparisons += len(candidates)
+            for key in candidates:
+                if key in matches:
+                    continue
+                similarity = estimated_similarity(signature, self.signatures[key])
+                if similarity >= self.threshold:
+                    matches[key] = similarity
+
+        return sorted(matches.items(), key=lambda item: -item[1])
+
+    def find(self, caption):
+        """Key of the most similar indexed caption, or None"""
+        matches = self.query(caption)
+        return matches[0][0] if matches else None
+
+    def add(self, key, caption, _signed=None):
+        """Index a caption and return the keys it duplicates (most similar first)"""
+        signed = _signed or self.signature(caption)
+        matches = self.query(caption, signed)
+
+        normalized, signature = signed
+        self.exact.setdefault(normalized, key)
+        self.insert(key, signature)
+
+        self._parent.setdefault(key, key)
+        for other, _ in matches:
+            self._union(key, other)
+        return [other for other, _ in matches]
+
+    def insert(self, key, signature):
+        """Index a compact signature under key, without looking for its duplicates"""
+        if signature is None:
+            return
+        self.signatures[key] = signature
+        rows = self.rows
+        for band, buckets in enumerate(self.buckets):
+            buckets[signature[band * rows:(band + 1) * rows]].append(key)
+
+    def _find_root(self, key):
+        parent = self._parent
+        while parent[key] != key:
+            parent[key] = parent[parent[key]]
+            key = parent[key]
+        return key
+
+    def _union(self, a, b):
+        root_a, root_b = self._find_root(a), self._find_root(b)
+        if root_a != root_b:
+            self._parent[root_b] = root_a
+
+    def clusters(self):
+        """Groups of two or more keys linked by near-duplicate matches, largest first"""
+        groups = defaultdict(list)
+        for key in self._parent:
+            groups[self._find_root(key)].append(key)
+        return sorted((keys for keys in groups.values() if len(keys) > 1), key=len, reverse=True)
+
+    def __len__(self):
+        return len(self._parent)
+
+
+class SignatureFile:
+    """Compact signatures of logged posts, keyed by post id, in fixed-size binary records:
+
+      <post id: int64> <blake2b of the normalized caption: 8 bytes> <signature: NUM_PERM bytes>
+
+    A post without a signature (an empty caption) has a signature of zero bytes. The
+    caption hash lets a rewrite keep the signatures of captions that didn't change.
+    Exact caption matches aren't kept here: PostKeys holds those (see post_keys.py).
+    """
+
+    RECORD = struct.Struct(f'<q8s{NUM_PERM}s')
+    NO_SIGNATURE = bytes(NUM_PERM)
+
+    def __init__(self, signatures_file="data/posts.minhash.bin"):
+        self.signatures_file = Path(signatures_file)
+        self.next_id = 0  # One past the highest id covered
+
+    @staticmethod
+    def _caption_hash(normalized):
+        return hashlib.blake2b(normalized.encode('utf-8'), digest_size=8).digest()
+
+    def _records(self):
+        with open(self.signatures_file, 'rb') as f:
+            data = f.read()
+        # A partial last record from an interrupted append is left out
+        usable = len(data) - len(data) % self.RECORD.size
+        return self.RECORD.iter_unpack(memoryview(data)[:usable])
+
+    def load(self, index):
+        """Insert every stored signature into index; False when there is no file"""
+        try:
+            records = self._records()
+        except FileNotFoundError:
+            return False
+        for post_id, _, signature in records:
+            if signature != self.NO_SIGNATURE:
+                index.insert(post_id, signature)
+            if post_id >= self.next_id:
+                self.next_id = post_id + 1
+        return True
+
+    def append(self, posts, index=None):
+        """Add the signatures of posts that were just appended to the log (to the file if
+        there is one, and to index if given)"""
+        if index is None:
+            index = NearDuplicateIndex()
+        records = []
+        for post in posts:
+            normalized, signature = index.signature(post.get('caption', ''))
+            caption_hash = self._caption_hash(normalized)
+            index.insert(post['id'], signature)
+            records.append(self.RECORD.pack(post['id'], caption_hash, signature or self.NO_SIGNATURE))
+            self.next_id = max(self.next_id, post['id'] + 1)
+        if self.signatures_file.exists():
+            with open(self.signatures_file, 'ab') as f:
+                f.write(b''.join(records))
+
+    def rewrite(self, posts, index=None):
+        """Atomically replace the file with the signatures of posts, reusing stored
+        ones for unchanged captions; they are inserted into index if given"""
+        previous = {}
+        try:
+            for post_id, caption_hash, signature in self._records():
+                previous[post_id] = (caption_hash, signature)
+        except FileNotFoundError:
+            pass
+
+        if index is None:
+            index = NearDuplicateIndex()
+        self.next_id = 0
+        self.signatures_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.signatures_file.with_suffix(self.signatures_file.suffix + ".tmp")
+        with open(tmp_file, 'wb') as f:
+            for post in posts:
+                caption_hash = self._caption_hash(normalize_caption(post.get('caption', '')))
+                stored = previous.get(post['id'])
+                if stored and stored[0] == caption_hash:
+                    signature = stored[1] if stored[1] != self.NO_SIGNATURE else None
+                else:
+                    _, signature = index.signature(post.get('caption', ''))
+                index.insert(post['id'], signature)
+                f.write(self.RECORD.pack(post['id'], caption_hash, signature or self.NO_SIGNATURE))
+                self.next_id = max(self.next_id, post['id'] + 1)
+        os.replace(tmp_file, self.signatures_file)
+
+
+def build_index(posts, threshold=DEFAULT_THRESHOLD, key='post_url'):
+    """Index every post's caption under post[key]"""
+    index = NearDuplicateIndex(threshold)
+    for position, post in enumerate(posts):
+        index.add(post.get(key, position), post.get('caption', ''))
+    return index
+
+
+def report_clusters(index, captions, limit=10):
+    """Print the near-duplicate clusters found so far; captions maps key -> caption"""
+    clusters = index.clusters()
+    duplicates = sum(len(cluster) - 1 for cluster in clusters)
+    print(f"♻️  {len(clusters)} near-duplicate clusters ({duplicates} duplicate posts) "
+          f"among {len(index)} posts at similarity >= {index.threshold}")
+    for number, cluster in enumerate(clusters[:limit], 1):
+        print(f"\n{number}. {len(cluster)} posts:")
+        for key in cluster[:5]:
+            caption = captions.get(key) or ''
+            print(f"   {key}: {caption[:80]}{'...' if len(caption) > 80 else ''}")
+    return clusters
+
+
+def main():
+    import json
+
+    source = sys.argv[1] if len(sys.argv) > 1 else 'all-posts.json'
+    threshold = float(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_THRESHOLD
+
+    if source.endswith('.jsonl'):
+        from post_log import PostLog
+        posts, _ = PostLog(source).current_posts()
+    else:
+        with open(source, 'r', encoding='utf-8') as f:
+            posts = json.load(f)['posts']
+
+    index = build_index(posts, threshold)
+    report_clusters(index, {post.get('post_url'): post.get('caption', '') for post in posts})
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Adaptive Poll Schedule
+Decides when rss_monitor.py --watch polls the feed next:
+
+- a base interval by season: every 5 minutes in August, when most frosh
+  posts go up, every 15 minutes in July and September, hourly otherwise
+- after each poll that finds nothing new the interval doubles, up to
+  MAX_BACKOFF times the base (and never past MAX_INTERVAL); a poll that
+  finds new posts drops it back to the base
+- +/- JITTER of random spread, so watchers started together drift apart
+- a rate budget: never more than budget_per_day polls in any 24 hours
+
+Times are UTC epoch seconds, so the schedule can be driven by a simulated
+clock (see utils/stub_feed_server.py simulate).
+"""
+
+import random
+from collections import deque
+from datetime import datetime, timezone
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+# Base interval per month (UTC): the August posting peak, its shoulders, the rest of the year
+PEAK_INTERVAL = 5 * MINUTE
+SHOULDER_INTERVAL = 15 * MINUTE
+OFF_PEAK_INTERVAL = HOUR
+MONTH_INTERVALS = {8: PEAK_INTERVAL, 7: SHOULDER_INTERVAL, 9: SHOULDER_INTERVAL}
+
+BACKOFF = 2
+MAX_BACKOFF = 16  # Longest interval, as a multiple of the base
+MAX_INTERVAL = 6 * HOUR
+JITTER = 0.1
+DAILY_POLL_BUDGET = 240
+
+
+def base_interval(now):
+    """Seconds between polls at now when every poll finds something"""
+    month = datetime.fromtimestamp(now, timezone.utc).month
+    return MONTH_INTERVALS.get(month, OFF_PEAK_INTERVAL)
+
+
+class PollSchedule:
+    """Exponential backoff on a seasonal base interval, with jitter and a daily poll budget"""
+
+    def __init__(self, budget_per_day=DAILY_POLL_BUDGET, jitter=JITTER, seed=None):
+        self.budget_per_day = budget_per_day
+        self.jitter = jitter
+        self.empty_polls = 0  # Polls in a row that found nothing new
+        self.polls = deque()  # Times of the polls in the last day
+        self.rng = random.Random(seed)
+
+    def record(self, now, found_new):
+        """Note a poll made at now and whether it found new posts"""
+        self.polls.append(now)
+        while self.polls and self.polls[0] <= now - DAY:
+            self.polls.popleft()
+        self.empty_polls = 0 if found_new else self.empty_polls + 1
+
+    def interval(self, now):
+        """Backed-off interval before jitter and the budget"""
+        base = base_interval(now)
+        backoff = BACKOFF ** min(self.empty_polls, 32)
+        return min(base * min(backoff, MAX_BACKOFF), max(base, MAX_INTERVAL))
+
+    def next_delay(self, now):
+        """Seconds from now until the next poll"""
+        delay = self.interval(now) * self.rng.uniform(1 - self.jitter, 1 + self.jitter)
+
+        # Over budget: wait until the oldest poll that counts against it is a day old
+        when = now + delay
+        recent = [poll for poll in self.polls if poll > when - DAY]
+        if len(recent) >= self.budget_per_day:
+            when = recent[len(recent) - self.budget_per_day] + DAY
+        return when - now
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Post Key Index
+data/posts.keys.tsv lists the dedup keys of every post in the log, so the
+monitor can drop feed entries it already has without reading the log or
+cleaning a single caption. One line per post record:
+
+  <id> TAB <url key> TAB <caption hash>
+
+The url key is the Instagram shortcode (the same post under /p/ or /reel/,
+with or without a trailing slash, gives the same key), or the bare URL for
+anything else. The caption hash is a short blake2b of the normalized caption.
+A line with an empty caption hash is an alias: a repost's URL pointing at the
+post it duplicates, so the repost is not looked at again.
+PostLog keeps the file in step: appends add lines, compaction rewrites it
+(keeping the aliases).
+"""
+
+import hashlib
+import os
+import re
+from pathlib import Path
+
+from near_duplicates import normalize_caption
+
+_SHORTCODE_RE = re.compile(r'instagram\.com/(?:[^/?#]+/)?(?:p|reels?|tv)/([A-Za-z0-9_-]+)')
+
+
+def url_key(url):
+    """Key identifying the post a URL points to"""
+    if not url:
+        return ""
+    match = _SHORTCODE_RE.search(url)
+    if match:
+        return match.group(1)
+    return url.strip().split('#', 1)[0].split('?', 1)[0].rstrip('/')
+
+
+def caption_hash(caption):
+    """Short hash of a cleaned caption, equal for captions that differ only in case/spacing"""
+    return hashlib.blake2b(normalize_caption(caption).encode('utf-8'), digest_size=8).hexdigest()
+
+
+class PostKeys:
+    """url key -> post id and caption hash -> post id, backed by a TSV file"""
+
+    def __init__(self, keys_file="data/posts.keys.tsv"):
+        self.keys_file = Path(keys_file)
+        self.by_url = {}
+        self.by_caption = {}
+        self.next_id = 0  # One past the highest id covered
+
+    def load(self):
+        """Read the key file; False when there is none"""
+        try:
+            with open(self.keys_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    fields = line.rstrip('\n').split('\t')
+                    if len(fields) != 3:
+                        continue  # A partial last line from an interrupted append
+                    self._remember(int(fields[0]), fields[1], fields[2])
+        except FileNotFoundError:
+            return False
+        return True
+
+    def _remember(self, post_id, url, caption):
+        if url:
+            self.by_url[url] = post_id
+        if caption:
+            self.by_caption[caption] = post_id
+        if post_id >= self.next_id:
+            self.next_id = post_id + 1
+
+    @staticmethod
+    def _keys(post):
+        return url_key(post.get('post_url', '')), caption_hash(post.get('caption', ''))
+
+    def find_url(self, url):
+        """Id of the post at url, or None"""
+        return self.by_url.get(url_key(url))
+
+    def has_url(self, url):
+        return url_key(url) in self.by_url
+
+    def find_caption(self, caption):
+        """Id of a post with the same normalized caption, or None"""
+        return self.by_caption.get(caption_hash(caption))
+
+    def append(self, posts):
+        """Add posts that were just appended to the log"""
+        lines = []
+        for post in posts:
+            url, caption = self._keys(post)
+            self._remember(post['id'], url, caption)
+            lines.append(f"{post['id']}\t{url}\t{caption}\n")
+        with open(self.keys_file, 'a', encoding='utf-8') as f:
+            f.writelines(lines)
+
+    def add_alias(self, url, post_id):
+        """Record that url is a repost of post_id"""
+        key = url_key(url)
+        self._remember(post_id, key, "")
+        with open(self.keys_file, 'a', encoding='utf-8') as f:
+            f.write(f"{post_id}\t{key}\t\n")
+
+    def rewrite(self, posts):
+        """Atomically replace the key file with the keys of posts, keeping aliases"""
+        previous = PostKeys(self.keys_file)
+        previous.load()
+
+        self.by_url, self.by_caption, self.next_id = {}, {}, 0
+        self.keys_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.keys_file.with_suffix(self.keys_file.suffix + ".tmp")
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            for post in posts:
+                url, caption = self._keys(post)
+                self._remember(post['id'], url, caption)
+                f.write(f"{post['id']}\t{url}\t{caption}\n")
+            for url, post_id in previous.by_url.items():
+                if url not in self.by_url and post_id < self.next_id:
+                    self._remember(post_id, url, "")
+                    f.write(f"{post_id}\t{url}\t\n")
+        os.replace(tmp_file, self.keys_file)
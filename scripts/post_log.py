@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Append-Only Post Log
+data/posts.jsonl is the source of truth for the corpus: one JSON post per
+line, each run only appends the posts it found. Compaction folds the log
+(a later record for the same post id supersedes an earlier one) and
+rewrites it with one record per post; publish.py turns the compacted posts
+into all-posts.json and the site data. Records also keep the caption as it
+was fetched (raw_caption, the feed's HTML or the scraper's text) so
+reprocess.py can clean it again; published_post() leaves it out of
+everything the site serves. data/posts.keys.tsv (see post_keys.py)
+and data/posts.minhash.bin (caption signatures, see near_duplicates.py) are
+kept in step with the log so dedup checks never have to read it.
+"""
+
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+
+from dates import to_utc_iso
+from near_duplicates import NearDuplicateIndex, SignatureFile
+from post_keys import PostKeys
+from shards import assign_post_ids
+
+LOG_ONLY_FIELDS = ('raw_caption',)  # Kept in the log, never published
+
+
+def published_post(post):
+    """post without the fields only the log keeps"""
+    if not any(field in post for field in LOG_ONLY_FIELDS):
+        return post
+    return {key: value for key, value in post.items() if key not in LOG_ONLY_FIELDS}
+
+
+class PostLog:
+    def __init__(self, log_file="data/posts.jsonl"):
+        self.log_file = Path(log_file)
+        # Small sidecar so appends never have to read the log itself
+        self.state_file = self.log_file.with_name(self.log_file.stem + ".state.json")
+        # url / caption keys of every post, loaded without parsing the log
+        self.keys_file = self.log_file.with_name(self.log_file.stem + ".keys.tsv")
+        # Near-duplicate signatures of every caption, loaded without hashing the log
+        self.signatures_file = self.log_file.with_name(self.log_file.stem + ".minhash.bin")
+
+    def exists(self):
+        return self.log_file.exists()
+
+    def load_state(self):
+        """Load {next_id, records_since_compaction, last_compacted}"""
+        if self.state_file.exists():
+            try:
+                with open(self.state_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except (json.JSONDecodeError, IOError) as e:
+                print(f"⚠️  Error loading {self.state_file}: {e}")
+
+        # Without the sidecar, rebuild it from the log so ids are never reused
+        records = list(self.iter_records())
+        return {
+            "next_id": max((record.get('id', -1) for record in records), default=-1) + 1,
+            "records_since_compaction": len(records),
+            "last_compacted": None,
+        }
+
+    def save_state(self, state):
+        with open(self.state_file, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+
+    def iter_records(self):
+        """Yield every record in the log, oldest first"""
+        if not self.log_file.exists():
+            return
+        with open(self.log_file, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as e:
+                    # A run killed mid-append can leave a partial last line
+                    print(f"⚠️  Skipping unreadable line {line_number} of {self.log_file}: {e}")
+
+    def keys(self):
+        """The PostKeys of the log, rebuilt from it when missing or behind"""
+        keys = PostKeys(self.keys_file)
+        if not keys.load() or keys.next_id < self.load_state()['next_id']:
+            posts, _ = self.current_posts()
+            keys.rewrite(posts)
+            print(f"🔑 Rebuilt {self.keys_file} ({len(posts)} posts)")
+        return keys
+
+    def duplicate_index(self):
+        """NearDuplicateIndex of the log's captions keyed by post id, rebuilt from the log when
+        its signature file is missing or behind"""
+        index = NearDuplicateIndex()
+        signatures = SignatureFile(self.signatures_file)
+        if not signatures.load(index) or signatures.next_id < self.load_state()['next_id']:
+            posts, _ = self.current_posts()
+            index = NearDuplicateIndex()
+            signatures.rewrite(posts, index)
+            print(f"🔑 Rebuilt {self.signatures_file} ({len(posts)} posts)")
+        return index
+
+    def append(self, posts, keys=None, duplicates=None):
+        """Append posts to the log, giving each new post the next id.
+
+        Posts that already have an id are appended as-is and supersede the
+        earlier record for that id at the next compaction. keys and
+        duplicates, the caller's keys() and duplicate_index(), get the new
+        posts too.
+        """
+        if not posts:
+            return []
+
+        state = self.load_state()
+        for post in posts:
+            if 'id' not in post:
+                post['id'] = state['next_id']
+                state['next_id'] += 1
+            else:
+                state['next_id'] = max(state['next_id'], post['id'] + 1)
+
+        self.log_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.log_file, 'a', encoding='utf-8') as f:
+            for post in posts:
+                f.write(json.dumps(post, ensure_ascii=False, separators=(',', ':')) + '\n')
+        # Before the state, so a key file at least as new as the state is complete
+        if keys is not None:
+            keys.append(posts)
+        elif self.keys_file.exists():
+            PostKeys(self.keys_file).append(posts)
+        if duplicates is not None or self.signatures_file.exists():
+            SignatureFile(self.signatures_file).append(posts, duplicates)
+
+        state['records_since_compaction'] += len(posts)
+        self.save_state(state)
+        return posts
+
+    def seed(self, posts):
+        """Create the log from an existing corpus (e.g. all-posts.json)"""
+        assign_post_ids(posts)
+        self._rewrite(sorted(posts, key=lambda p: p['id']))
+        print(f"🌱 Seeded {self.log_file} with {len(posts)} posts")
+
+    def current_posts(self):
+        """Fold the log (latest record per post id wins) without touching it.
+
+        Returns (posts ordered by id, number of records read).
+        """
+        latest = {}
+        records = 0
+        for record in self.iter_records():
+            records += 1
+            if 'id' in record:
+                latest[record['id']] = record
+        return [latest[post_id] for post_id in sorted(latest)], records
+
+    def compact(self, posts=None):
+        """Fold the log into one record per post id and rewrite it.
+
+        posts, when the caller already holds the folded log (ordered by id),
+        saves reading it again. Returns the current posts ordered by id.
+        """
+        if posts is None:
+            posts, records = self.current_posts()
+            print(f"🗜️  Compacted {records} log records into {len(posts)} posts")
+        self._rewrite(posts)
+        return posts
+
+    def _rewrite(self, posts):
+        """Atomically replace the log with posts and reset the compaction counter"""
+        self.log_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.log_file.with_suffix(self.log_file.suffix + ".tmp")
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            for post in posts:
+                f.write(json.dumps(post, ensure_ascii=False, separators=(',', ':')) + '\n')
+        os.replace(tmp_file, self.log_file)
+        PostKeys(self.keys_file).rewrite(posts)
+        SignatureFile(self.signatures_file).rewrite(posts)
+
+        self.save_state({
+            "next_id": max((post['id'] for post in posts), default=-1) + 1,
+            "records_since_compaction": 0,
+            "last_compacted": to_utc_iso(datetime.now(timezone.utc)),
+        })
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Precompression
+Writes a .gz copy next to every text asset the site serves, so serve.py can
+hand out gzip without compressing on each request. Only files whose .gz is
+missing or older than the file itself are recompressed.
+
+Usage: python scripts/precompress.py [site_dir]
+"""
+
+import gzip
+import sys
+from pathlib import Path
+
+COMPRESSIBLE_SUFFIXES = {'.html', '.json', '.js', '.css', '.svg', '.txt', '.xml'}
+MIN_SIZE = 1024  # Smaller files gain too little to be worth it
+
+
+def precompress_file(path):
+    """Write path + '.gz' if it is missing or stale; returns True if written"""
+    path = Path(path)
+    gz_path = path.with_name(path.name + '.gz')
+    if gz_path.exists() and gz_path.stat().st_mtime_ns >= path.stat().st_mtime_ns:
+        return False
+
+    data = path.read_bytes()
+    # mtime=0 keeps the output byte-identical for identical input
+    gz_path.write_bytes(gzip.compress(data, compresslevel=9, mtime=0))
+    return True
+
+
+def precompress_site(site_dir="."):
+    """Precompress every compressible asset under site_dir"""
+    site_dir = Path(site_dir)
+    written = 0
+    for path in site_dir.rglob('*'):
+        if any(part.startswith('.') for part in path.relative_to(site_dir).parts):
+            continue
+        if path.suffix in COMPRESSIBLE_SUFFIXES and path.is_file() and path.stat().st_size >= MIN_SIZE:
+            if precompress_file(path):
+                written += 1
+    if written:
+        print(f"🗜️  Precompressed {written} files")
+    return written
+
+
+def main():
+    precompress_site(sys.argv[1] if len(sys.argv) > 1 else ".")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
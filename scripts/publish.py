@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Site Data Publisher
+Builds every file the website loads from the corpus: the all-posts.json
+snapshot, the per-month post shards with their manifest, the search index,
+the date index, the search vocabulary, the entity facets, the similar-post
+lists, the pre-rendered result pages and the corpus version with its deltas, plus all-posts.bin, the columnar copy the Python tools read (see columnar.py).
+
+Usage: python scripts/publish.py [all-posts.json]
+Compacts data/posts.jsonl and republishes everything from it.
+"""
+
+import json
+import os
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+from columnar import columnar_file, write_columnar
+from date_index import build_date_index
+from dates import to_utc_iso
+from deltas import diff_delta
+from entities import build_facet_index, tag_posts
+from post_log import PostLog, published_post
+from result_pages import write_result_pages
+from precompress import precompress_site
+from search_index import build_search_index
+from shards import assign_post_ids, sort_newest_first, write_shards
+from similar_posts import build_similar_posts
+from vocabulary import build_vocabulary
+
+
+def publish_site_data(all_posts_data, site_dir="."):
+    """Assign post ids, tag entities and regenerate the shards, indexes and result pages in site_dir"""
+    site_dir = Path(site_dir)
+    posts = all_posts_data.get('posts', [])
+
+    assigned = assign_post_ids(posts)
+    if assigned:
+        print(f"🔢 Assigned ids to {assigned} posts")
+    tagged = tag_posts(posts)
+    if tagged:
+        print(f"🏷️  Tagged entities in {tagged} posts")
+
+    # Compared with the shards before they are rewritten
+    diff_delta(posts, site_dir / "posts", site_dir / "deltas", all_posts_data.get('last_updated'))
+    write_shards(posts, site_dir / "posts", all_posts_data.get('last_updated'))
+    build_search_index(posts, site_dir / "search-index.json")
+    build_date_index(posts, site_dir / "date-index.json")
+    build_vocabulary(posts, site_dir / "vocabulary.json")
+    build_facet_index(posts, site_dir / "facets.json")
+    build_similar_posts(posts, site_dir / "similar")
+    write_result_pages(posts, site_dir / "pages", all_posts_data.get('last_updated'))
+    return assigned
+
+
+def save_snapshot(all_posts_data, snapshot_file="all-posts.json"):
+    """Write the all-posts.json snapshot and the site data built from it"""
+    snapshot_file = Path(snapshot_file)
+    publish_site_data(all_posts_data, snapshot_file.parent)
+
+    try:
+        # Through a temporary file, so readers never see a half-written snapshot
+        tmp_file = snapshot_file.with_name(snapshot_file.name + ".tmp")
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(all_posts_data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_file, snapshot_file)
+        print(f"✅ Updated {snapshot_file.name} with {len(all_posts_data['posts'])} total posts")
+        # Written after the JSON, so it is never older than the snapshot it mirrors
+        write_columnar(all_posts_data['posts'], columnar_file(snapshot_file))
+    except IOError as e:
+        print(f"❌ Error saving {snapshot_file.name}: {e}")
+
+    # Gzip variants for serve.py, rebuilt only for the files that changed
+    precompress_site(snapshot_file.parent)
+
+
+def load_snapshot(snapshot_file="all-posts.json"):
+    """Load all-posts.json, or an empty corpus if it is missing or unreadable"""
+    snapshot_file = Path(snapshot_file)
+    if snapshot_file.exists():
+        try:
+            with open(snapshot_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (json.JSONDecodeError, IOError) as e:
+            print(f"⚠️  Error loading {snapshot_file.name}: {e}")
+    return {"total_posts": 0, "posts": []}
+
+
+def ensure_post_log(post_log, snapshot_file="all-posts.json"):
+    """Seed the post log from all-posts.json the first time it is used"""
+    if not post_log.exists():
+        posts = load_snapshot(snapshot_file).get('posts', [])
+        post_log.seed(posts)
+
+
+def compact_and_publish(post_log, snapshot_file="all-posts.json", posts=None):
+    """Fold the post log into the all-posts.json snapshot and republish the site data.
+
+    posts: the folded log (ordered by id) if the caller already has it.
+    """
+    ensure_post_log(post_log, snapshot_file)
+    if posts is None:
+        posts, records = post_log.current_posts()
+        print(f"🗜️  Compacted {records} log records into {len(posts)} posts")
+    # Posts logged before entity tagging existed keep their tags in the rewritten log
+    tag_posts(posts)
+    posts = post_log.compact(posts)
+
+    all_posts_data = {
+        "total_posts": len(posts),
+        "last_updated": to_utc_iso(datetime.now(timezone.utc)),
+        "posts": sort_newest_first([published_post(post) for post in posts]),
+    }
+    save_snapshot(all_posts_data, snapshot_file)
+    return all_posts_data
+
+
+def main():
+    """Compact the post log and publish all-posts.json and the site data"""
+    snapshot_file = Path(sys.argv[1] if len(sys.argv) > 1 else "all-posts.json")
+    compact_and_publish(PostLog(snapshot_file.parent / "data" / "posts.jsonl"), snapshot_file)
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Corpus Reprocessing
+Re-applies the current caption pipeline (clean_caption, then
+extract_entities) to every post in the log, so a change to the cleaning or
+tagging rules reaches the posts stored before it. Captions that predate
+today's <3 or whitespace rules are one example.
+
+- The input is the caption as it was fetched, which the log keeps as
+  raw_caption (the feed's HTML or the scraper's text).
+- Posts logged before raw captions were kept only have the cleaned caption.
+  clean_caption() can't run on that again: it would unescape and strip tags
+  a second time ("&lt;b&gt; bold" is stored as "<b> bold", which would
+  become "bold"). They only get the stages that are safe on their own
+  output, collapse_whitespace() and extract_entities().
+- Posts go to a process pool in chunks of CHUNK_SIZE.
+- data/reprocess-cache.tsv remembers, for each input, a hash of the output
+  it gave. Inputs are keyed by a hash of the raw caption (or of the cleaned
+  one, for posts without it) plus the pipeline version. Posts whose input
+  and stored output both match the cache are skipped.
+- The pipeline version covers PIPELINE_VERSION and the source of the
+  modules that do the work. Editing a rule invalidates the cache by itself.
+- Changed posts are written by compacting the log, which replaces it
+  atomically, and then the site is republished from it.
+
+Usage: python scripts/reprocess.py [all-posts.json] [--workers N] [--dry-run]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import caption_cleaner
+import entities
+from caption_cleaner import clean_caption, collapse_whitespace
+from entities import extract_entities
+from post_log import PostLog
+from publish import compact_and_publish, ensure_post_log
+
+PIPELINE_VERSION = 3  # Bump for pipeline changes outside the modules below
+PIPELINE_MODULES = (caption_cleaner, entities)
+CHUNK_SIZE = 500
+MIN_PARALLEL = 2 * CHUNK_SIZE  # Fewer posts than this aren't worth starting a pool for
+
+
+def pipeline_version():
+    """Fingerprint of PIPELINE_VERSION and the pipeline modules' source"""
+    digest = hashlib.blake2b(str(PIPELINE_VERSION).encode(), digest_size=8)
+    for module in PIPELINE_MODULES:
+        digest.update(Path(module.__file__).read_bytes())
+    return digest.hexdigest()
+
+
+def process_caption(raw_caption, caption=None):
+    """The current pipeline: (clean caption, entities). Without a raw caption, only the
+    stages that are safe on cleaned text run on the stored caption."""
+    if raw_caption is not None:
+        cleaned = clean_caption(raw_caption)
+    else:
+        cleaned = collapse_whitespace(caption or '')
+    return cleaned, extract_entities(cleaned)
+
+
+def process_chunk(chunk):
+    """[(post id, caption, entities)] for a chunk of (post id, raw caption or None, caption);
+    runs in the pool's workers"""
+    return [(post_id, *process_caption(raw_caption, caption)) for post_id, raw_caption, caption in chunk]
+
+
+def pipeline_input(post):
+    """(post id, raw caption or None, caption): what the pipeline runs on for post"""
+    return post['id'], post.get('raw_caption'), post.get('caption', '')
+
+
+def input_key(version, post):
+    raw_caption = post.get('raw_caption')
+    source = f"raw\0{raw_caption}" if raw_caption is not None else f"clean\0{post.get('caption') or ''}"
+    return hashlib.blake2b(f"{version}\0{source}".encode('utf-8'), digest_size=8).hexdigest()
+
+
+def output_key(caption, post_entities):
+    content = json.dumps([caption or '', post_entities or {}], ensure_ascii=False, sort_keys=True)
+    return hashlib.blake2b(content.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def load_cache(cache_file):
+    """{input key: output key} from the cache file, empty if there is none"""
+    cache = {}
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                fields = line.rstrip('\n').split('\t')
+                if len(fields) == 2:
+                    cache[fields[0]] = fields[1]
+    except FileNotFoundError:
+        pass
+    return cache
+
+
+def save_cache(cache, cache_file):
+    """Atomically replace the cache file"""
+    cache_file = Path(cache_file)
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = cache_file.with_suffix(cache_file.suffix + ".tmp")
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        f.writelines(f"{key}\t{value}\n" for key, value in cache.items())
+    os.replace(tmp_file, cache_file)
+
+
+def run_pipeline(items, workers):
+    """process_chunk over items in chunks, across workers processes (in-process for few items)"""
+    chunks = [items[i:i + CHUNK_SIZE] for i in range(0, len(items), CHUNK_SIZE)]
+    if workers <= 1 or len(items) < MIN_PARALLEL:
+        return [result for chunk in chunks for result in process_chunk(chunk)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return [result for results in pool.map(process_chunk, chunks) for result in results]
+
+
+def reprocess(post_log, snapshot_file="all-posts.json", workers=None, dry_run=False):
+    """Re-apply the pipeline to every logged post; returns the number of posts that changed,
+    or None for a dry run without a post log (which it doesn't create)"""
+    start = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    if dry_run and not post_log.exists():
+        print(f"❌ No post log at {post_log.log_file}; a run without --dry-run seeds it from {snapshot_file}")
+        return None
+    ensure_post_log(post_log, snapshot_file)
+    posts, _ = post_log.current_posts()
+    cache_file = post_log.log_file.with_name("reprocess-cache.tsv")
+    cache = load_cache(cache_file)
+    version = pipeline_version()
+
+    # Skip posts whose caption went through this pipeline before and still hold what it gave
+    todo = [pipeline_input(post) for post in posts
+            if cache.get(input_key(version, post)) != output_key(post.get('caption'), post.get('entities'))]
+    results = run_pipeline(todo, workers)
+
+    by_id = {post['id']: post for post in posts}
+    changed = []
+    for post_id, caption, post_entities in results:
+        post = by_id[post_id]
+        if post.get('caption') != caption or post.get('entities') != post_entities:
+            changed.append((post_id, post.get('caption', ''), caption))
+            post['caption'] = caption
+            post['entities'] = post_entities
+
+    print(f"🔁 Ran the pipeline on {len(todo)} of {len(posts)} posts ({len(posts) - len(todo)} cached) "
+          f"with {workers if len(todo) >= MIN_PARALLEL else 1} process(es) "
+          f"in {time.perf_counter() - start:.1f}s; {len(changed)} changed")
+    if dry_run:
+        for post_id, before, after in changed[:10]:
+            print(f"  {post_id}: {before[:80]!r}\n  {' ' * len(str(post_id))}→ {after[:80]!r}")
+        return len(changed)
+
+    if changed:
+        compact_and_publish(post_log, snapshot_file, posts)
+    # Every post now holds the pipeline's output for its input, so the next run skips
+    # them all; entries for inputs no longer in the corpus are dropped
+    fresh_cache = {input_key(version, post): output_key(post.get('caption'), post.get('entities'))
+                   for post in posts}
+    # Written last, so an interrupted run is redone rather than skipped
+    save_cache(fresh_cache, cache_file)
+    return len(changed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-apply the caption pipeline to the whole corpus")
+    parser.add_argument("snapshot", nargs="?", default="all-posts.json")
+    parser.add_argument("--workers", type=int, help="processes to use (default: one per CPU)")
+    parser.add_argument("--dry-run", action="store_true", help="report what would change without writing")
+    args = parser.parse_args()
+
+    snapshot_file = Path(args.snapshot)
+    post_log = PostLog(snapshot_file.parent / "data" / "posts.jsonl")
+    return 0 if reprocess(post_log, snapshot_file, args.workers, args.dry_run) is not None else 1
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Result Pages
+Fixed-size pages of ready-to-render posts for the page's first paint: each
+post carries its caption as HTML that is already escaped and has @mentions
+linked, so the newest posts can be shown before the shards and the search
+index have loaded, without any per-post regex work.
+
+  pages/index.json   {"version", "page_size", "total_posts", "max_id", "last_updated",
+                      "pages": [{"file", "count"}] newest page first}
+  pages/NNNNN.json   {"page": n, "posts": [{"id", "t", "post_url", "h"}] newest first}
+
+Pages are numbered from the oldest post, so new posts only ever change the
+newest page or two; the others are left untouched. Publishing writes them
+all (write_result_pages()); between compactions the monitor adds its new
+posts to the newest pages only (add_to_result_pages()).
+"""
+
+import html
+import json
+from pathlib import Path
+
+from date_index import post_epoch
+from entities import MENTION_RE
+from shards import write_if_changed
+
+PAGES_VERSION = 1
+PAGE_SIZE = 48  # Fills whole rows of the 1-4 column grid
+MENTION_LINK = ('<a href="https://instagram.com/{0}" target="_blank" '
+                'style="color: #1E3765; text-decoration: none; font-weight: 500;">@{0}</a>')
+
+
+def caption_html(caption):
+    """A caption as safe HTML with @mentions linked, the same as index.html's captionHtml()"""
+    return MENTION_RE.sub(lambda match: MENTION_LINK.format(match.group(1)), html.escape(caption or ''))
+
+
+def _page_post(epoch, post_id, post):
+    return {"id": post_id, "t": epoch, "post_url": post.get('post_url', ''), "h": caption_html(post.get('caption'))}
+
+
+def _order_key(epoch, post_id):
+    """Oldest first, undated posts before every dated one (the page shows them last)"""
+    return epoch is not None, epoch or 0, post_id
+
+
+def _write_page(pages_dir, number, page_posts):
+    """Write page number (posts newest first); returns (rewritten, its index entry)"""
+    filename = f"{number:05d}.json"
+    content = json.dumps({"page": number, "posts": page_posts}, ensure_ascii=False, separators=(',', ':'))
+    return write_if_changed(pages_dir / filename, content), {"file": filename, "count": len(page_posts)}
+
+
+def _write_index(pages_dir, pages, total_posts, max_id, last_updated):
+    """pages: index entries oldest first"""
+    index = {
+        "version": PAGES_VERSION,
+        "page_size": PAGE_SIZE,
+        "total_posts": total_posts,
+        "max_id": max_id,
+        "last_updated": last_updated,
+        "pages": pages[::-1],
+    }
+    write_if_changed(pages_dir / "index.json", json.dumps(index, ensure_ascii=False, indent=2))
+
+
+def write_result_pages(posts, pages_dir="pages", last_updated=None):
+    """Write the posts, newest first, as PAGE_SIZE pages plus index.json; returns the pages rewritten"""
+    pages_dir = Path(pages_dir)
+    pages_dir.mkdir(parents=True, exist_ok=True)
+
+    dated = sorted(((post_epoch(post), post.get('id', position), post) for position, post in enumerate(posts)),
+                   key=lambda item: _order_key(item[0], item[1]))
+
+    pages = []
+    rewritten = 0
+    for number, start in enumerate(range(0, len(dated), PAGE_SIZE)):
+        page_posts = [_page_post(*item) for item in reversed(dated[start:start + PAGE_SIZE])]
+        written, entry = _write_page(pages_dir, number, page_posts)
+        rewritten += written
+        pages.append(entry)
+
+    # Drop pages past the end (the corpus shrank)
+    current = {page['file'] for page in pages}
+    for path in pages_dir.glob("[0-9]*.json"):
+        if path.name not in current:
+            path.unlink()
+            path.with_name(path.name + '.gz').unlink(missing_ok=True)
+
+    _write_index(pages_dir, pages, len(dated), max((post_id for _, post_id, _ in dated), default=-1), last_updated)
+    print(f"✅ Rewrote {rewritten} of {len(pages)} result pages")
+    return rewritten
+
+
+def add_to_result_pages(posts, pages_dir="pages", last_updated=None):
+    """Add new posts (newer than every post in the pages, with ids) to the newest pages.
+
+    Only the newest page and any new ones after it are written. Returns the
+    pages rewritten, or None when there are no pages yet or a post would
+    belong further back; then only write_result_pages() can place it.
+    """
+    if not posts:
+        return 0
+    pages_dir = Path(pages_dir)
+    try:
+        with open(pages_dir / "index.json", 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        if index.get('version') != PAGES_VERSION or index.get('page_size') != PAGE_SIZE:
+            return None
+        pages = index['pages'][::-1]  # Oldest first
+        newest = []
+        if pages:
+            with open(pages_dir / pages[-1]['file'], 'r', encoding='utf-8') as f:
+                newest = json.load(f)['posts'][::-1]
+    except (OSError, ValueError, KeyError):
+        return None
+
+    added = sorted(((post_epoch(post), post['id'], post) for post in posts),
+                   key=lambda item: _order_key(item[0], item[1]))
+    if newest and _order_key(added[0][0], added[0][1]) < _order_key(newest[-1]['t'], newest[-1]['id']):
+        return None
+
+    # The newest page is topped up to PAGE_SIZE, then new pages follow it
+    first = len(pages) - 1 if pages else 0
+    ordered = newest + [_page_post(*item) for item in added]
+    del pages[first:]
+    rewritten = 0
+    for number, start in enumerate(range(0, len(ordered), PAGE_SIZE), first):
+        written, entry = _write_page(pages_dir, number, ordered[start:start + PAGE_SIZE][::-1])
+        rewritten += written
+        pages.append(entry)
+
+    _write_index(pages_dir, pages, index['total_posts'] + len(added),
+                 max([index['max_id']] + [post_id for _, post_id, _ in added]), last_updated)
+    print(f"✅ Rewrote {rewritten} of {len(pages)} result pages")
+    return rewritten
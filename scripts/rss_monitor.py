@@ -2,87 +2,118 @@
 """
 RSS Feed Monitor Script
 Monitors Instagram RSS feeds and adds new posts to the existing all-posts.json
-Only saves essential fields: caption, post_url, and added_at
+Only saves essential fields: caption, post_url and added_at, plus the
+entities (campus, college, residence, program, @mentions) the caption names
 """
 
 import os
+import sys
 import json
+import signal
+import threading
+import time
 import requests
-import feedparser
-import re
-from datetime import datetime
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from pathlib import Path
 from dateutil import parser as date_parser
-from html import unescape
+
+from caption_cleaner import clean_caption
+from dates import to_utc_iso
+from deltas import add_delta
+from entities import extract_entities
+from feed_stream import CHUNK_SIZE, FeedStream, parse_published
+from metrics import LOG_LEVELS, RunMetrics, log_level, profiled
+from near_duplicates import NearDuplicateIndex
+from poll_schedule import DAILY_POLL_BUDGET, PollSchedule
+from post_keys import url_key
+from post_log import PostLog, published_post
+from precompress import precompress_site
+from publish import compact_and_publish, ensure_post_log, load_snapshot, save_snapshot
+from result_pages import add_to_result_pages
+from shards import add_to_shards
+from similar_posts import SimilarPosts, write_similar_posts
+
+# Returned by fetch_rss_feed() when the server answers 304 Not Modified
+NOT_MODIFIED = object()
+
+
+def create_session(retries=3, backoff_factor=1.0):
+    """Pooled HTTP session with bounded retry-with-backoff for transient failures"""
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff_factor,  # waits 0s, 2s, 4s ... between attempts
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET"],
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    session = requests.Session()
+    adapter = HTTPAdapter(max_retries=retry)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update({
+        # Add headers to avoid being blocked
+        'User-Agent': 'Mozilla/5.0 (compatible; RSS-Monitor/1.0)',
+        'Accept': 'application/rss+xml, application/xml, text/xml'
+    })
+    return session
+
 
 class RSSMonitor:
-    def __init__(self, rss_url, data_dir="data"):
+    def __init__(self, rss_url, data_dir="data", compact_after=50, session=None, site_dir=".", level=None):
         self.rss_url = rss_url
         self.data_dir = Path(data_dir)
         self.last_check_file = self.data_dir / "last_check.json"
-        self.all_posts_file = Path("all-posts.json")  # Main website file
+        # ETag / Last-Modified from the last successful fetch, for conditional requests
+        self.validators_file = self.data_dir / "feed_validators.json"
+        self.session = session or create_session()
+        self.last_error = None  # Why the last fetch failed, if it did
+        self.site_dir = Path(site_dir)  # Where this feed's corpus and site data live
+        self.all_posts_file = self.site_dir / "all-posts.json"  # Published snapshot
+        self.shards_dir = self.site_dir / "posts"  # Per-month shards the website loads
+        self.deltas_dir = self.site_dir / "deltas"  # Corpus versions, for returning visitors
+        self.pages_dir = self.site_dir / "pages"  # Newest posts pre-rendered for the first paint
+        self.similar_dir = self.site_dir / "similar"  # "People like this" neighbour lists
+        
+        # Append-only log of every post - the source of truth for all-posts.json
+        self.post_log = PostLog(self.data_dir / "posts.jsonl")
+        # Fold the log into all-posts.json once this many records were appended
+        self.compact_after = compact_after
+        
+        # Dedup keys and near-duplicate index, loaded on first use and then kept up to date
+        # in memory, so watch mode polls don't read them again
+        self.keys = None
+        self.duplicate_index = None
+        self.similar_posts = None
         
-        # Create data directory if it doesn't exist (only for last_check.json)
-        self.data_dir.mkdir(exist_ok=True)
+        # Phase timers and counters for this run, written to run-metrics.json at the end
+        self.metrics = RunMetrics(rss_url)
+        self.metrics_file = self.data_dir / "run-metrics.json"
+        # Per-post lines are only printed at LOG_LEVEL=debug, keeping I/O out of the hot loops
+        self.verbose = log_level(level) <= LOG_LEVELS['debug']
+        
+        # Create data directory if it doesn't exist
+        self.data_dir.mkdir(parents=True, exist_ok=True)
     
     def clean_html_content(self, html_content):
         """Clean HTML content to extract just the text for better search"""
-        if not html_content:
-            return ""
-        
-        try:
-            # First, protect emoticons and special characters like <33 by temporarily replacing them
-            html_content = html_content.replace('<33', '&lt;33')
-            html_content = html_content.replace('<3', '&lt;3')
-            
-            # Remove image tags but keep the text content
-            html_content = re.sub(r'<img[^>]*>', '', html_content)
-            
-            # Remove HTML tags but keep the text, preserving line breaks
-            html_content = re.sub(r'<[^>]+>', '\n', html_content)
-            
-            # Unescape HTML entities (including our protected emoticons)
-            html_content = unescape(html_content)
-            
-            # Clean up extra whitespace but preserve line breaks
-            html_content = re.sub(r'[ \t]+', ' ', html_content)  # Only collapse spaces and tabs
-            html_content = re.sub(r'\n+', '\n', html_content)    # Collapse multiple newlines
-            html_content = html_content.strip()
-            
-            # Replace line breaks with spaces to make it searchable
-            html_content = html_content.replace('\n', ' ')
-            
-            # Final cleanup of extra spaces
-            html_content = re.sub(r'\s+', ' ', html_content).strip()
-            
-            return html_content
-            
-        except Exception as e:
-            print(f"⚠️  Error cleaning HTML content: {e}")
-            return html_content
-        
-
+        return clean_caption(html_content)
     
     def load_all_posts(self):
         """Load the main all-posts.json file"""
-        if self.all_posts_file.exists():
-            try:
-                with open(self.all_posts_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, IOError) as e:
-                print(f"⚠️  Error loading all-posts.json: {e}")
-                return {"total_posts": 0, "posts": []}
-        return {"total_posts": 0, "posts": []}
+        return load_snapshot(self.all_posts_file)
     
     def save_all_posts(self, all_posts_data):
-        """Save the updated all-posts.json file"""
-        try:
-            with open(self.all_posts_file, 'w', encoding='utf-8') as f:
-                json.dump(all_posts_data, f, indent=2, ensure_ascii=False)
-            print(f"✅ Updated all-posts.json with {len(all_posts_data['posts'])} total posts")
-        except IOError as e:
-            print(f"❌ Error saving all-posts.json: {e}")
+        """Save the updated all-posts.json file and the site data built from it"""
+        save_snapshot(all_posts_data, self.all_posts_file)
     
+    def compact(self):
+        """Fold the post log into all-posts.json and rebuild all site data"""
+        print("🗜️  Compacting post log into all-posts.json...")
+        return compact_and_publish(self.post_log, self.all_posts_file)
 
     def load_last_check(self):
         """Load last check timestamp"""
@@ -103,53 +134,107 @@ class RSSMonitor:
         except IOError as e:
             print(f"⚠️  Error saving last check: {e}")
     
-    def fetch_rss_feed(self):
-        """Fetch and parse RSS feed"""
+    def load_validators(self):
+        """Load the ETag / Last-Modified validators stored for this feed"""
+        if self.validators_file.exists():
+            try:
+                with open(self.validators_file, 'r') as f:
+                    return json.load(f).get(self.rss_url, {})
+            except (json.JSONDecodeError, IOError):
+                pass
+        return {}
+    
+    def save_validators(self, validators):
+        """Save validators for this feed, keeping any stored for other feeds"""
+        all_validators = {}
+        if self.validators_file.exists():
+            try:
+                with open(self.validators_file, 'r') as f:
+                    all_validators = json.load(f)
+            except (json.JSONDecodeError, IOError):
+                pass
+        all_validators[self.rss_url] = validators
+        try:
+            with open(self.validators_file, 'w') as f:
+                json.dump(all_validators, f, indent=2)
+        except IOError as e:
+            print(f"⚠️  Error saving feed validators: {e}")
+    
+    def fetch_rss_feed(self, conditional=True):
+        """Start fetching the RSS feed.
+        
+        Returns a FeedStream that parses entries as the body downloads,
+        NOT_MODIFIED when the server says the feed is unchanged since the stored
+        validators, or None on failure.
+        """
         try:
             print(f"📡 Fetching RSS feed from: {self.rss_url}")
             
-            # Add headers to avoid being blocked
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (compatible; RSS-Monitor/1.0)',
-                'Accept': 'application/rss+xml, application/xml, text/xml'
+            headers = {}
+            if conditional:
+                validators = self.load_validators()
+                if validators.get('etag'):
+                    headers['If-None-Match'] = validators['etag']
+                if validators.get('last_modified'):
+                    headers['If-Modified-Since'] = validators['last_modified']
+            
+            with self.metrics.phase('fetch'):
+                # Only the headers; the body is read as the entries are consumed
+                response = self.session.get(self.rss_url, headers=headers, timeout=30, stream=True)
+            if response.status_code == 304:
+                response.close()
+                print("ℹ️  RSS feed not modified since last check")
+                self.metrics.count('not_modified')
+                return NOT_MODIFIED
+            try:
+                response.raise_for_status()
+            except requests.RequestException:
+                response.close()
+                raise
+            
+            feed = FeedStream(response.iter_content(CHUNK_SIZE), close=response.close)
+            # Stored once the entries have been processed, so a failed run is retried in full
+            feed.validators = {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
             }
-            
-            response = requests.get(self.rss_url, headers=headers, timeout=30)
-            response.raise_for_status()
-            
-            feed = feedparser.parse(response.content)
-            
-            if feed.bozo:
-                print(f"⚠️  RSS feed has issues: {feed.bozo_exception}")
-            
-            print(f"📊 Found {len(feed.entries)} entries in RSS feed")
             return feed
             
         except requests.RequestException as e:
             print(f"❌ Error fetching RSS feed: {e}")
+            self.last_error = f"fetch failed: {e}"
             return None
         except Exception as e:
             print(f"❌ Error parsing RSS feed: {e}")
+            self.last_error = f"parse failed: {e}"
             return None
     
     def rss_to_simplified_format(self, rss_post):
-        """Convert RSS post to simplified format (caption, post_url, added_at only)"""
+        """Convert RSS post to simplified format (caption, post_url, added_at and entities, plus the
+        raw_caption HTML that only the post log keeps)"""
         try:
             # Clean up the HTML caption for better search functionality
             raw_caption = rss_post.get('caption', '')
-            cleaned_caption = self.clean_html_content(raw_caption)
+            with self.metrics.phase('clean'):
+                cleaned_caption = self.clean_html_content(raw_caption)
             
             # Use current timestamp as added_at since this is when we're adding it
-            added_at = datetime.now().isoformat()
+            # (in UTC with a Z, like the scraper's, so every reader gets the same moment)
+            added_at = to_utc_iso(datetime.now(timezone.utc))
             
             # Create simplified post with only essential fields
             simplified_post = {
                 'caption': cleaned_caption,
                 'post_url': rss_post.get('url', ''),
-                'added_at': added_at
+                'added_at': added_at,
+                # Tagged once here, so facets never rescan the caption
+                'entities': extract_entities(cleaned_caption),
+                # For reprocess.py, so a change to the cleaning rules reaches this post
+                'raw_caption': raw_caption
             }
             
-            print(f"📝 Cleaned caption preview: {cleaned_caption[:100]}...")
+            if self.verbose:
+                print(f"📝 Cleaned caption preview: {cleaned_caption[:100]}...")
             
             return simplified_post
             
@@ -169,11 +254,15 @@ class RSSMonitor:
             pub_date = entry.get('published', '') or entry.get('updated', '')
             timestamp = ''
             if pub_date:
-                try:
-                    dt = date_parser.parse(pub_date)
+                # RSS dates are RFC 822; dateutil is only needed for anything else
+                dt = parse_published(pub_date)
+                if dt is not None:
                     timestamp = dt.isoformat()
-                except:
-                    timestamp = pub_date
+                else:
+                    try:
+                        timestamp = date_parser.parse(pub_date).isoformat()
+                    except (ValueError, OverflowError):
+                        timestamp = pub_date
             
             # Create post object for RSS tracking
             post = {
@@ -182,7 +271,7 @@ class RSSMonitor:
                 'timestamp': timestamp,
                 'rss_title': title,
                 'rss_guid': entry.get('id', '') or entry.get('guid', '') or link,
-                'added_at': datetime.now().isoformat()
+                'added_at': to_utc_iso(datetime.now(timezone.utc))
             }
             
             return post
@@ -191,111 +280,336 @@ class RSSMonitor:
             print(f"⚠️  Error parsing RSS entry: {e}")
             return None
     
-    def merge_new_posts_with_existing(self, new_rss_posts):
-        """Merge new RSS posts with existing all-posts.json"""
-        print("🔄 Merging new posts with existing all-posts.json...")
-        
-        # Load existing all-posts.json
-        all_posts_data = self.load_all_posts()
-        existing_posts = all_posts_data.get('posts', [])
+    def load_keys(self):
+        """The post log's url / caption keys (see post_keys.py), read once per monitor"""
+        if self.keys is None:
+            ensure_post_log(self.post_log, self.all_posts_file)
+            self.keys = self.post_log.keys()
+        return self.keys
+    
+    def load_duplicate_index(self):
+        """Near-duplicate index of the captions in the log (keyed by post id), to catch reposts under a new URL.
+        Loaded from the signatures kept next to the log, so no caption is read or hashed."""
+        return self.post_log.duplicate_index()
+    
+    def update_similar_posts(self, new_posts):
+        """Find neighbours for newly logged posts and rewrite the similar/ blocks that changed"""
+        if self.similar_posts is None:
+            self.similar_posts = SimilarPosts.load(self.similar_dir)
+            if max(self.similar_posts.ids, default=-1) + 1 < min(post['id'] for post in new_posts):
+                # similar/ is behind the log (or missing): add everything it doesn't cover yet,
+                # new_posts included (they are already logged)
+                logged = self.post_log.current_posts()[0]
+                new_posts = [post for post in logged if post['id'] not in self.similar_posts]
+        changed = self.similar_posts.add(new_posts)
+        write_similar_posts(self.similar_posts, self.similar_dir, changed)
+        precompress_site(self.similar_dir)
+        self.metrics.count('similar_lists_changed', len(changed))
+    
+    def merge_new_posts_with_existing(self, new_rss_posts, keys=None):
+        """Append new RSS posts to the post log and update the affected shards"""
+        print("🔄 Merging new posts with the post log...")
+        metrics = self.metrics
         
-        # Get existing URLs to avoid duplicates
-        existing_urls = {post.get('post_url') for post in existing_posts}
+        with metrics.phase('dedup'):
+            # Keys of the posts we already have, to avoid duplicates
+            if keys is None:
+                keys = self.load_keys()
         
         # Convert new RSS posts to simplified format and filter duplicates
         new_posts_to_add = []
+        reposts = 0
+        # This run's new posts have no ids until they are appended, so they are kept out of
+        # keys: their URL keys and a near-duplicate index keyed by URL catch repeats in the run
+        batch_urls = set()
+        batch_duplicates = NearDuplicateIndex()
         for rss_post in new_rss_posts:
+            # Known URLs are dropped before their caption is cleaned
+            if keys.has_url(rss_post.get('url', '')) or url_key(rss_post.get('url', '')) in batch_urls:
+                metrics.count('entries_known')
+                continue
+            
             simplified_post = self.rss_to_simplified_format(rss_post)
             if not simplified_post:
                 continue
             
-            # Check for duplicates by URL
-            if simplified_post['post_url'] not in existing_urls:
-                new_posts_to_add.append(simplified_post)
-                print(f"✅ Adding new post: {simplified_post['caption'][:50]}...")
+            # Check for a repost of a caption we already have: exact first, then near-duplicate
+            caption = simplified_post['caption']
+            if caption:
+                with metrics.phase('dedup'):
+                    repost_of = keys.find_caption(caption)
+                    if repost_of is None:
+                        # Only built once a caption passes the cheap checks
+                        if self.duplicate_index is None:
+                            self.duplicate_index = self.load_duplicate_index()
+                        signed = self.duplicate_index.signature(caption)
+                        near = ([key for key, _ in self.duplicate_index.query(caption, signed)]
+                                or batch_duplicates.add(simplified_post['post_url'], caption, signed))
+                        repost_of = near[0] if near else None
+                if repost_of is not None:
+                    reposts += 1
+                    if self.verbose:
+                        print(f"♻️  Skipping repost of post {repost_of}: {caption[:50]}...")
+                    if isinstance(repost_of, int):
+                        # A repost of a logged post: never look at this URL again
+                        keys.add_alias(simplified_post['post_url'], repost_of)
+                    continue
+            
+            batch_urls.add(url_key(simplified_post['post_url']))
+            new_posts_to_add.append(simplified_post)
+            if self.verbose:
+                print(f"✅ Adding new post: {caption[:50]}...")
+        
+        metrics.count('reposts_skipped', reposts)
+        if reposts:
+            print(f"♻️  Skipped {reposts} reposts")
         
         if new_posts_to_add:
-            # Add new posts to the beginning of the list (most recent first)
-            updated_posts = new_posts_to_add + existing_posts
-            
-            # Update data structure
-            all_posts_data['posts'] = updated_posts
-            all_posts_data['total_posts'] = len(updated_posts)
-            all_posts_data['last_updated'] = datetime.now().isoformat()
-            
-            # Save updated file
-            self.save_all_posts(all_posts_data)
-            
-            print(f"✅ Added {len(new_posts_to_add)} new posts to all-posts.json")
-            print(f"📊 Total posts now: {len(updated_posts)}")
+            with metrics.phase('merge'):
+                # Only the new records are written; nothing else in the log is touched. Their
+                # ids, keys and signatures go to the keys and index kept for later polls
+                self.post_log.append(new_posts_to_add, keys=keys, duplicates=self.duplicate_index)
+                
+                # Rewrite just the month shards the new posts fall in
+                last_updated = to_utc_iso(datetime.now(timezone.utc))
+                published = [published_post(post) for post in new_posts_to_add]
+                changed = add_to_shards(published, self.shards_dir, last_updated)
+                if changed is not None:
+                    add_delta(published, self.deltas_dir, last_updated)
+                    # And the newest result pages, so the first paint shows the new posts too
+                    if add_to_result_pages(published, self.pages_dir, last_updated) is None:
+                        changed = None  # They only fit a full rebuild: compact below
+            metrics.count('posts_added', len(new_posts_to_add))
+            
+            with metrics.phase('save'):
+                precompress_site(self.shards_dir)
+                precompress_site(self.deltas_dir)
+                precompress_site(self.pages_dir)
+            
+            print(f"✅ Added {len(new_posts_to_add)} new posts to the post log")
+            
+            state = self.post_log.load_state()
+            if changed is None or state['records_since_compaction'] >= self.compact_after:
+                with metrics.phase('save'):
+                    self.compact()
+                metrics.count('compactions')
+                # Publishing rebuilt similar/; the next batch reloads it
+                self.similar_posts = None
+            else:
+                with metrics.phase('similar'):
+                    self.update_similar_posts(new_posts_to_add)
             return True
         else:
             print("ℹ️  No new unique posts to add")
             return False
     
     def check_for_new_posts(self, force_update=False):
-        """Check RSS feed for new posts and add them"""
+        """Check RSS feed for new posts and add them; the run's metrics are saved either way"""
+        try:
+            return self._check_for_new_posts(force_update)
+        finally:
+            print(self.metrics.summary())
+            self.metrics.save(self.metrics_file)
+    
+    def _check_for_new_posts(self, force_update):
         print("🔍 Checking RSS feed for new posts...")
+        metrics = self.metrics
         
-        # Load existing posts from main file to get GUIDs for duplicate checking
-        all_posts_data = self.load_all_posts()
-        existing_posts = all_posts_data.get('posts', [])
-        existing_guids = {post.get('rss_guid') for post in existing_posts if post.get('rss_guid')}
-        
-        # Fetch RSS feed
-        feed = self.fetch_rss_feed()
+        # Fetch RSS feed (a forced update always downloads it in full)
+        feed = self.fetch_rss_feed(conditional=not force_update)
+        if feed is NOT_MODIFIED:
+            # Nothing changed: skip parsing, merging and saving entirely
+            return False
         if not feed:
             print("❌ Failed to fetch RSS feed")
             return False
         
+        # Load the dedup keys once (no captions are read); they are shared with the merge step
+        with metrics.phase('dedup'):
+            keys = self.load_keys()
+        
         # Process new entries
         new_posts = []
-        last_check = self.load_last_check()
         
-        for entry in feed.entries:
-            post = self.parse_rss_entry(entry)
-            if not post:
-                continue
-            
-            # Check if this is a new post
-            is_new = (
-                post['rss_guid'] not in existing_guids or
-                force_update
-            )
-            
-            # Also check by timestamp if we have last check time
-            if last_check and not force_update:
-                try:
-                    entry_time = date_parser.parse(post['timestamp'])
-                    last_check_time = date_parser.parse(last_check)
-                    if entry_time <= last_check_time:
-                        is_new = False
-                except:
-                    pass  # If parsing fails, consider it new
-            
-            if is_new:
-                new_posts.append(post)
-                print(f"📝 New post found: {post['rss_title'][:50]}...")
+        # Entries are read (and downloaded) as the loop asks for them
+        stopped_early = False
+        try:
+            with metrics.phase('parse'):
+                for entry in feed:
+                    # The feed is newest first: everything after a known entry is known too, so
+                    # stop reading there. A forced update reads the whole feed, in case it isn't.
+                    if keys.has_url(entry.get('link', '')):
+                        metrics.count('entries_known')
+                        if force_update:
+                            continue
+                        stopped_early = True
+                        break
+                    
+                    post = self.parse_rss_entry(entry)
+                    if not post:
+                        continue
+                    
+                    new_posts.append(post)
+                    if self.verbose:
+                        print(f"📝 New post found: {post['rss_title'][:50]}...")
+        except requests.RequestException as e:
+            # The download broke off; nothing is merged, so the next poll starts over
+            print(f"❌ Error reading RSS feed: {e}")
+            self.last_error = f"fetch failed: {e}"
+            return False
+        finally:
+            feed.close()
+            metrics.count('entries_seen', feed.entries_read)
+            metrics.count('bytes_fetched', feed.bytes_read)
+        
+        if feed.bozo:
+            print(f"⚠️  RSS feed has issues: {feed.bozo_exception}")
+        print(f"📊 Read {feed.entries_read} entries ({feed.bytes_read} bytes) from the RSS feed"
+              + (", stopping at the first known post" if stopped_early else ""))
+        metrics.count('entries_new', len(new_posts))
+        if new_posts:
+            print(f"📝 {len(new_posts)} new entries in the feed")
         
         # Merge with existing all-posts.json directly (no intermediate files needed)
         if new_posts:
-            has_merged = self.merge_new_posts_with_existing(new_posts)
+            has_merged = self.merge_new_posts_with_existing(new_posts, keys)
             
             # Update last check timestamp only if we successfully merged
             if has_merged:
-                self.save_last_check(datetime.now().isoformat())
-            return has_merged
+                self.save_last_check(to_utc_iso(datetime.now(timezone.utc)))
         else:
             print("ℹ️  No new posts found")
             # Still update last check time
-            self.save_last_check(datetime.now().isoformat())
-            return False
+            self.save_last_check(to_utc_iso(datetime.now(timezone.utc)))
+            has_merged = False
+        
+        # Every entry of this version of the feed is handled; next time ask only for changes
+        self.save_validators(feed.validators)
+        return has_merged
+
+def watch(monitor, schedule, force_update=False, max_polls=None, stop=None, clock=time.time, wait=None):
+    """Poll the feed on the schedule until stop is set (or max_polls polls); returns the polls made.
+    
+    The monitor's keys and near-duplicate index stay in memory between polls, and new
+    posts are flushed to the post log and shards by each poll as usual. clock and wait
+    (seconds -> None) can be swapped for a simulated clock.
+    """
+    stop = stop or threading.Event()
+    wait = wait or stop.wait
+    polls = 0
+    while not stop.is_set() and (max_polls is None or polls < max_polls):
+        # Fresh metrics per poll; run-metrics.json describes the latest one
+        monitor.metrics = RunMetrics(monitor.rss_url)
+        monitor.last_error = None
+        try:
+            found_new = monitor.check_for_new_posts(force_update and polls == 0)
+        except Exception as e:
+            print(f"❌ Poll failed: {e}")
+            found_new = False
+        polls += 1
+        
+        now = clock()
+        schedule.record(now, found_new)
+        delay = schedule.next_delay(now)
+        print(f"⏰ Next poll in {delay / 60:.1f} min ({schedule.empty_polls} empty polls in a row)")
+        wait(delay)
+    return polls
+
+
+def load_feeds_config(config_file):
+    """Load a multi-feed config: {"max_concurrency": 4, "feeds": [{"name", "url", ...}]}"""
+    with open(config_file, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    
+    feeds = []
+    for feed in config.get('feeds', []):
+        name = feed['name']
+        feeds.append({
+            'name': name,
+            'url': feed['url'],
+            # Each feed keeps its own validators, last check and post log ...
+            'data_dir': feed.get('data_dir', f"data/{name}"),
+            # ... and publishes its own corpus
+            'site_dir': feed.get('site_dir', f"sites/{name}"),
+        })
+    return feeds, config.get('max_concurrency', 4)
+
+
+def check_feed(feed, force_update, compact_after):
+    """Check one feed; never raises, so one bad feed can't stop the others"""
+    start = time.monotonic()
+    try:
+        monitor = RSSMonitor(feed['url'], data_dir=feed['data_dir'],
+                             compact_after=compact_after, site_dir=feed['site_dir'])
+        has_new_posts = monitor.check_for_new_posts(force_update)
+        if monitor.last_error:
+            return {'name': feed['name'], 'ok': False, 'error': monitor.last_error,
+                    'seconds': time.monotonic() - start}
+        return {'name': feed['name'], 'ok': True, 'new_posts': has_new_posts,
+                'seconds': time.monotonic() - start}
+    except Exception as e:
+        print(f"❌ Feed {feed['name']} failed: {e}")
+        return {'name': feed['name'], 'ok': False, 'error': str(e),
+                'seconds': time.monotonic() - start}
+
+
+def check_feeds(feeds, max_concurrency=4, force_update=False, compact_after=50):
+    """Check every feed concurrently, at most max_concurrency at a time"""
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as pool:
+        results = list(pool.map(lambda feed: check_feed(feed, force_update, compact_after), feeds))
+    wall_time = time.monotonic() - start
+    
+    print("\n📊 Feed summary")
+    print("=" * 50)
+    for result in results:
+        if result['ok']:
+            status = "🆕 new posts" if result['new_posts'] else "✅ up to date"
+        else:
+            status = f"❌ {result['error']}"
+        print(f"{result['name']}: {status} ({result['seconds']:.1f}s)")
+    slowest = max((result['seconds'] for result in results), default=0)
+    print(f"⏱️  {len(feeds)} feeds in {wall_time:.1f}s (slowest single feed: {slowest:.1f}s)")
+    return results
+
 
 def main():
     """Main function"""
+    # "--profile" (or PROFILE=true) dumps cProfile and tracemalloc snapshots to PROFILE_DIR
+    profile = '--profile' in sys.argv[1:] or os.getenv('PROFILE', 'false').lower() == 'true'
+    with profiled(os.getenv('PROFILE_DIR', 'data/profile'), enabled=profile):
+        return run(profile)
+
+
+def run(profile=False):
+    """One monitor run as configured by the environment and command line"""
     # Get configuration from environment variables
     rss_url = os.getenv('RSS_FEED_URL', 'https://rss.app/feeds/50UzjpI64E8EaBUf.xml')
     force_update = os.getenv('FORCE_UPDATE', 'false').lower() == 'true'
+    compact_after = int(os.getenv('COMPACT_AFTER', '50'))
+    
+    # "python scripts/rss_monitor.py --compact" only folds the post log into all-posts.json
+    if '--compact' in sys.argv[1:]:
+        RSSMonitor(rss_url, compact_after=compact_after).compact()
+        return 0
+    
+    # "python scripts/rss_monitor.py --watch" keeps polling on an adaptive schedule until stopped
+    if '--watch' in sys.argv[1:]:
+        return run_watch(rss_url, force_update, compact_after)
+    
+    # "python scripts/rss_monitor.py --feeds feeds.json" (or FEEDS_CONFIG) checks many feeds at once
+    feeds_config = os.getenv('FEEDS_CONFIG')
+    if '--feeds' in sys.argv[1:]:
+        feeds_config = sys.argv[sys.argv.index('--feeds') + 1]
+    if feeds_config:
+        feeds, max_concurrency = load_feeds_config(feeds_config)
+        print(f"🚀 RSS Feed Monitor Starting for {len(feeds)} feeds (up to {max_concurrency} at a time)...")
+        if profile:
+            # cProfile only sees the calling thread, so profile the feeds one after another
+            results = [check_feed(feed, force_update, compact_after) for feed in feeds]
+        else:
+            results = check_feeds(feeds, max_concurrency, force_update, compact_after)
+        return 0 if all(result['ok'] for result in results) else 1
     
     print("🚀 RSS Feed Monitor Starting...")
     print("=" * 50)
@@ -304,7 +618,7 @@ def main():
     print("=" * 50)
     
     # Create monitor and check for new posts
-    monitor = RSSMonitor(rss_url)
+    monitor = RSSMonitor(rss_url, compact_after=compact_after)
     
     try:
         has_new_posts = monitor.check_for_new_posts(force_update)
@@ -321,5 +635,23 @@ def main():
     
     return 0
 
+def run_watch(rss_url, force_update, compact_after):
+    """Watch mode: poll until SIGINT / SIGTERM, finishing the poll in progress first"""
+    budget = int(os.getenv('POLL_BUDGET', str(DAILY_POLL_BUDGET)))
+    print("👀 RSS Feed Monitor watching...")
+    print("=" * 50)
+    print(f"RSS URL: {rss_url}")
+    print(f"Poll budget: {budget} per day")
+    print("=" * 50)
+    
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+    
+    monitor = RSSMonitor(rss_url, compact_after=compact_after)
+    polls = watch(monitor, PollSchedule(budget), force_update, stop=stop)
+    print(f"\n🛑 Stopped after {polls} polls")
+    return 0
+
 if __name__ == "__main__":
     exit(main()) 
\ No newline at end of file
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Ranked Search
+In-memory BM25 search over post captions for serve.py's /api/search.
+Matching uses the page's rules (every query word must appear somewhere in
+the caption); BM25 over the caption tokens decides the order. Ranked id
+lists are kept in a bounded LRU cache so hot queries and later pages of the
+same query are answered without searching again. A query that matches
+nothing is retried with its misspelled words corrected (see vocabulary.py).
+"""
+
+import math
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+from dates import parse_added_at
+from search_index import tokenize
+from vocabulary import Vocabulary
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+THIS_YEAR_WINDOW = timedelta(weeks=52)
+
+
+class SearchEngine:
+    def __init__(self, posts, cache_size=256):
+        self.posts = posts
+        self.added = [parse_added_at(post.get('added_at')) for post in posts]
+
+        # token -> {post position: term frequency}
+        self.postings = {}
+        self.doc_lengths = []
+        for position, post in enumerate(posts):
+            tokens = tokenize(post.get('caption', ''))
+            self.doc_lengths.append(len(tokens))
+            for token in tokens:
+                counts = self.postings.setdefault(token, {})
+                counts[position] = counts.get(position, 0) + 1
+        self.vocabulary = list(self.postings)
+        self.avg_doc_length = (sum(self.doc_lengths) / len(posts)) if posts else 0
+        self.spelling = Vocabulary.from_posts(posts)
+        self.spelling.trigram_index()
+
+        # Default order (empty query): newest first
+        no_date = datetime.min.replace(tzinfo=timezone.utc)
+        self.newest_first = sorted(range(len(posts)), key=lambda i: self.added[i] or no_date, reverse=True)
+
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def word_frequencies(self, word):
+        """{post position: occurrences of tokens containing word}"""
+        frequencies = {}
+        for token in self.vocabulary:
+            if word in token:
+                for position, tf in self.postings[token].items():
+                    frequencies[position] = frequencies.get(position, 0) + tf
+        return frequencies
+
+    def rank(self, query):
+        """Positions of posts matching every query word, best BM25 score first"""
+        words = sorted(set(query.lower().split()))
+        if not words:
+            return self.newest_first
+
+        per_word = []
+        for word in words:
+            frequencies = self.word_frequencies(word)
+            if not frequencies:
+                return []
+            per_word.append(frequencies)
+
+        per_word.sort(key=len)
+        matches = set(per_word[0])
+        for frequencies in per_word[1:]:
+            matches.intersection_update(frequencies)
+
+        total_docs = len(self.posts)
+        scores = {}
+        for frequencies in per_word:
+            idf = math.log(1 + (total_docs - len(frequencies) + 0.5) / (len(frequencies) + 0.5))
+            for position in matches:
+                tf = frequencies[position]
+                norm = 1 - BM25_B + BM25_B * self.doc_lengths[position] / (self.avg_doc_length or 1)
+                scores[position] = scores.get(position, 0) + idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * norm)
+
+        return sorted(matches, key=lambda position: (-scores[position], -self.posts[position].get('id', 0)))
+
+    def cached_rank(self, query, this_year, now):
+        """rank() plus the year filter, memoized in the LRU cache"""
+        cutoff = now - THIS_YEAR_WINDOW if this_year else None
+        # The cutoff moves daily, so it is part of the key
+        key = (' '.join(sorted(set(query.lower().split()))), cutoff.date() if cutoff else None)
+
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        ranked = self.rank(query)
+        if cutoff:
+            # Posts with unparseable dates stay visible, as on the page
+            ranked = [p for p in ranked if self.added[p] is None or self.added[p] >= cutoff]
+
+        with self._lock:
+            self._cache[key] = ranked
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return ranked
+
+    def search(self, query, this_year=False, offset=0, limit=20, now=None):
+        """One page of ranked results plus the total number of matches"""
+        now = now or datetime.now(timezone.utc)
+        ranked = self.cached_rank(query, this_year, now)
+        corrected = None
+        if not ranked and query.strip():
+            corrected = self.spelling.correct_query(query, lambda word: bool(self.word_frequencies(word)))
+            if corrected:
+                ranked = self.cached_rank(corrected, this_year, now)
+        page = ranked[offset:offset + limit]
+        return {
+            "query": query,
+            "corrected": corrected,
+            "this_year": this_year,
+            "total": len(ranked),
+            "offset": offset,
+            "limit": limit,
+            "results": [self.posts[position] for position in page],
+        }
+
+    def suggest(self, query, limit=8):
+        """Autocomplete: the query with its last word completed from the vocabulary"""
+        return {"query": query, "suggestions": self.spelling.complete_query(query, limit)}
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Search Index Builder
+Tokenizes every caption in all-posts.json once and writes a compact inverted
+index (token -> sorted list of post ids) that index.html uses to answer
+multi-word AND queries without scanning every caption.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+INDEX_VERSION = 1
+
+
+def tokenize(caption):
+    """Split a caption into lowercase whitespace-delimited tokens.
+
+    The page matches each search word with ``caption.includes(word)``.  A word
+    without whitespace can only ever match inside a single whitespace-delimited
+    token, so indexing these tokens keeps the exact same matching semantics.
+    """
+    if not caption:
+        return []
+    return caption.lower().split()
+
+
+def build_inverted_index(posts):
+    """Build {token: sorted post ids} for a list of posts.
+
+    Posts are identified by their stable ``id`` field, falling back to their
+    position in the list for corpora that have not been given ids yet.
+    """
+    postings = {}
+    for position, post in enumerate(posts):
+        post_id = post.get('id', position)
+        for token in set(tokenize(post.get('caption', ''))):
+            postings.setdefault(token, []).append(post_id)
+    return {token: sorted(postings[token]) for token in sorted(postings)}
+
+
+def delta_encode(ids):
+    """Store a sorted id list as gaps between ids, which serialize much shorter"""
+    return [b - a for a, b in zip([0] + ids, ids)]
+
+
+def delta_decode(gaps):
+    """Turn a gap-encoded postings list back into sorted ids"""
+    ids = []
+    current = 0
+    for gap in gaps:
+        current += gap
+        ids.append(current)
+    return ids
+
+
+def load_search_index(index_file="search-index.json"):
+    """Load search-index.json and return {token: sorted post ids}"""
+    with open(index_file, 'r', encoding='utf-8') as f:
+        index = json.load(f)
+    return {token: delta_decode(gaps) for token, gaps in index['tokens'].items()}
+
+
+def build_search_index(posts, output_file="search-index.json"):
+    """Build the inverted index for posts and write it as minified JSON"""
+    tokens = build_inverted_index(posts)
+    index = {
+        "version": INDEX_VERSION,
+        "total_posts": len(posts),
+        # Posts added after this id are not in the index yet; the page scans their captions
+        "max_id": max((post.get('id', position) for position, post in enumerate(posts)), default=-1),
+        "tokens": {token: delta_encode(ids) for token, ids in tokens.items()},
+    }
+
+    output_file = Path(output_file)
+    try:
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+        print(f"✅ Wrote {output_file} ({len(index['tokens'])} tokens, {len(posts)} posts)")
+    except IOError as e:
+        print(f"❌ Error saving {output_file}: {e}")
+
+    return tokens
+
+
+def matching_tokens(vocabulary, word):
+    """Return the vocabulary tokens that contain word as a substring"""
+    return [token for token in vocabulary if word in token]
+
+
+def intersect_sorted(a, b):
+    """Intersect two sorted id lists"""
+    result = []
+    i = j = 0
+    while i < len(a) and j < len(b):
+        if a[i] == b[j]:
+            result.append(a[i])
+            i += 1
+            j += 1
+        elif a[i] < b[j]:
+            i += 1
+        else:
+            j += 1
+    return result
+
+
+def query_index(tokens, query, vocabulary=None):
+    """Answer an AND-of-words query against the index, mirroring index.html.
+
+    Returns the sorted ids of posts whose caption contains every word of the
+    query, or None for an empty query (meaning "all posts").
+    """
+    words = query.lower().split()
+    if not words:
+        return None
+
+    if vocabulary is None:
+        vocabulary = list(tokens)
+
+    word_postings = []
+    for word in set(words):
+        ids = set()
+        for token in matching_tokens(vocabulary, word):
+            ids.update(tokens[token])
+        if not ids:
+            return []
+        word_postings.append(sorted(ids))
+
+    # Intersect the shortest lists first so the running result shrinks fast
+    word_postings.sort(key=len)
+    result = word_postings[0]
+    for ids in word_postings[1:]:
+        result = intersect_sorted(result, ids)
+        if not result:
+            break
+    return result
+
+
+def main():
+    """Build search-index.json from all-posts.json"""
+    input_file = sys.argv[1] if len(sys.argv) > 1 else "all-posts.json"
+    output_file = sys.argv[2] if len(sys.argv) > 2 else "search-index.json"
+
+    with open(input_file, 'r', encoding='utf-8') as f:
+        posts = json.load(f).get('posts', [])
+
+    build_search_index(posts, output_file)
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Post Shards
+Splits the corpus into minified per-month shard files plus a small manifest,
+so the website can load the current season first and older months on demand.
+Only shards whose content changed are rewritten. Each post in a shard also
+carries t, its added_at as UTC epoch seconds, so the page never has to parse
+dates.
+"""
+
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+
+from dates import parse_added_at, to_utc_iso
+
+MANIFEST_VERSION = 1
+UNDATED_SHARD = "undated"
+_NO_DATE = datetime.min.replace(tzinfo=timezone.utc)
+
+
+def assign_post_ids(posts):
+    """Give every post without an id a stable integer id.
+
+    Ids never change once assigned. New ids continue after the largest
+    existing id, oldest post first, so ids roughly follow posting order.
+    Returns the number of ids assigned.
+    """
+    next_id = max((post['id'] for post in posts if 'id' in post), default=-1) + 1
+    unassigned = [post for post in posts if 'id' not in post]
+    for post in sorted(unassigned, key=lambda p: parse_added_at(p.get('added_at')) or _NO_DATE):
+        post['id'] = next_id
+        next_id += 1
+    return len(unassigned)
+
+
+def shard_key(added):
+    """Month (YYYY-MM) a post belongs to, from its parsed added_at"""
+    return added.strftime('%Y-%m') if added else UNDATED_SHARD
+
+
+def sort_newest_first(posts):
+    """Sort posts newest first (ties broken by id) - the order the page shows them in"""
+    def key(post):
+        return parse_added_at(post.get('added_at')) or _NO_DATE, post.get('id', 0)
+    return sorted(posts, key=key, reverse=True)
+
+
+def write_if_changed(path, content):
+    """Write content to path unless the file already holds exactly that content"""
+    data = content.encode('utf-8')
+    if path.exists() and path.read_bytes() == data:
+        return False
+    path.write_bytes(data)
+    return True
+
+
+def _dump(data):
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+
+
+def _order_keys(keys):
+    """Month keys newest first, with "undated" (which sorts after YYYY-MM) last"""
+    ordered = sorted((k for k in keys if k != UNDATED_SHARD), reverse=True)
+    if UNDATED_SHARD in keys:
+        ordered.append(UNDATED_SHARD)
+    return ordered
+
+
+def _with_epoch(post, added):
+    """The post as written to its shard: t (UTC epoch seconds) added when it has a date"""
+    post = {k: v for k, v in post.items() if k != 't'}
+    if added:
+        post['t'] = int(added.timestamp())
+    return post
+
+
+def _write_shard(shards_dir, key, posts):
+    """Write one shard (newest post first) and return (rewritten, manifest entry)"""
+    # Newest first as in sort_newest_first(), parsing each date only once
+    dated = sorted(((parse_added_at(post.get('added_at')), post) for post in posts),
+                   key=lambda pair: (pair[0] or _NO_DATE, pair[1].get('id', 0)), reverse=True)
+    filename = f"{key}.json"
+    rewritten = write_if_changed(shards_dir / filename, _dump({
+        "month": key,
+        "posts": [_with_epoch(post, added) for added, post in dated],
+    }))
+
+    dates = [added for added, _ in dated if added]
+    return rewritten, {
+        "month": key,
+        "file": filename,
+        "count": len(dated),
+        "first_added": to_utc_iso(min(dates)) if dates else None,
+        "last_added": to_utc_iso(max(dates)) if dates else None,
+    }
+
+
+def _write_manifest(shards_dir, manifest_shards, last_updated):
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "total_posts": sum(shard['count'] for shard in manifest_shards),
+        "last_updated": last_updated,
+        "shards": manifest_shards,
+    }
+    write_if_changed(shards_dir / "manifest.json", json.dumps(manifest, ensure_ascii=False, indent=2))
+
+
+def _report(changed, total_shards):
+    if changed:
+        print(f"✅ Rewrote {len(changed)} of {total_shards} shards: {', '.join(changed)}")
+    else:
+        print(f"ℹ️  All {total_shards} shards already up to date")
+
+
+def write_shards(posts, shards_dir="posts", last_updated=None):
+    """Write one minified shard per month plus manifest.json.
+
+    Shards are listed newest first, so concatenating them in manifest order
+    gives every post in the page's display order. Returns the list of shard
+    keys that were rewritten.
+    """
+    shards_dir = Path(shards_dir)
+    shards_dir.mkdir(parents=True, exist_ok=True)
+
+    by_month = {}
+    for post in posts:
+        by_month.setdefault(shard_key(parse_added_at(post.get('added_at'))), []).append(post)
+
+    changed = []
+    manifest_shards = []
+    for key in _order_keys(by_month):
+        rewritten, entry = _write_shard(shards_dir, key, by_month[key])
+        if rewritten:
+            changed.append(key)
+        manifest_shards.append(entry)
+
+    # Drop shards for months that no longer have posts
+    current_files = {shard['file'] for shard in manifest_shards}
+    for path in shards_dir.glob("*.json"):
+        if path.name != "manifest.json" and path.name not in current_files:
+            path.unlink()
+            changed.append(path.stem)
+
+    _write_manifest(shards_dir, manifest_shards, last_updated)
+    _report(changed, len(manifest_shards))
+    return changed
+
+
+def add_to_shards(posts, shards_dir="posts", last_updated=None):
+    """Add (or replace, by id) posts in the existing shards.
+
+    Only the shards for the posts' months are read and rewritten. Returns the
+    rewritten shard keys, or None when there is no manifest to update yet.
+    """
+    shards_dir = Path(shards_dir)
+    manifest_file = shards_dir / "manifest.json"
+    if not manifest_file.exists():
+        return None
+
+    with open(manifest_file, 'r', encoding='utf-8') as f:
+        manifest_shards = {shard['month']: shard for shard in json.load(f)['shards']}
+
+    by_month = {}
+    for post in posts:
+        by_month.setdefault(shard_key(parse_added_at(post.get('added_at'))), []).append(post)
+
+    changed = []
+    for key, new_posts in by_month.items():
+        shard_posts = []
+        if key in manifest_shards:
+            with open(shards_dir / manifest_shards[key]['file'], 'r', encoding='utf-8') as f:
+                shard_posts = json.load(f)['posts']
+
+        replaced_ids = {post['id'] for post in new_posts}
+        shard_posts = [post for post in shard_posts if post.get('id') not in replaced_ids] + new_posts
+
+        rewritten, manifest_shards[key] = _write_shard(shards_dir, key, shard_posts)
+        if rewritten:
+            changed.append(key)
+
+    _write_manifest(shards_dir, [manifest_shards[key] for key in _order_keys(manifest_shards)], last_updated)
+    _report(changed, len(manifest_shards))
+    return changed
@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Similar Posts
+"People like this": for every post, the NEIGHBOURS posts with the most
+similar captions, by cosine similarity of sparse TF-IDF vectors. The terms
+are caption words (no stopwords or numbers) plus the campus, residence,
+college and program the post was tagged with (see entities.py). Those tags are weighted
+up, so a shared home or program counts for more than a shared word.
+
+Vectors live in CSR arrays (the array module): term ids and weights with an
+offset per post. Each is cut to its TERMS_PER_POST strongest terms and
+L2-normalized. Neighbours come from an inverted-index candidate pass instead
+of comparing all pairs:
+- a post's QUERY_TERMS strongest terms look up the newest POSTING_LIMIT
+  posts using each (Counter.update, which runs in C);
+- the CANDIDATES posts sharing the most of them are scored exactly;
+- the best NEIGHBOURS scoring at least MIN_SCORE are kept.
+
+similar/ holds the neighbours in blocks of BLOCK_SIZE post ids, so the page
+fetches one small file when someone asks for people like a post:
+
+  similar/index.json   {"version": 1, "k": 6, "block_size": 1000, "max_id": n,
+                        "blocks": ["00000.json", ...]}
+  similar/00000.json   {"start": 0, "neighbours": [[ids like post 0, best first], [... post 1], ...]}
+  similar/vectors.bin  the index itself (vocabulary, document frequencies, vectors and scored
+                       neighbour lists), for the monitor; the page never fetches it
+
+Publishing rebuilds everything. Between compactions the monitor load()s
+vectors.bin and add()s new posts to it: each gets its neighbours and joins
+the lists of the posts it beats the last entry of. Only the blocks that
+changed are rewritten, so a run reads no captions but its new posts'.
+
+Usage: python scripts/similar_posts.py [all-posts.json] [post id ...]   # build and show neighbours
+"""
+
+import heapq
+import json
+import math
+import os
+import struct
+import sys
+import time
+from array import array
+from collections import Counter
+from itertools import repeat
+from operator import itemgetter, mul
+from pathlib import Path
+
+from shards import write_if_changed
+from vocabulary import STOPWORDS, WORD_RE
+
+SIMILAR_VERSION = 1
+NEIGHBOURS = 6
+BLOCK_SIZE = 1000
+TERMS_PER_POST = 16  # Strongest terms kept per vector
+QUERY_TERMS = 6  # ...of which these find candidates
+POSTING_LIMIT = 128  # Newest posts per term that the candidate pass looks at
+CANDIDATES = 24  # Posts sharing the most query terms, scored exactly
+MIN_SCORE = 0.1
+ENTITY_KINDS = ('campus', 'residence', 'college', 'program')
+ENTITY_WEIGHT = 2.0
+
+VECTORS_FILE = "vectors.bin"
+VECTORS_VERSION = 1  # Bump when a change to the weighting makes stored vectors stale
+_VECTORS_MAGIC = b'SIMVEC1\n'
+_VECTORS_HEADER = struct.Struct('<8sIIQQQQ')  # magic, version, k, terms, posts, vector entries, vocabulary bytes
+_LITTLE = sys.byteorder == 'little'
+
+
+def post_terms(post):
+    """Counter of a post's terms: caption words and "kind:name" entity tags"""
+    terms = Counter(word for word in WORD_RE.findall((post.get('caption') or '').lower())
+                    if len(word) > 2 and word not in STOPWORDS and not word.isdigit())
+    entities = post.get('entities') or {}
+    for kind in ENTITY_KINDS:
+        for name in entities.get(kind, ()):
+            terms[f"{kind}:{name}"] += 1
+    return terms
+
+
+def _column(values, typecode):
+    """values as little-endian bytes"""
+    column = array(typecode, values)
+    if not _LITTLE:
+        column.byteswap()
+    return column.tobytes()
+
+
+def _read_column(f, typecode, count, result_typecode):
+    """count little-endian values from f, as an array of result_typecode"""
+    column = array(typecode)
+    column.fromfile(f, count)
+    if not _LITTLE:
+        column.byteswap()
+    return column if typecode == result_typecode else array(result_typecode, column)
+
+
+class SimilarPosts:
+    """TF-IDF vectors, pruned postings and neighbour lists, grown a batch of posts at a time"""
+
+    def __init__(self):
+        self.term_ids = {}
+        self.entity_terms = set()  # Ids of the "kind:name" terms
+        self.df = array('l')  # Posts using each term
+        self.ids = array('l')  # Post id at each position
+        self.position = {}  # Post id -> position
+        self.offsets = array('l', [0])  # Position p's terms are terms[offsets[p]:offsets[p + 1]]
+        self.terms = array('l')
+        self.weights = array('d')
+        self.postings = {}  # Term id -> positions using it, oldest first (pruned to the newest)
+        self.neighbours = []  # Position -> [(score, position)], best first
+
+    @classmethod
+    def from_posts(cls, posts):
+        similar = cls()
+        similar.add(posts)
+        return similar
+
+    @classmethod
+    def load(cls, similar_dir):
+        """The index as write_similar_posts() left it in similar_dir (no caption is read);
+        add() the posts it doesn't cover. A missing or outdated vectors.bin covers nothing."""
+        similar = cls()
+        try:
+            with open(Path(similar_dir) / VECTORS_FILE, 'rb') as f:
+                magic, version, k, term_count, post_count, entry_count, vocabulary_size = \
+                    _VECTORS_HEADER.unpack(f.read(_VECTORS_HEADER.size))
+                if magic != _VECTORS_MAGIC or version != VECTORS_VERSION or k != NEIGHBOURS:
+                    return similar
+                vocabulary = f.read(vocabulary_size).decode('utf-8').split('\n') if term_count else []
+                df = _read_column(f, 'q', term_count, 'l')
+                ids = _read_column(f, 'q', post_count, 'l')
+                offsets = _read_column(f, 'q', post_count + 1, 'l')
+                terms = _read_column(f, 'q', entry_count, 'l')
+                weights = _read_column(f, 'd', entry_count, 'd')
+                neighbour_positions = _read_column(f, 'q', post_count * NEIGHBOURS, 'q')
+                neighbour_scores = _read_column(f, 'd', post_count * NEIGHBOURS, 'd')
+        except FileNotFoundError:
+            return similar
+        except (OSError, EOFError, ValueError, struct.error) as e:
+            print(f"⚠️  Rebuilding similar posts: {e}")
+            return similar
+
+        similar.term_ids = {term: term_id for term_id, term in enumerate(vocabulary)}
+        similar.entity_terms = {term_id for term_id, term in enumerate(vocabulary) if ':' in term}
+        similar.df, similar.ids, similar.offsets, similar.terms, similar.weights = df, ids, offsets, terms, weights
+        similar.position = {post_id: position for position, post_id in enumerate(ids)}
+        for position in range(post_count):
+            similar._add_postings(position, terms[offsets[position]:offsets[position + 1]])
+        similar.neighbours = [
+            [(score, other) for score, other in zip(neighbour_scores[start:start + NEIGHBOURS],
+                                                    neighbour_positions[start:start + NEIGHBOURS]) if other >= 0]
+            for start in range(0, post_count * NEIGHBOURS, NEIGHBOURS)
+        ]
+        return similar
+
+    def save(self, vectors_file):
+        """Atomically write the index for load()"""
+        neighbour_positions = array('q', [-1]) * (len(self.ids) * NEIGHBOURS)
+        neighbour_scores = array('d', [0.0]) * (len(self.ids) * NEIGHBOURS)
+        for position, entries in enumerate(self.neighbours):
+            for slot, (score, other) in enumerate(entries, position * NEIGHBOURS):
+                neighbour_positions[slot] = other
+                neighbour_scores[slot] = score
+        # Term ids were handed out in insertion order, so the keys are in id order
+        vocabulary = '\n'.join(self.term_ids).encode('utf-8')
+
+        vectors_file = Path(vectors_file)
+        tmp_file = vectors_file.with_suffix(vectors_file.suffix + ".tmp")
+        with open(tmp_file, 'wb') as f:
+            f.write(_VECTORS_HEADER.pack(_VECTORS_MAGIC, VECTORS_VERSION, NEIGHBOURS, len(self.df), len(self.ids),
+                                         len(self.terms), len(vocabulary)))
+            f.write(vocabulary)
+            for values, typecode in ((self.df, 'q'), (self.ids, 'q'), (self.offsets, 'q'), (self.terms, 'q'),
+                                     (self.weights, 'd'), (neighbour_positions, 'q'), (neighbour_scores, 'd')):
+                f.write(_column(values, typecode))
+        os.replace(tmp_file, vectors_file)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, post_id):
+        return post_id in self.position
+
+    def _term_id(self, term):
+        term_id = self.term_ids.get(term)
+        if term_id is None:
+            term_id = self.term_ids[term] = len(self.df)
+            self.df.append(0)
+            if ':' in term:
+                self.entity_terms.add(term_id)
+        return term_id
+
+    def _append_vector(self, post_id, term_ids, counts, idf):
+        """Weigh, prune and normalize a post's terms and index them"""
+        weighted = heapq.nlargest(TERMS_PER_POST, [(idf[term_id] * (1 + math.log(count)), term_id)
+                                                   for term_id, count in zip(term_ids, counts)])
+        norm = math.sqrt(sum(weight * weight for weight, _ in weighted)) or 1.0
+
+        position = len(self.ids)
+        self.ids.append(post_id)
+        self.position[post_id] = position
+        for weight, term_id in weighted:
+            self.terms.append(term_id)
+            self.weights.append(weight / norm)
+        self._add_postings(position, [term_id for _, term_id in weighted])
+        self.offsets.append(len(self.terms))
+        self.neighbours.append([])
+
+    def _add_postings(self, position, term_ids):
+        for term_id in term_ids:
+            postings = self.postings.setdefault(term_id, [])
+            postings.append(position)
+            if len(postings) > 2 * POSTING_LIMIT:
+                del postings[:-POSTING_LIMIT]
+
+    def score(self, a, b):
+        """Cosine similarity of the posts at positions a and b"""
+        start, end = self.offsets[a], self.offsets[a + 1]
+        mine = dict(zip(self.terms[start:end], self.weights[start:end]))
+        start, end = self.offsets[b], self.offsets[b + 1]
+        return sum(map(mul, map(mine.get, self.terms[start:end], repeat(0.0)), self.weights[start:end]))
+
+    def query(self, position):
+        """[(score, position)] of the best neighbours of the post at position"""
+        start, end = self.offsets[position], self.offsets[position + 1]
+        counts = Counter()
+        for term_id in self.terms[start:min(end, start + QUERY_TERMS)]:
+            counts.update(self.postings[term_id][-POSTING_LIMIT:])
+        counts.pop(position, None)
+
+        mine = dict(zip(self.terms[start:end], self.weights[start:end]))
+        get = mine.get
+        offsets, terms, weights = self.offsets, self.terms, self.weights
+        scored = []
+        # A C sort of a few hundred items beats most_common()'s heap here
+        for other, _ in sorted(counts.items(), key=itemgetter(1), reverse=True)[:CANDIDATES]:
+            a, b = offsets[other], offsets[other + 1]
+            score = sum(map(mul, map(get, terms[a:b], repeat(0.0)), weights[a:b]))
+            if score >= MIN_SCORE:
+                scored.append((score, other))
+        return heapq.nlargest(NEIGHBOURS, scored)
+
+    def _offer(self, position, score, other):
+        """Put other in position's list if it beats the last entry; True if it did"""
+        entries = self.neighbours[position]
+        for _, entry in entries:
+            if entry == other:
+                return False
+        if len(entries) < NEIGHBOURS or score > entries[-1][0]:
+            entries.append((score, other))
+            entries.sort(reverse=True)
+            del entries[NEIGHBOURS:]
+            return True
+        return False
+
+    def add(self, posts):
+        """Index posts (ones with an id not seen yet) and find their neighbours.
+
+        Returns the ids of the posts whose neighbour lists changed.
+        """
+        new = sorted((post for post in posts if post.get('id') is not None and post['id'] not in self.position),
+                     key=lambda post: post['id'])
+        if not new:
+            return set()
+
+        # Document frequencies first, so the batch is weighed with its own terms counted;
+        # the batch's term ids and counts are kept flat, so each caption is tokenized once
+        batch_terms = array('l')
+        batch_counts = array('l')
+        batch_offsets = [0]
+        for post in new:
+            for term, count in post_terms(post).items():
+                term_id = self._term_id(term)
+                self.df[term_id] += 1
+                batch_terms.append(term_id)
+                batch_counts.append(count)
+            batch_offsets.append(len(batch_terms))
+
+        total = len(self.ids) + len(new)
+        idf = [math.log(1 + total / df) if df else 0.0 for df in self.df]
+        for term_id in self.entity_terms:
+            idf[term_id] *= ENTITY_WEIGHT
+
+        first = len(self.ids)
+        for post, start, end in zip(new, batch_offsets, batch_offsets[1:]):
+            self._append_vector(post['id'], batch_terms[start:end], batch_counts[start:end], idf)
+
+        changed = set()
+        for position in range(first, len(self.ids)):
+            post_id = self.ids[position]
+            changed.add(post_id)
+            for score, other in self.query(position):
+                self._offer(position, score, other)
+                if self._offer(other, score, position):
+                    changed.add(self.ids[other])
+        return changed
+
+    def neighbour_ids(self, post_id):
+        """Ids of the posts most like post_id, best first"""
+        position = self.position.get(post_id)
+        if position is None:
+            return []
+        return [self.ids[other] for _, other in self.neighbours[position]]
+
+    def block(self, number):
+        start = number * BLOCK_SIZE
+        return {
+            "start": start,
+            "neighbours": [self.neighbour_ids(post_id) for post_id in range(start, start + BLOCK_SIZE)],
+        }
+
+
+def write_similar_posts(similar, similar_dir="similar", changed_ids=None):
+    """Write the blocks holding changed_ids (all of them if None), index.json and vectors.bin;
+    returns blocks written"""
+    similar_dir = Path(similar_dir)
+    similar_dir.mkdir(parents=True, exist_ok=True)
+    max_id = max(similar.ids, default=-1)
+    blocks = [f"{number:05d}.json" for number in range(max_id // BLOCK_SIZE + 1)]
+
+    numbers = range(len(blocks)) if changed_ids is None else sorted({post_id // BLOCK_SIZE for post_id in changed_ids})
+    written = 0
+    for number in numbers:
+        content = json.dumps(similar.block(number), separators=(',', ':'))
+        written += write_if_changed(similar_dir / blocks[number], content)
+
+    # Drop blocks past the end (the corpus shrank)
+    for path in similar_dir.glob("[0-9]*.json"):
+        if path.name not in blocks:
+            path.unlink()
+            path.with_name(path.name + '.gz').unlink(missing_ok=True)
+
+    index = {"version": SIMILAR_VERSION, "k": NEIGHBOURS, "block_size": BLOCK_SIZE, "max_id": max_id,
+             "blocks": blocks}
+    write_if_changed(similar_dir / "index.json", json.dumps(index, indent=2))
+    # Last, so vectors.bin never covers posts whose blocks weren't written
+    similar.save(similar_dir / VECTORS_FILE)
+    return written
+
+
+def build_similar_posts(posts, similar_dir="similar"):
+    """Rebuild every post's neighbours and write similar/; returns the SimilarPosts"""
+    start = time.perf_counter()
+    similar = SimilarPosts.from_posts(posts)
+    written = write_similar_posts(similar, similar_dir)
+    linked = sum(1 for entries in similar.neighbours if entries)
+    print(f"✅ Found similar posts for {linked} of {len(similar)} posts, rewrote {written} blocks "
+          f"({time.perf_counter() - start:.1f}s)")
+    return similar
+
+
+def main():
+    snapshot_file = Path(sys.argv[1] if len(sys.argv) > 1 else "all-posts.json")
+    from entities import tag_posts
+    from publish import load_snapshot
+    from shards import assign_post_ids
+
+    posts = load_snapshot(snapshot_file).get('posts', [])
+    assign_post_ids(posts)
+    tag_posts(posts)
+    similar = build_similar_posts(posts, snapshot_file.with_name("similar"))
+
+    by_id = {post['id']: post for post in posts}
+    for post_id in map(int, sys.argv[2:]):
+        print(f"\n📝 {post_id}: {by_id.get(post_id, {}).get('caption', '')[:100]}")
+        position = similar.position.get(post_id)
+        for score, other in similar.neighbours[position] if position is not None else []:
+            print(f"  {score:.2f}  {similar.ids[other]}: {by_id[similar.ids[other]].get('caption', '')[:90]}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
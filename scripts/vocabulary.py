@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Search Vocabulary
+The words (and common two-word phrases) used in captions, with how many
+posts use each, for typo-tolerant search and autocomplete. A query word
+that matches nothing ("engeneering", "chestnutt") is replaced by the closest
+vocabulary word: candidates are the words sharing the most character
+trigrams with it, and the one at the smallest edit distance wins, the more
+common one on ties. Completions are the most common words and phrases
+starting with what has been typed ("chest" -> "chestnut", "new c" ->
+"new college").
+
+vocabulary.json, written next to search-index.json when the site is
+published, stays within VOCABULARY_BUDGET bytes however big the corpus gets
+(the rarest words are left out first):
+
+  {"version": 1, "words": [sorted words], "df": [posts per word],
+   "phrases": [sorted "word word" phrases], "phrase_df": [posts per phrase]}
+
+Trigrams aren't stored; they are rebuilt from the words on first use (about
+20 ms in Python for a full vocabulary), so the download stays fixed.
+
+Usage: python scripts/vocabulary.py [all-posts.json] [word ...]   # correct and complete each word
+"""
+
+import heapq
+import json
+import re
+import sys
+import time
+from bisect import bisect_left
+from collections import Counter
+from pathlib import Path
+
+VOCABULARY_VERSION = 1
+VOCABULARY_BUDGET = 64 * 1024  # Bytes of JSON for words and phrases together
+PHRASE_BUDGET = 16 * 1024  # ...of which at most this much is phrases
+MIN_WORD_DF = 2  # A word in a single post is as likely a typo as a target
+MIN_PHRASE_DF = 5
+MIN_CORRECTION_LENGTH = 4  # Shorter words have too many neighbours to guess from
+CANDIDATES = 20  # Words by trigram overlap that get an edit distance check
+COMPLETIONS = 8
+
+WORD_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+# Phrases don't run across sentence or list punctuation
+CLAUSE_RE = re.compile(r"[^.,!?;:|()\n/•·-]+")
+STOPWORDS = frozenset(
+    "a about all also always am an and any anyone are as at be been but by can do for from get go going "
+    "have hey hi i i'm if im in into is it it's just like me my of on or really so some that the this to "
+    "too up very was we what will with you your".split())
+
+
+def caption_terms(caption):
+    """(set of lowercase words, set of phrases) of a caption; phrases are neighbouring
+    words within a clause, neither of them a stopword or a number"""
+    words = set()
+    phrases = set()
+    for clause in CLAUSE_RE.findall((caption or '').lower()):
+        clause_words = WORD_RE.findall(clause)
+        words.update(clause_words)
+        phrases.update(f"{a} {b}" for a, b in zip(clause_words, clause_words[1:])
+                       if a not in STOPWORDS and b not in STOPWORDS and not (a.isdigit() or b.isdigit()))
+    return words, phrases
+
+
+def trigrams(word):
+    """Character trigrams of a word padded with '$', so short words have some too"""
+    padded = f"${word}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a, b, limit):
+    """Optimal string alignment distance (a swap of neighbours counts as one), or limit + 1 past limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+def max_edits(word):
+    return 1 if len(word) <= 5 else 2
+
+
+def _within_budget(counts, minimum, budget):
+    """The most common entries of counts whose JSON fits in budget bytes"""
+    kept = []
+    size = 0
+    for entry, df in sorted(counts.items(), key=lambda item: (-item[1], item[0])):
+        if df < minimum:
+            break
+        # "entry", in one array plus the count in the other
+        size += len(entry.encode('utf-8')) + len(str(df)) + 4
+        if size > budget:
+            break
+        kept.append(entry)
+    return sorted(kept)
+
+
+class Vocabulary:
+    """Sorted words and phrases with their document frequencies"""
+
+    def __init__(self, words, df, phrases=(), phrase_df=()):
+        self.words = list(words)
+        self.df = list(df)
+        self.phrases = list(phrases)
+        self.phrase_df = list(phrase_df)
+        self._frequency = None
+        self._trigrams = None
+
+    @classmethod
+    def from_posts(cls, posts, budget=VOCABULARY_BUDGET, phrase_budget=PHRASE_BUDGET):
+        word_counts = Counter()
+        phrase_counts = Counter()
+        for post in posts:
+            words, phrases = caption_terms(post.get('caption', ''))
+            word_counts.update(words)
+            phrase_counts.update(phrases)
+
+        phrases = _within_budget(phrase_counts, MIN_PHRASE_DF, phrase_budget)
+        phrase_size = sum(len(phrase.encode('utf-8')) + len(str(phrase_counts[phrase])) + 4 for phrase in phrases)
+        words = _within_budget(word_counts, MIN_WORD_DF, budget - phrase_size)
+        return cls(words, [word_counts[word] for word in words],
+                   phrases, [phrase_counts[phrase] for phrase in phrases])
+
+    @classmethod
+    def load(cls, vocabulary_file="vocabulary.json"):
+        with open(vocabulary_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data['words'], data['df'], data.get('phrases', []), data.get('phrase_df', []))
+
+    def to_dict(self):
+        return {
+            "version": VOCABULARY_VERSION,
+            "words": self.words,
+            "df": self.df,
+            "phrases": self.phrases,
+            "phrase_df": self.phrase_df,
+        }
+
+    def __len__(self):
+        return len(self.words)
+
+    def __contains__(self, word):
+        return word in self.frequency
+
+    @property
+    def frequency(self):
+        """{word: posts using it}"""
+        if self._frequency is None:
+            self._frequency = dict(zip(self.words, self.df))
+        return self._frequency
+
+    def trigram_index(self):
+        """{trigram: positions of the words containing it}, built on first use"""
+        if self._trigrams is None:
+            self._trigrams = {}
+            for position, word in enumerate(self.words):
+                for gram in trigrams(word):
+                    self._trigrams.setdefault(gram, []).append(position)
+        return self._trigrams
+
+    def correct(self, word):
+        """The closest vocabulary word to a misspelled word, or None if nothing is close enough"""
+        word = word.lower()
+        if len(word) < MIN_CORRECTION_LENGTH or word in self.frequency:
+            return None
+
+        index = self.trigram_index()
+        overlap = Counter()
+        for gram in trigrams(word):
+            overlap.update(index.get(gram, ()))
+
+        limit = max_edits(word)
+        best = None
+        # Ties on overlap go to the earlier word, as on the page
+        for position, _ in heapq.nsmallest(CANDIDATES, overlap.items(), key=lambda item: (-item[1], item[0])):
+            candidate = self.words[position]
+            distance = edit_distance(word, candidate, limit)
+            if distance <= limit:
+                key = (distance, -self.df[position], candidate)
+                if best is None or key < best:
+                    best = key
+        return best[2] if best else None
+
+    def correct_query(self, query, matches):
+        """query with each word that matches() rejects replaced by its correction, or None if none could be"""
+        words = query.lower().split()
+        corrected = False
+        for i, word in enumerate(words):
+            if not matches(word):
+                replacement = self.correct(word)
+                if replacement is None:
+                    return None
+                words[i] = replacement
+                corrected = True
+        return ' '.join(words) if corrected else None
+
+    def complete(self, prefix, limit=COMPLETIONS):
+        """The most common words and phrases starting with prefix, most common first"""
+        prefix = ' '.join(prefix.lower().split())
+        if not prefix:
+            return []
+        found = []
+        for entries, counts in ((self.words, self.df), (self.phrases, self.phrase_df)):
+            i = bisect_left(entries, prefix)
+            while i < len(entries) and entries[i].startswith(prefix):
+                if entries[i] != prefix:
+                    found.append((-counts[i], entries[i]))
+                i += 1
+        return [entry for _, entry in sorted(found)[:limit]]
+
+    def complete_query(self, query, limit=COMPLETIONS):
+        """Whole-query suggestions: the last word (or last two, for phrases) completed"""
+        words = query.lower().split()
+        if not words or query[-1:].isspace():
+            return []
+        suggestions = []
+        for tail in (2, 1):
+            # One typed letter completes to too many words to be useful
+            if len(words) >= tail and len(words[-1]) >= (1 if tail == 2 else 2):
+                head = ' '.join(words[:-tail])
+                for completion in self.complete(' '.join(words[-tail:]), limit):
+                    suggestion = f"{head} {completion}".lstrip()
+                    if suggestion not in suggestions:
+                        suggestions.append(suggestion)
+        return suggestions[:limit]
+
+
+def build_vocabulary(posts, output_file="vocabulary.json"):
+    """Write vocabulary.json for posts and return the Vocabulary"""
+    vocabulary = Vocabulary.from_posts(posts)
+    output_file = Path(output_file)
+    try:
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(vocabulary.to_dict(), f, ensure_ascii=False, separators=(',', ':'))
+        print(f"✅ Wrote {output_file} ({len(vocabulary.words)} words, {len(vocabulary.phrases)} phrases, "
+              f"{output_file.stat().st_size} bytes)")
+    except IOError as e:
+        print(f"❌ Error saving {output_file}: {e}")
+    return vocabulary
+
+
+def main():
+    snapshot_file = Path(sys.argv[1] if len(sys.argv) > 1 else "all-posts.json")
+    vocabulary_file = snapshot_file.with_name("vocabulary.json")
+    if vocabulary_file.exists():
+        vocabulary = Vocabulary.load(vocabulary_file)
+    else:
+        from publish import load_snapshot
+        vocabulary = build_vocabulary(load_snapshot(snapshot_file).get('posts', []), vocabulary_file)
+
+    start = time.perf_counter()
+    vocabulary.trigram_index()
+    print(f"📚 {len(vocabulary)} words, {len(vocabulary.phrases)} phrases "
+          f"(trigrams built in {(time.perf_counter() - start) * 1000:.1f} ms)")
+    for word in sys.argv[2:]:
+        start = time.perf_counter()
+        correction = vocabulary.correct(word)
+        completions = vocabulary.complete(word)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"  {word} → {correction or '(no correction)'}; completes to {', '.join(completions) or 'nothing'} "
+              f"({elapsed:.2f} ms)")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -1,43 +1,339 @@
 #!/usr/bin/env python3
 """
-Simple HTTP Server for Local Testing
-Replicates what GitHub Pages does - serves static files over HTTP
+Local / Edge HTTP Server
+Serves the site like GitHub Pages does, plus what a CDN origin needs:
+a thread per connection, an in-memory file cache refreshed on mtime change,
+prebuilt gzip variants (see scripts/precompress.py), strong ETags,
+Last-Modified / conditional GETs (304) and single byte-range requests.
+
+GET /api/search?q=chestnut&this_year=1&offset=0&limit=20 returns ranked,
+paginated search results as JSON, so clients need not download the corpus;
+a query that matches nothing is retried with its typos corrected.
+GET /api/suggest?q=chest returns autocomplete suggestions for a partial query.
 """
 
+import hashlib
 import http.server
-import socketserver
-import webbrowser
+import json
 import os
+import sys
+import threading
+import webbrowser
+from email.utils import formatdate, parsedate_to_datetime
 from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "scripts"))
+
+from post_log import PostLog
+from precompress import precompress_site
+from publish import load_snapshot
+from search_engine import SearchEngine
+
+MAX_PAGE_SIZE = 100
+MAX_SUGGESTIONS = 20
+
+
+class CachedFile:
+    """One file's bytes (and its gzip variant) with validators"""
+
+    def __init__(self, path, stat):
+        self.mtime_ns = stat.st_mtime_ns
+        self.last_modified = formatdate(stat.st_mtime, usegmt=True)
+        self.mtime = int(stat.st_mtime)
+        self.body = Path(path).read_bytes()
+        self.etag = '"' + hashlib.sha256(self.body).hexdigest()[:32] + '"'
+
+        self.gzip_body = None
+        self.gzip_etag = None
+        gz_path = Path(str(path) + '.gz')
+        try:
+            if gz_path.stat().st_mtime_ns >= self.mtime_ns:
+                self.gzip_body = gz_path.read_bytes()
+                # A different representation needs a different strong ETag
+                self.gzip_etag = self.etag[:-1] + '-gzip"'
+        except OSError:
+            pass
+
+
+class FileCache:
+    """Thread-safe path -> CachedFile map, reloaded when a file's mtime changes"""
+
+    def __init__(self):
+        self._files = {}
+        self._lock = threading.Lock()
+
+    def get(self, path):
+        stat = os.stat(path)
+        with self._lock:
+            cached = self._files.get(path)
+        if cached is None or cached.mtime_ns != stat.st_mtime_ns:
+            cached = CachedFile(path, stat)
+            with self._lock:
+                self._files[path] = cached
+        return cached
+
+
+FILE_CACHE = FileCache()
+
+
+class CorpusStore:
+    """The corpus and its SearchEngine, rebuilt when the corpus files change.
+
+    The post log holds posts that were not compacted into all-posts.json yet,
+    so it is preferred when it exists.
+    """
+
+    def __init__(self, snapshot_file="all-posts.json", log_file="data/posts.jsonl"):
+        self.snapshot_file = Path(snapshot_file)
+        self.post_log = PostLog(log_file)
+        self._engine = None
+        self._signature = None
+        self._lock = threading.Lock()
+
+    def signature(self):
+        """mtimes of the corpus files; any change invalidates the engine and its cache"""
+        signature = []
+        for path in (self.snapshot_file, self.post_log.log_file):
+            try:
+                signature.append(path.stat().st_mtime_ns)
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    def engine(self):
+        signature = self.signature()
+        with self._lock:
+            if self._engine is None or signature != self._signature:
+                if self.post_log.exists():
+                    posts, _ = self.post_log.current_posts()
+                else:
+                    posts = load_snapshot(self.snapshot_file).get('posts', [])
+                self._engine = SearchEngine(posts)
+                self._signature = signature
+                print(f"🔎 Search corpus loaded: {len(posts)} posts")
+            return self._engine
+
+
+CORPUS = CorpusStore()
+
+
+def accepts_gzip(accept_encoding):
+    """Whether an Accept-Encoding header allows gzip"""
+    for part in (accept_encoding or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        if coding.strip().lower() in ('gzip', '*'):
+            q = params.strip()
+            try:
+                return not (q.startswith('q=') and float(q[2:] or 0) == 0)
+            except ValueError:
+                return False
+    return False
+
+
+def parse_range(range_header, size):
+    """Parse a single 'bytes=' range into (start, end) inclusive.
+
+    Returns None when the header should be ignored (missing, malformed or
+    multiple ranges) and 'unsatisfiable' when no byte of it exists.
+    """
+    if not range_header or not range_header.startswith('bytes=') or ',' in range_header:
+        return None
+    start, _, end = range_header[6:].strip().partition('-')
+    try:
+        if not start:
+            length = int(end)
+            if length == 0:
+                return 'unsatisfiable'
+            return max(size - length, 0), size - 1
+        start = int(start)
+        end = int(end) if end else size - 1
+    except ValueError:
+        return None
+    if start >= size or end < start:
+        return 'unsatisfiable'
+    return start, min(end, size - 1)
+
+
+class CachingHandler(http.server.SimpleHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out in separate writes; with Nagle on, a small
+    # response waits ~40 ms for the client's delayed ACK of the headers
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.serve(send_body=True)
+
+    def do_HEAD(self):
+        self.serve(send_body=False)
+
+    def serve(self, send_body):
+        if urlsplit(self.path).path == '/api/search':
+            return self.serve_search(send_body)
+        if urlsplit(self.path).path == '/api/suggest':
+            return self.serve_suggest(send_body)
+
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            if not self.path.split('?', 1)[0].endswith('/'):
+                # Let the stock handler issue the trailing-slash redirect / listing
+                return self.fallback(send_body)
+            path = os.path.join(path, 'index.html')
+
+        try:
+            cached = FILE_CACHE.get(path)
+        except OSError:
+            return self.fallback(send_body)
+
+        use_gzip = cached.gzip_body is not None and accepts_gzip(self.headers.get('Accept-Encoding'))
+        body = cached.gzip_body if use_gzip else cached.body
+        etag = cached.gzip_etag if use_gzip else cached.etag
+
+        if self.not_modified(cached, etag):
+            self.send_response(304)
+            self.send_validators(cached, etag, use_gzip)
+            self.end_headers()
+            return
+
+        status = 200
+        content_range = None
+        if self.range_applies(cached, etag):
+            byte_range = parse_range(self.headers.get('Range'), len(body))
+            if byte_range == 'unsatisfiable':
+                self.send_response(416)
+                self.send_header('Content-Range', f'bytes */{len(body)}')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            if byte_range:
+                start, end = byte_range
+                content_range = f'bytes {start}-{end}/{len(body)}'
+                body = body[start:end + 1]
+                status = 206
+
+        self.send_response(status)
+        self.send_header('Content-Type', self.guess_type(path))
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Accept-Ranges', 'bytes')
+        if content_range:
+            self.send_header('Content-Range', content_range)
+        self.send_validators(cached, etag, use_gzip)
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def serve_search(self, send_body):
+        """GET /api/search?q=...&this_year=1&offset=0&limit=20"""
+        params = parse_qs(urlsplit(self.path).query)
+        try:
+            offset = max(int(params.get('offset', ['0'])[0]), 0)
+            limit = min(max(int(params.get('limit', ['20'])[0]), 1), MAX_PAGE_SIZE)
+        except ValueError:
+            return self.send_json(400, {"error": "offset and limit must be integers"}, send_body)
+
+        query = params.get('q', [''])[0]
+        this_year = params.get('this_year', ['0'])[0].lower() in ('1', 'true', 'yes')
+        self.send_json(200, CORPUS.engine().search(query, this_year, offset, limit), send_body)
+
+    def serve_suggest(self, send_body):
+        """GET /api/suggest?q=...&limit=8"""
+        params = parse_qs(urlsplit(self.path).query)
+        try:
+            limit = min(max(int(params.get('limit', ['8'])[0]), 1), MAX_SUGGESTIONS)
+        except ValueError:
+            return self.send_json(400, {"error": "limit must be an integer"}, send_body)
+        self.send_json(200, CORPUS.engine().suggest(params.get('q', [''])[0], limit), send_body)
+
+    def send_json(self, status, data, send_body):
+        body = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def send_validators(self, cached, etag, use_gzip):
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', cached.last_modified)
+        # Let the CDN keep copies but revalidate them; a 304 costs a few bytes
+        self.send_header('Cache-Control', 'public, no-cache')
+        if cached.gzip_body is not None:
+            self.send_header('Vary', 'Accept-Encoding')
+        if use_gzip:
+            self.send_header('Content-Encoding', 'gzip')
+
+    def not_modified(self, cached, etag):
+        """Evaluate If-None-Match, or If-Modified-Since when there is none"""
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            tags = [tag.strip() for tag in if_none_match.split(',')]
+            # Weak comparison, as RFC 9110 requires for If-None-Match
+            return '*' in tags or etag in (tag[2:] if tag.startswith('W/') else tag for tag in tags)
+
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since:
+            try:
+                return cached.mtime <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def range_applies(self, cached, etag):
+        """A Range is honoured unless an If-Range validator no longer matches"""
+        if_range = self.headers.get('If-Range')
+        if not if_range:
+            return True
+        if if_range.startswith('"'):
+            return if_range == etag
+        try:
+            return cached.mtime <= parsedate_to_datetime(if_range).timestamp()
+        except (TypeError, ValueError):
+            return False
+
+    def fallback(self, send_body):
+        """Directory listings, redirects and 404s from SimpleHTTPRequestHandler"""
+        if send_body:
+            super().do_GET()
+        else:
+            super().do_HEAD()
+
 
 def serve_local():
-    """Start a simple HTTP server for local testing"""
-    PORT = 8000
-    
+    """Start the HTTP server for local testing"""
+    PORT = int(os.getenv('PORT', '8000'))
+    open_browser = os.getenv('OPEN_BROWSER', 'true').lower() == 'true'
+
     # Change to the directory containing the files
     os.chdir(Path(__file__).parent)
-    
-    # Create server
-    Handler = http.server.SimpleHTTPRequestHandler
-    
+
+    # Make sure every gzip variant is up to date before serving
+    precompress_site(".")
+
+    # Load the search corpus once up front instead of on the first query
+    CORPUS.engine()
+
     print("🚀 Starting local server...")
     print("=" * 50)
     print(f"📡 Server running at: http://localhost:{PORT}")
     print(f"📄 Serving files from: {os.getcwd()}")
     print("=" * 50)
-    print("✅ Your website will open automatically!")
+    if open_browser:
+        print("✅ Your website will open automatically!")
     print("🔍 Test the search functionality")
     print("⏹️  Press Ctrl+C to stop the server")
     print()
-    
+
     try:
-        with socketserver.TCPServer(("", PORT), Handler) as httpd:
+        with http.server.ThreadingHTTPServer(("", PORT), CachingHandler) as httpd:
             # Auto-open browser
-            webbrowser.open(f'http://localhost:{PORT}')
-            
+            if open_browser:
+                webbrowser.open(f'http://localhost:{PORT}')
+
             print(f"📊 Serving {PORT} - ready for testing!")
             httpd.serve_forever()
-            
+
     except KeyboardInterrupt:
         print("\n🛑 Server stopped!")
     except Exception as e:
@@ -45,4 +341,4 @@ def serve_local():
         print("💡 Try a different port if 8000 is busy")
 
 if __name__ == "__main__":
-    serve_local() 
\ No newline at end of file
+    serve_local()
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Backfill Pipeline
+One pass over an Apify scraper dump (or an already cleaned file) with the
+stages the separate utils scripts used to run one after another:
+
+  clean   stream the raw dump into cleaned posts (optionally written out)
+  diff    split them into new posts, posts we have (same URL) and reposts
+          (same or near-duplicate caption), with samples
+  dates   when the dump's posts and the new ones are from
+  merge   append the new posts to the post log and republish the site
+
+Every input is read once and the URL / caption indexes are built once and
+shared by all stages. Without --merge it is a dry run that only reports.
+
+Usage:
+  python utils/backfill.py dataset_instagram-scraper_*.json [--write-cleaned cleaned_instagram_data.json] [--merge]
+  python utils/backfill.py --cleaned cleaned_instagram_data.json [--merge]
+"""
+import argparse
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from clean_apify_json import clean_posts, unique_posts, with_caption_and_url, with_entities, write_posts
+from columnar import columnar_file, open_columnar
+from date_index import DateIndex
+from json_stream import iter_json_array
+from near_duplicates import NearDuplicateIndex, report_clusters
+from post_keys import url_key
+from post_log import PostLog
+from publish import compact_and_publish, load_snapshot
+
+STAGES = ("clean", "diff", "dates", "merge")
+
+
+class Corpus:
+    """The existing posts plus the indexes every stage shares, each loaded once and only when needed.
+
+    Matching by URL only needs the post keys (the log's keys file, or the
+    url_key column of all-posts.bin), so captions are read only once a dump
+    post turns out not to be known by its URL.
+    """
+
+    def __init__(self, snapshot_file="all-posts.json", log_file="data/posts.jsonl"):
+        self.snapshot_file = Path(snapshot_file)
+        self.post_log = PostLog(log_file)
+
+        # The post log is the source of truth when there is one
+        self.from_log = self.post_log.exists()
+        if self.from_log:
+            self.urls = set(self.post_log.keys().by_url)
+        else:
+            with open_columnar(self.snapshot_file) as snapshot:
+                self.urls = set(snapshot.url_keys)
+        print(f"📁 Corpus: {len(self.urls)} known post URLs from "
+              f"{self.post_log.keys_file if self.from_log else columnar_file(self.snapshot_file)}")
+        self._posts = None
+        self._captions = None
+
+    @property
+    def posts(self):
+        """Every existing post (read on first use)"""
+        if self._posts is None:
+            if self.from_log:
+                self._posts, _ = self.post_log.current_posts()
+            else:
+                self._posts = load_snapshot(self.snapshot_file).get('posts', [])
+        return self._posts
+
+    @property
+    def captions(self):
+        """Near-duplicate index of the existing captions, keyed by post URL (built on first use)"""
+        if self._captions is None:
+            self._captions = NearDuplicateIndex()
+            if self.from_log or self._posts is not None:
+                for post in self.posts:
+                    self._captions.add(post.get('post_url'), post.get('caption', ''))
+            else:
+                with open_columnar(self.snapshot_file) as snapshot:
+                    for i, caption in enumerate(snapshot.captions):
+                        self._captions.add(snapshot.url(i), caption)
+        return self._captions
+
+
+def load_cleaned(dump_file=None, cleaned_file=None, write_cleaned=None):
+    """Stage clean: the dump's cleaned posts, streamed from the raw dump or read from a cleaned file"""
+    if dump_file:
+        posts = with_entities(unique_posts(with_caption_and_url(clean_posts(iter_json_array(dump_file)))))
+        if write_cleaned:
+            # Keep the cleaned posts while the writer streams them to disk
+            kept = []
+            write_posts((kept.append(post) or post for post in posts), write_cleaned)
+            print(f"📄 Saved {len(kept)} cleaned posts to: {write_cleaned}")
+            return kept
+        return list(posts)
+
+    with open(cleaned_file, 'r', encoding='utf-8') as f:
+        return json.load(f)['posts']
+
+
+def diff(corpus, dump_posts):
+    """Stage diff: {'new': [...], 'existing': [...], 'reposts': [(post, matched url)]}"""
+    result = {'new': [], 'existing': [], 'reposts': []}
+    for post in dump_posts:
+        key = url_key(post['post_url'])
+        if key in corpus.urls:
+            result['existing'].append(post)
+            continue
+        # Adding as we go also catches repeats within the dump
+        matches = corpus.captions.add(post['post_url'], post['caption'])
+        if matches:
+            result['reposts'].append((post, matches[0]))
+        else:
+            result['new'].append(post)
+            corpus.urls.add(key)
+    return result
+
+
+def report_diff(corpus, dump_posts, result):
+    print()
+    print(f"📊 Dataset Analysis:")
+    print(f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
+    print(f"📁 Instagram dataset: {len(dump_posts)} posts")
+    print(f"📁 Corpus: {len(corpus.posts)} posts")
+    print(f"")
+    print(f"🆕 NEW posts: {len(result['new'])}")
+    print(f"♻️  Already in the corpus (same URL): {len(result['existing'])}")
+    print(f"♻️  Reposts (same or near-duplicate caption): {len(result['reposts'])}")
+
+    if result['new']:
+        print(f"\nSample of new posts:")
+        print(f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
+        for i, post in enumerate(result['new'][:3], 1):
+            caption_preview = post['caption'][:100] + "..." if len(post['caption']) > 100 else post['caption']
+            print(f"{i}. {caption_preview}")
+            print(f"   URL: {post['post_url']}")
+
+    if result['reposts']:
+        print(f"\nSample of reposts:")
+        print(f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
+        for i, (post, matched) in enumerate(result['reposts'][:3], 1):
+            caption_preview = post['caption'][:50] + "..." if len(post['caption']) > 50 else post['caption']
+            print(f"{i}. {caption_preview}")
+            print(f"   URL: {post['post_url']} (repost of {matched})")
+
+    print()
+    captions = {post.get('post_url'): post.get('caption', '') for post in corpus.posts}
+    captions.update((post['post_url'], post['caption']) for post in dump_posts)
+    report_clusters(corpus.captions, captions)
+
+
+def report_dates(dump_posts, new_posts):
+    """Stage dates: the date range of the dump and of the new posts, and new posts per day"""
+    all_post_dates = DateIndex.from_posts(dump_posts)
+    new_post_dates = DateIndex.from_posts(new_posts)
+
+    print()
+    print(f"📅 Post Date Analysis:")
+    print(f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
+    for label, dates in ((f"📊 All posts in dataset", all_post_dates), (f"🆕 New posts only", new_post_dates)):
+        print(f"\n{label} ({len(dates.epochs)} posts):")
+        if dates.epochs:
+            print(f"  Earliest: {dates.earliest().strftime('%B %d, %Y at %I:%M %p')}")
+            print(f"  Latest:   {dates.latest().strftime('%B %d, %Y at %I:%M %p')}")
+
+    if new_post_dates.epochs:
+        print(f"\n📆 New posts by date:")
+        for day, count in reversed(new_post_dates.histogram('day')):
+            print(f"  {datetime.strptime(day, '%Y-%m-%d').strftime('%B %d, %Y')}: {count} posts")
+
+
+def merge(corpus, new_posts):
+    """Stage merge: append the new posts to the post log and republish from what is already loaded"""
+    if not new_posts:
+        print("\nℹ️  No new posts to merge")
+        return 0
+
+    if not corpus.from_log:
+        corpus.post_log.seed(corpus.posts)  # Also gives every post an id
+    corpus.post_log.append(new_posts)
+
+    # The folded log is the loaded posts plus the new ones, whose ids come after
+    existing = sorted(corpus.posts, key=lambda post: post['id'])
+    data = compact_and_publish(corpus.post_log, corpus.snapshot_file, existing + new_posts)
+    print(f"\n✅ Added {len(new_posts)} new posts")
+    print(f"📊 Total posts now: {data['total_posts']}")
+    return len(new_posts)
+
+
+def run(dump_file=None, cleaned_file="cleaned_instagram_data.json", write_cleaned=None,
+        stages=("clean", "diff", "dates"), snapshot_file="all-posts.json", log_file="data/posts.jsonl"):
+    """Run the requested stages over one load of every input; returns the diff"""
+    dump_posts = load_cleaned(dump_file, cleaned_file, write_cleaned)
+    print(f"🧹 {len(dump_posts)} posts in the dataset")
+
+    corpus = Corpus(snapshot_file, log_file)
+    result = diff(corpus, dump_posts)
+
+    if "diff" in stages:
+        report_diff(corpus, dump_posts, result)
+    if "dates" in stages:
+        report_dates(dump_posts, result['new'])
+    if "merge" in stages:
+        merge(corpus, result['new'])
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Clean, diff, date-report and merge a scraper dump in one pass")
+    parser.add_argument("dump", nargs="?", help="raw Apify dataset_instagram-scraper_*.json dump")
+    parser.add_argument("--cleaned", default="cleaned_instagram_data.json",
+                        help="already cleaned posts to use when no dump is given")
+    parser.add_argument("--write-cleaned", metavar="FILE", help="also save the cleaned dump posts here")
+    parser.add_argument("--merge", action="store_true", help="merge the new posts (default: dry run)")
+    parser.add_argument("--stages", default="clean,diff,dates",
+                        help=f"comma-separated stages to run, of {', '.join(STAGES)}")
+    parser.add_argument("--snapshot", default="all-posts.json", help="all-posts.json to compare against")
+    args = parser.parse_args()
+
+    stages = {stage.strip() for stage in args.stages.split(',') if stage.strip()}
+    if args.merge:
+        stages.add("merge")
+    unknown = stages - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+
+    snapshot_file = Path(args.snapshot)
+    run(args.dump, args.cleaned, args.write_cleaned, stages,
+        snapshot_file, snapshot_file.parent / "data" / "posts.jsonl")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
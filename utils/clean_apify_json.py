@@ -1,49 +1,96 @@
 #!/usr/bin/env python3
 """
 Clean Instagram dataset to match all-posts.json format
+
+The raw dump is streamed one post at a time through a generator pipeline
+(read -> clean -> filter -> dedup -> tag -> write), so memory stays flat however
+big the dump is.
 """
 import json
-from datetime import datetime
+import os
+import sys
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pathlib import Path
 
-def clean_instagram_data(input_file, output_file):
-    """Clean Instagram scraper data to match all-posts.json format"""
-    
-    # Load the raw Instagram data
-    with open(input_file, 'r', encoding='utf-8') as f:
-        raw_data = json.load(f)
-    
-    # Prepare cleaned posts list
-    cleaned_posts = []
-    
-    for post in raw_data:
-        # Extract only the fields we need
-        cleaned_post = {
-            "caption": post.get("caption", ""),
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from caption_cleaner import clean_caption
+from dates import to_utc_iso
+from entities import extract_entities
+from json_stream import iter_json_array
+from post_keys import url_key
+
+# How many recent post keys to remember when dropping repeats within a dump;
+# scraper pages overlap, so repeats sit close together
+RECENT_KEYS = 10_000
+
+def clean_posts(raw_posts):
+    """Reduce raw scraper posts to the fields we keep"""
+    for post in raw_posts:
+        yield {
+            "caption": clean_caption(post.get("caption") or ""),
             "post_url": post.get("url", ""),
-            "added_at": post.get("timestamp", datetime.now().isoformat())  # Use Instagram timestamp if available
+            "added_at": post.get("timestamp") or to_utc_iso(datetime.now(timezone.utc)),  # Use Instagram timestamp if available
+            "raw_caption": post.get("caption") or ""  # The post log keeps it for scripts/reprocess.py
         }
-        
-        # Only add posts that have both caption and URL
-        if cleaned_post["caption"] and cleaned_post["post_url"]:
-            cleaned_posts.append(cleaned_post)
-    
-    # Create the final structure matching all-posts.json
-    final_data = {
-        "total_posts": len(cleaned_posts),
-        "posts": cleaned_posts
-    }
-    
-    # Write the cleaned data
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(final_data, f, indent=2, ensure_ascii=False)
-    
-    print(f"✅ Cleaned {len(cleaned_posts)} posts")
+
+def with_caption_and_url(posts):
+    """Only keep posts that have both caption and URL"""
+    for post in posts:
+        if post["caption"] and post["post_url"]:
+            yield post
+
+def unique_posts(posts, known_keys=None):
+    """Drop posts seen shortly before in the dump, and ones in known_keys (a PostKeys) if given"""
+    recent = OrderedDict()
+    for post in posts:
+        key = url_key(post["post_url"])
+        if key in recent or (known_keys is not None and key in known_keys.by_url):
+            continue
+        recent[key] = None
+        if len(recent) > RECENT_KEYS:
+            recent.popitem(last=False)
+        yield post
+
+def with_entities(posts):
+    """Tag each post with the campus, college, residence, program and @mentions its caption names"""
+    for post in posts:
+        post["entities"] = extract_entities(post["caption"])
+        yield post
+
+def write_posts(posts, output_file):
+    """Write posts as {"posts": [...], "total_posts": n} as they arrive; returns n"""
+    tmp_file = f"{output_file}.tmp"
+    count = 0
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        f.write('{\n  "posts": [')
+        for post in posts:
+            body = json.dumps(post, indent=2, ensure_ascii=False).replace('\n', '\n    ')
+            f.write((',\n    ' if count else '\n    ') + body)
+            count += 1
+        f.write(f'\n  ],\n  "total_posts": {count}\n}}\n')
+    os.replace(tmp_file, output_file)
+    return count
+
+def clean_instagram_data(input_file, output_file, known_keys=None):
+    """Clean Instagram scraper data to match all-posts.json format"""
+
+    # Stream the raw Instagram data; nothing is held beyond the post in flight
+    posts = iter_json_array(input_file)
+    posts = clean_posts(posts)
+    posts = with_caption_and_url(posts)
+    posts = unique_posts(posts, known_keys)
+    posts = with_entities(posts)
+    total = write_posts(posts, output_file)
+
+    print(f"✅ Cleaned {total} posts")
     print(f"📄 Saved to: {output_file}")
-    
-    return final_data
+
+    return total
 
 if __name__ == "__main__":
-    input_file = "dataset_instagram-scraper_2025-08-31_13-58-44-819.json"
-    output_file = "cleaned_instagram_data.json"
-    
-    clean_instagram_data(input_file, output_file)
\ No newline at end of file
+    input_file = sys.argv[1] if len(sys.argv) > 1 else "dataset_instagram-scraper_2025-08-31_13-58-44-819.json"
+    output_file = sys.argv[2] if len(sys.argv) > 2 else "cleaned_instagram_data.json"
+
+    clean_instagram_data(input_file, output_file)
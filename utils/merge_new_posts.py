@@ -1,49 +1,15 @@
 #!/usr/bin/env python3
 """
-Merge new posts from cleaned_instagram_data.json into all-posts.json
-"""
-import json
+Merge new posts from cleaned_instagram_data.json into the post log and
+republish all-posts.json from it
 
-def normalize_caption(caption):
-    """Normalize caption for comparison"""
-    if not caption:
-        return ""
-    return ' '.join(caption.strip().lower().split())
+Runs the merge stage of utils/backfill.py.
+"""
+from backfill import run
 
 def merge_new_posts():
     """Merge only new posts into all-posts.json"""
-    
-    # Load the cleaned Instagram data
-    with open('cleaned_instagram_data.json', 'r', encoding='utf-8') as f:
-        instagram_data = json.load(f)
-    
-    # Load the existing all-posts.json
-    with open('all-posts.json', 'r', encoding='utf-8') as f:
-        existing_data = json.load(f)
-    
-    # Create normalized caption set for existing posts
-    existing_captions = {normalize_caption(post['caption']) for post in existing_data['posts']}
-    
-    # Find and add only new posts
-    new_posts_added = 0
-    for post in instagram_data['posts']:
-        normalized = normalize_caption(post['caption'])
-        if normalized not in existing_captions:
-            existing_data['posts'].append(post)
-            existing_captions.add(normalized)  # Prevent duplicates within this run
-            new_posts_added += 1
-    
-    # Update total count
-    existing_data['total_posts'] = len(existing_data['posts'])
-    
-    # Save the updated data
-    with open('all-posts.json', 'w', encoding='utf-8') as f:
-        json.dump(existing_data, f, indent=2, ensure_ascii=False)
-    
-    print(f"✅ Added {new_posts_added} new posts to all-posts.json")
-    print(f"📊 Total posts now: {existing_data['total_posts']}")
-    
-    return new_posts_added
+    return len(run(stages=("merge",))['new'])
 
 if __name__ == "__main__":
-    merge_new_posts()
\ No newline at end of file
+    merge_new_posts()
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Stand-in RSS feed server for trying the monitor locally without hitting rss.app.
+Serves a generated RSS feed with ETag / Last-Modified and answers conditional
+requests with 304, counting every request it sees.
+
+Usage:
+  python utils/stub_feed_server.py serve [entries]   # serve a feed on http://localhost:8001/feed.xml
+  python utils/stub_feed_server.py check             # verify an unchanged feed costs one 304 round trip
+  python utils/stub_feed_server.py simulate [days] [YYYY-MM-DD] [polls per day]
+      # run the watch mode's scheduler against simulated posting, on a simulated clock
+"""
+import contextlib
+import hashlib
+import http.server
+import io
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from bisect import bisect_right
+from datetime import datetime, timezone
+from email.utils import formatdate
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+
+NAMES = ["maya", "arjun", "chloe", "daniel", "fatima", "kevin", "priya", "lucas", "sofia", "omar"]
+PROGRAMS = ["eng", "comp sci", "life sci", "rotman commerce", "kinesiology", "architecture", "math", "psych"]
+HOMES = ["chestnut", "new college", "woodsworth", "trinity", "vic", "innis", "campus one", "commuting from mississauga"]
+HOBBIES = ["kpop", "volleyball", "matcha", "anime", "thrifting", "the gym", "chess", "baking", "f1", "hiking"]
+
+
+def make_caption(n):
+    """A frosh intro caption that differs enough from every other n's to not look like a repost"""
+    rng = random.Random(n)
+    hobbies = ' and '.join(rng.sample(HOBBIES, 2))
+    return (f"hi im {rng.choice(NAMES)} (stub {n}) going to UofT for {rng.choice(PROGRAMS)} in "
+            f"{2025 + n % 5}, living at {rng.choice(HOMES)} <3 into {hobbies}, dm me #{n:x}{rng.getrandbits(24):x}")
+
+
+def make_entry(n, caption=None):
+    """A feed entry shaped like the ones rss.app produces for Instagram posts"""
+    return {
+        'title': f"Post {n}",
+        'link': f"https://www.instagram.com/p/STUB{n:06d}/",
+        'description': f'<div><img src="https://example.com/{n}.jpg" /><div>{caption or make_caption(n)}</div></div>',
+        'published': formatdate(1_750_000_000 + n * 3600, usegmt=True),
+    }
+
+
+def make_feed_xml(entries):
+    """Render entries (newest first) as an RSS 2.0 document"""
+    items = ''.join(
+        f"<item><title>{escape(e['title'])}</title><link>{escape(e['link'])}</link>"
+        f"<guid>{escape(e['link'])}</guid><description>{escape(e['description'])}</description>"
+        f"<pubDate>{e['published']}</pubDate></item>"
+        for e in entries
+    )
+    return ('<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+            f'<title>Stub feed</title><link>https://www.instagram.com/</link>{items}</channel></rss>').encode('utf-8')
+
+
+class StubFeedServer:
+    """Serves one feed at /feed.xml from a background thread"""
+
+    def __init__(self, entries=(), port=0, delay=0.0):
+        self.stats = {'requests': 0, 'full': 0, 'not_modified': 0, 'bytes_sent': 0}
+        self.delay = delay  # Seconds to wait before answering, to imitate a slow feed
+        self.set_entries(entries)
+
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.stats['requests'] += 1
+                time.sleep(server.delay)
+                body, etag, last_modified = server.body, server.etag, server.last_modified
+                if self.headers.get('If-None-Match') == etag or (
+                        self.headers.get('If-None-Match') is None
+                        and self.headers.get('If-Modified-Since') == last_modified):
+                    server.stats['not_modified'] += 1
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.end_headers()
+                    return
+                server.stats['full'] += 1
+                server.stats['bytes_sent'] += len(body)
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/rss+xml')
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('ETag', etag)
+                self.send_header('Last-Modified', last_modified)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = http.server.ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/feed.xml"
+
+    def set_entries(self, entries):
+        """Replace the feed contents; validators change with them"""
+        self.entries = list(entries)
+        self.body = make_feed_xml(self.entries)
+        self.etag = '"' + hashlib.sha256(self.body).hexdigest()[:16] + '"'
+        self.last_modified = formatdate(time.time(), usegmt=True)
+
+    def start(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def check_conditional_fetch():
+    """Run the monitor twice against an unchanged feed in a scratch directory"""
+    from rss_monitor import RSSMonitor
+
+    server = StubFeedServer([make_entry(n) for n in range(20, 0, -1)]).start()
+    original_dir = os.getcwd()
+    try:
+        with tempfile.TemporaryDirectory() as scratch:
+            os.chdir(scratch)
+            RSSMonitor(server.url).check_for_new_posts()
+            first = dict(server.stats)
+
+            cpu_start = time.process_time()
+            RSSMonitor(server.url).check_for_new_posts()
+            cpu_ms = (time.process_time() - cpu_start) * 1000
+    finally:
+        os.chdir(original_dir)
+        server.stop()
+
+    second_requests = server.stats['requests'] - first['requests']
+    print()
+    print(f"📊 First run: {first['full']} full download(s), {first['bytes_sent']} bytes")
+    print(f"📊 Second run: {second_requests} request(s), {server.stats['not_modified'] - first['not_modified']} answered 304, "
+          f"{server.stats['bytes_sent'] - first['bytes_sent']} bytes, {cpu_ms:.1f} ms CPU")
+
+    ok = second_requests == 1 and server.stats['not_modified'] == 1 and server.stats['full'] == 1
+    print("✅ Unchanged feed cost a single 304 round trip" if ok else "❌ Unchanged feed was downloaded again")
+    return 0 if ok else 1
+
+
+# The simulated account: posts a day by month (1 a day in the other months), and how
+# many of the newest posts the feed lists, like rss.app's Instagram feeds
+POSTS_PER_DAY = {7: 8, 8: 30, 9: 10}
+FEED_SIZE = 25
+DAY = 86_400
+
+
+def posting_times(start, days, seed=0):
+    """Epoch seconds of the simulated posts: a Poisson process at the month's rate"""
+    rng = random.Random(seed)
+    times = []
+    now = start
+    while True:
+        month = datetime.fromtimestamp(now, timezone.utc).month
+        now += rng.expovariate(POSTS_PER_DAY.get(month, 1) / DAY)
+        if now >= start + days * DAY:
+            return times
+        times.append(now)
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)] if ordered else 0
+
+
+def cron_latencies(times, end, hour=9):
+    """(latencies, missed) of a once-a-day run at hour:00 UTC, for comparison"""
+    latencies, missed = [], 0
+    for n, posted in enumerate(times):
+        run = posted - posted % DAY + hour * 3600
+        if run < posted:
+            run += DAY
+        # The run sees the post unless FEED_SIZE newer ones pushed it out of the feed first
+        if run > end or bisect_right(times, run) - (n + 1) >= FEED_SIZE:
+            missed += 1
+        else:
+            latencies.append(run - posted)
+    return latencies, missed
+
+
+def simulate_watch(days=30, start=datetime(2026, 7, 20, tzinfo=timezone.utc), budget=None, seed=0):
+    """Run watch mode against the stub feed on a simulated clock and report detection latency"""
+    from poll_schedule import DAILY_POLL_BUDGET, PollSchedule
+    from rss_monitor import RSSMonitor, watch
+
+    start = start.timestamp()
+    end = start + days * DAY
+    times = posting_times(start, days, seed)
+    clock = {'now': start}
+    detected = {}  # post number -> when a poll first saw it
+    server = StubFeedServer().start()
+
+    def visible(now):
+        """Numbers of the posts in the feed at now, oldest first"""
+        return range(max(0, bisect_right(times, now) - FEED_SIZE), bisect_right(times, now))
+
+    def publish(now):
+        entries = []
+        for n in reversed(visible(now)):
+            entry = make_entry(n)
+            entry['published'] = formatdate(times[n], usegmt=True)
+            entries.append(entry)
+        server.set_entries(entries)
+
+    def wait(seconds):
+        # The poll that just ran saw the feed as of now
+        for n in visible(clock['now']):
+            detected.setdefault(n, clock['now'])
+        clock['now'] += seconds
+        publish(clock['now'])
+
+    publish(start)
+    schedule = PollSchedule(budget or DAILY_POLL_BUDGET, seed=seed)
+    original_dir = os.getcwd()
+    wall_start = time.perf_counter()
+    try:
+        with tempfile.TemporaryDirectory() as scratch:
+            os.chdir(scratch)
+            monitor = RSSMonitor(server.url)
+            stop = threading.Event()
+
+            def simulated_wait(seconds):
+                wait(seconds)
+                if clock['now'] >= end:
+                    stop.set()
+
+            with contextlib.redirect_stdout(io.StringIO()):
+                polls = watch(monitor, schedule, stop=stop, clock=lambda: clock['now'], wait=simulated_wait)
+            logged = len(monitor.post_log.current_posts()[0])
+    finally:
+        os.chdir(original_dir)
+        server.stop()
+
+    latencies = [(detected[n] - times[n]) / 60 for n in detected]
+    cron, cron_missed = cron_latencies(times, end)
+    cron = [seconds / 60 for seconds in cron]
+    print(f"🧪 {days} simulated days from {datetime.fromtimestamp(start, timezone.utc):%Y-%m-%d}, "
+          f"{len(times)} posts ({time.perf_counter() - wall_start:.1f}s wall time)")
+    print(f"📡 {polls} polls ({polls / days:.1f} a day, budget {schedule.budget_per_day}), "
+          f"{server.stats['not_modified']} answered 304, {server.stats['bytes_sent']} bytes downloaded")
+    print(f"⏱️  Watch mode: detected {len(detected)}, missed {len(times) - len(detected)}; minutes to detection "
+          f"p50 {percentile(latencies, 0.5):.0f}, p95 {percentile(latencies, 0.95):.0f}, max {max(latencies, default=0):.0f}")
+    print(f"⏱️  Daily cron: detected {len(cron)}, missed {cron_missed}; minutes to detection "
+          f"p50 {percentile(cron, 0.5):.0f}, p95 {percentile(cron, 0.95):.0f}, max {max(cron, default=0):.0f}")
+
+    ok = logged == len(detected)
+    print("✅ Every post the polls saw is in the post log" if ok
+          else f"❌ The polls saw {len(detected)} posts but the post log has {logged}")
+    return 0 if ok else 1
+
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else 'serve'
+    if command == 'check':
+        return check_conditional_fetch()
+    if command == 'simulate':
+        days = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+        start = (datetime.strptime(sys.argv[3], '%Y-%m-%d').replace(tzinfo=timezone.utc) if len(sys.argv) > 3
+                 else datetime(2026, 7, 20, tzinfo=timezone.utc))
+        budget = int(sys.argv[4]) if len(sys.argv) > 4 else None
+        return simulate_watch(days, start, budget)
+
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    server = StubFeedServer([make_entry(n) for n in range(count, 0, -1)], port=8001)
+    print(f"📡 Serving {count} entries at {server.url} (Ctrl+C to stop)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Server stopped!")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())